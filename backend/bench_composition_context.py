@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Composer context benchmark: "String N Fret M" lines vs compact tab.
+
+Formats the last 8 measures of each composition for the composer prompt with
+the previous encoding (one "String N Fret M" entry per note, grouped by beat)
+and with llm_prompts.format_composition_for_gpt (compact tab), and reports
+context tokens, tokens per measure and the latency of a composer request with
+each context against the local stub LLM (llm_stub_server.py). The last column
+is how many measures compact tab fits into the token budget (the old encoding
+always sent 8).
+
+Compositions are MusicXML imports converted by musicxml_to_tab (generated
+with synthetic_musicxml: melody, strummed chords, two-voice fingerstyle) and a
+hand-entered composer progression.
+
+Token counts use tiktoken when installed and the chars/4 estimate otherwise
+(the estimate overstates the cost of "-" runs, which tiktoken merges).
+
+Usage:
+    python bench_composition_context.py
+    python bench_composition_context.py --requests 20 --budget 800
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Dict
+
+from openai import OpenAI
+
+from llm_prompts import COMPOSITION_TOKEN_BUDGET, build_composer_messages, format_composition_for_gpt
+from llm_stub_server import StubLLMServer
+from musicxml_to_tab import convert_musicxml_to_tab
+from prompt_budget import count_tokens, get_encoder
+from synthetic_musicxml import write_synthetic_score
+
+# MusicXML imports: name -> generate_musicxml kwargs
+SCORE_CASES: Dict[str, Dict] = {
+    "melody": {"measures": 32, "voices": 1, "chord_size": 1, "divisions": 4},
+    "strummed_chords": {"measures": 32, "voices": 1, "chord_size": 4, "divisions": 2},
+    "fingerstyle": {"measures": 32, "voices": 2, "chord_size": 2, "divisions": 4},
+}
+
+# Hand-entered progression: (chord, bass string, bass fret, treble (string, fret) pairs)
+PROGRESSION = [
+    ("C", 5, 3, [(3, 0), (2, 1), (1, 0)]),
+    ("Am", 5, 0, [(3, 2), (2, 1), (1, 0)]),
+    ("F", 4, 3, [(3, 2), (2, 1), (1, 1)]),
+    ("G", 6, 3, [(3, 0), (2, 0), (1, 3)]),
+]
+
+
+def legacy_format(composition, selected_region=None):
+    """The composer context encoding before compact tab."""
+    if not composition or 'measures' not in composition:
+        return "No composition data available."
+
+    output = []
+    measures = composition['measures']
+
+    if selected_region:
+        start = selected_region.get('start_measure', 0)
+        end = selected_region.get('end_measure', len(measures))
+        measures_to_format = measures[start:end+1]
+        output.append(f"Selected region: Measures {start+1} to {end+1}")
+    else:
+        measures_to_format = measures[-8:] if len(measures) > 8 else measures
+        if len(measures) > 8:
+            output.append(f"Showing last 8 measures (total: {len(measures)} measures)")
+
+    output.append(f"Time Signature: {composition.get('timeSignature', '4/4')}")
+    output.append(f"Tempo: {composition.get('tempo', 120)} BPM\n")
+
+    for idx, measure in enumerate(measures_to_format):
+        measure_num = idx + 1 if not selected_region else selected_region.get('start_measure', 0) + idx + 1
+        output.append(f"Measure {measure_num}:")
+
+        if measure.get('chords'):
+            chords_str = ", ".join([f"{c['name']} at beat {c['time']+1}" for c in measure['chords']])
+            output.append(f"  Chords: {chords_str}")
+
+        events = measure.get('events', [])
+        if events:
+            events_by_time = {}
+            for event in events:
+                t = event['time']
+                if t not in events_by_time:
+                    events_by_time[t] = []
+                events_by_time[t].append(f"String {event['string']} Fret {event['fret']}")
+
+            for t in sorted(events_by_time.keys()):
+                output.append(f"  Beat {t+1}: {', '.join(events_by_time[t])}")
+
+        output.append("")
+
+    return "\n".join(output)
+
+
+def composer_progression(repeats: int = 8) -> Dict:
+    """Travis-style pattern over C-Am-F-G as the composer front end stores it."""
+    measures = []
+    for _ in range(repeats):
+        for chord, bass_string, bass_fret, treble in PROGRESSION:
+            events = []
+            for beat in range(4):
+                string, fret = (bass_string, bass_fret) if beat % 2 == 0 else (4, 2)
+                events.append({"time": beat * 0.25, "string": string, "fret": fret, "duration": 0.125})
+                treble_string, treble_fret = treble[beat % len(treble)]
+                events.append({"time": beat * 0.25 + 0.125, "string": treble_string, "fret": treble_fret,
+                               "duration": 0.125})
+            measures.append({"chords": [{"name": chord, "time": 0}], "events": events})
+    return {"title": "Progression", "tempo": 96, "timeSignature": "4/4", "measures": measures}
+
+
+def load_compositions() -> Dict[str, Dict]:
+    compositions = {}
+    tmpdir = tempfile.mkdtemp(prefix="bench_context_")
+    try:
+        for name, kwargs in SCORE_CASES.items():
+            path = write_synthetic_score(os.path.join(tmpdir, f"{name}.musicxml"), **kwargs)
+            compositions[name] = convert_musicxml_to_tab(path)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    compositions["composer_progression"] = composer_progression()
+    return compositions
+
+
+def count_measures(context: str, legacy: bool) -> int:
+    prefix = "Measure " if legacy else "M"
+    return sum(1 for line in context.splitlines() if line.startswith(prefix) and line[len(prefix):][:1].isdigit())
+
+
+def mean_latency_ms(client: OpenAI, context: str, requests: int) -> float:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.chat.completions.create(model="gpt-4o", messages=build_composer_messages(context, "Add a bass line"),
+                                       temperature=0.7, max_tokens=1500, response_format={"type": "json_object"})
+        latencies.append(time.perf_counter() - start)
+    return statistics.mean(latencies) * 1000
+
+
+def run_case(client: OpenAI, context: str, legacy: bool, requests: int) -> Dict:
+    measures = count_measures(context, legacy)
+    tokens = count_tokens(context)
+    return {
+        "measures": measures,
+        "tokens": tokens,
+        "per_measure": tokens / measures if measures else 0.0,
+        "latency_ms": mean_latency_ms(client, context, requests),
+    }
+
+
+def last_measures_region(composition: Dict, count: int = 8) -> Dict:
+    total = len(composition['measures'])
+    return {"start_measure": max(0, total - count), "end_measure": total - 1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark composer context encodings")
+    parser.add_argument("--requests", type=int, default=10, help="Stub requests per case and encoding")
+    parser.add_argument("--budget", type=int, default=COMPOSITION_TOKEN_BUDGET, help="Compact tab token budget")
+    args = parser.parse_args()
+
+    compositions = load_compositions()
+
+    # Prefill-dominated latency model, as in bench_prompt_prefix.py
+    stub = StubLLMServer(base_latency=0.03, prefill_seconds_per_token=0.0004,
+                         cached_seconds_per_token=0.00004, output_seconds_per_token=0.0005).start()
+    client = OpenAI(base_url=stub.base_url, api_key="stub", max_retries=0)
+    results = {}
+    try:
+        # Warm the static prefix so both encodings are measured with it cached
+        mean_latency_ms(client, "", 1)
+        for name, composition in compositions.items():
+            last_eight = format_composition_for_gpt(composition, last_measures_region(composition), None)
+            budgeted = format_composition_for_gpt(composition, token_budget=args.budget)
+            results[name] = (
+                run_case(client, legacy_format(composition), True, args.requests),
+                run_case(client, last_eight, False, args.requests),
+                count_measures(budgeted, False),
+            )
+    finally:
+        stub.stop()
+
+    counting = "tiktoken" if get_encoder() is not None else "estimated (chars/4)"
+    print(f"Last 8 measures, legacy -> compact tab. Token counts: {counting}")
+    print(f"{'case':22} {'tokens':>13} {'tok/measure':>15} {'latency ms':>13} {'measures in ' + str(args.budget):>17}")
+    for name, (legacy, compact, budget_measures) in results.items():
+        print(f"{name:22} {legacy['tokens']:5d} -> {compact['tokens']:4d} "
+              f"{legacy['per_measure']:6.1f} -> {compact['per_measure']:5.1f} "
+              f"{legacy['latency_ms']:5.0f} -> {compact['latency_ms']:4.0f} {budget_measures:17d}")
+
+    legacy_tokens = sum(r[0]["tokens"] for r in results.values())
+    compact_tokens = sum(r[1]["tokens"] for r in results.values())
+    legacy_ms = statistics.mean(r[0]["latency_ms"] for r in results.values())
+    compact_ms = statistics.mean(r[1]["latency_ms"] for r in results.values())
+    print()
+    print(f"Context tokens: {legacy_tokens} -> {compact_tokens} ({compact_tokens / legacy_tokens - 1:+.0%}); "
+          f"mean latency {legacy_ms:.0f} -> {compact_ms:.0f} ms")
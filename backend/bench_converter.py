@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Converter Scaling Benchmark
+
+Runs convert_musicxml_to_columns (parse + convert + validation), page merging
+and JSON serialization over synthetic scores of increasing size, and reports
+throughput (measures/s, notes/s) and peak memory per stage.
+
+Results can be stored as baselines (bench_baselines.json) and later runs
+compared against them; a stage whose throughput drops by more than the
+tolerance, or whose output note count changes, is reported as a regression.
+
+Usage:
+    python bench_converter.py                   # run and compare with baselines
+    python bench_converter.py --save-baseline   # run and overwrite baselines
+    python bench_converter.py --check           # exit 1 on regressions
+    python bench_converter.py --compare-backends  # etree vs lxml parse+convert
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from musicxml_backends import HAS_LXML
+from musicxml_to_tab import clear_parse_cache, convert_musicxml_to_columns, merge_compositions
+from synthetic_musicxml import write_synthetic_score
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baselines.json')
+
+# Throughput may drop this much (fraction) before it counts as a regression
+REGRESSION_TOLERANCE = 0.25
+
+# Benchmark cases: name -> generate_musicxml kwargs
+BENCH_CASES: Dict[str, Dict] = {
+    "melody_100": {"measures": 100, "voices": 1, "chord_size": 1, "divisions": 4},
+    "two_voice_500": {"measures": 500, "voices": 2, "chord_size": 1, "divisions": 8},
+    "chords_500": {"measures": 500, "voices": 1, "chord_size": 4, "divisions": 4},
+    "fingerstyle_2000": {"measures": 2000, "voices": 2, "chord_size": 3, "divisions": 12},
+    "book_8000": {"measures": 8000, "voices": 2, "chord_size": 2, "divisions": 24,
+                  "time_signature": "6/8"},
+}
+
+# Number of pages merged in the merge stage
+MERGE_PAGES = 8
+
+
+def run_stage(fn: Callable, repeat: int) -> Tuple[float, int, object]:
+    """Run fn `repeat` times; return (best seconds, peak traced bytes, last result)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_case(path: str, repeat: int) -> Dict:
+    """Benchmark all stages on one score."""
+    convert_seconds, convert_peak, composition = run_stage(
+        lambda: convert_musicxml_to_columns(path), repeat)
+    measures = composition.num_measures
+    notes = len(composition)
+
+    pages = [convert_musicxml_to_columns(path, cache=True) for _ in range(MERGE_PAGES)]
+    clear_parse_cache()
+    merge_seconds, merge_peak, merged = run_stage(lambda: merge_compositions(pages), repeat)
+
+    def serialize():
+        buffer = io.StringIO()
+        composition.write_json(buffer)
+        return buffer.tell()
+
+    serialize_seconds, serialize_peak, json_bytes = run_stage(serialize, repeat)
+
+    def stage(seconds: float, peak: int, stage_measures: int, stage_notes: int) -> Dict:
+        return {
+            "seconds": round(seconds, 5),
+            "measures_per_second": round(stage_measures / seconds, 1),
+            "notes_per_second": round(stage_notes / seconds, 1),
+            "peak_memory_mb": round(peak / 1024 / 1024, 3),
+        }
+
+    return {
+        "measures": measures,
+        "notes": notes,
+        "validation_issues": len(composition.validation_issues()),
+        "json_bytes": json_bytes,
+        "stages": {
+            "convert": stage(convert_seconds, convert_peak, measures, notes),
+            "merge": stage(merge_seconds, merge_peak, merged.num_measures, len(merged)),
+            "serialize": stage(serialize_seconds, serialize_peak, measures, notes),
+        }
+    }
+
+
+def run_benchmarks(cases: Dict[str, Dict] = None, repeat: int = 3) -> Dict[str, Dict]:
+    """Generate each case's score in a temp dir and benchmark it."""
+    cases = cases or BENCH_CASES
+    temp_dir = tempfile.mkdtemp(prefix="bench_converter_")
+    results = {}
+    try:
+        for name, params in cases.items():
+            path = write_synthetic_score(os.path.join(temp_dir, f"{name}.musicxml"),
+                                         title=name, **params)
+            results[name] = bench_case(path, repeat)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def compare_backends(cases: Dict[str, Dict] = None, repeat: int = 3) -> Dict[str, Dict]:
+    """Time parse + convert with each parser backend on the same scores."""
+    cases = cases or BENCH_CASES
+    backends = ["etree", "lxml"] if HAS_LXML else ["etree"]
+    temp_dir = tempfile.mkdtemp(prefix="bench_converter_")
+    results = {}
+    try:
+        for name, params in cases.items():
+            path = write_synthetic_score(os.path.join(temp_dir, f"{name}.musicxml"),
+                                         title=name, **params)
+            results[name] = {}
+            for backend in backends:
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    convert_musicxml_to_columns(path, backend)
+                    best = min(best, time.perf_counter() - start)
+                results[name][backend] = round(best, 5)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                          tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """Return human-readable regression messages (empty if none)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        if result["notes"] != base["notes"]:
+            regressions.append(f"{name}: note count changed {base['notes']} -> {result['notes']}")
+
+        for stage_name, stage in result["stages"].items():
+            base_stage = base["stages"].get(stage_name)
+            if not base_stage:
+                continue
+            ratio = stage["notes_per_second"] / base_stage["notes_per_second"]
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{name}/{stage_name}: {stage['notes_per_second']:.0f} notes/s is "
+                    f"{(1 - ratio) * 100:.0f}% below baseline {base_stage['notes_per_second']:.0f}")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict]) -> None:
+    print(f"{'case':18} {'measures':>8} {'notes':>8} {'stage':>10} {'measures/s':>12} "
+          f"{'notes/s':>12} {'peak MB':>8}")
+    for name, result in results.items():
+        for stage_name, stage in result["stages"].items():
+            print(f"{name:18} {result['measures']:8} {result['notes']:8} {stage_name:>10} "
+                  f"{stage['measures_per_second']:12.0f} {stage['notes_per_second']:12.0f} "
+                  f"{stage['peak_memory_mb']:8.2f}")
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the MusicXML converter")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best of N)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Write results to {os.path.basename(BASELINE_PATH)}")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if regressions are found")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    parser.add_argument("--compare-backends", action="store_true",
+                        help="Compare etree and lxml parser backends instead")
+
+    args = parser.parse_args()
+
+    if args.compare_backends:
+        timings = compare_backends(repeat=args.repeat)
+        print(f"{'case':18} {'etree s':>10} {'lxml s':>10} {'speedup':>8}")
+        for name, by_backend in timings.items():
+            lxml_seconds = by_backend.get("lxml")
+            speedup = f"{by_backend['etree'] / lxml_seconds:7.2f}x" if lxml_seconds else "     n/a"
+            lxml_text = f"{lxml_seconds:10.4f}" if lxml_seconds else f"{'-':>10}"
+            print(f"{name:18} {by_backend['etree']:10.4f} {lxml_text} {speedup}")
+        if not HAS_LXML:
+            print("\nlxml is not installed; only the etree backend was timed")
+        exit(0)
+
+    results = run_benchmarks(repeat=args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaselines saved to {BASELINE_PATH}")
+        exit(0)
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for message in regressions:
+                print(f"  - {message}")
+            if args.check:
+                exit(1)
+        else:
+            print("\nNo regressions against baseline")
+    else:
+        print(f"\nNo baseline found; run with --save-baseline to create {BASELINE_PATH}")
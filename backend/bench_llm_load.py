@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Load test: non-LLM endpoint latency while the assistant is busy.
+
+Serves server.app from a WSGI server with a fixed number of request threads
+(like gunicorn's gthread worker) and points the OpenAI client at a slow local
+stub (llm_stub_server.py). A burst of concurrent assistant chats is fired
+while /health and GET /api/share/<id> are probed, once with LLM calls only
+limited by the request threads (how the server behaved before llm_executor)
+and once with the configured in-flight limit. With --same-message every chat
+asks the same question (a class clicking one suggested prompt), which the
+server coalesces into as few model calls as LLM_MAX_COALESCED allows.
+
+Reported per run: probe latency p50/p95/max, chat outcomes (200 / 503 busy /
+other) and chat latency, calls that reached the model, and the executor's
+peak in-flight and queued calls.
+
+Usage:
+    python bench_llm_load.py
+    python bench_llm_load.py --same-message
+    python bench_llm_load.py --chats 64 --threads 32 --max-in-flight 8 --max-queued 4 --max-coalesced 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import urllib.error
+import urllib.request
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from llm_stub_server import StubLLMServer
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ThreadPoolWSGIServer(BaseWSGIServer):
+    """Werkzeug server handling requests on a fixed pool of threads."""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app, handler=QuietRequestHandler)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def request(url: str, body: Dict = None) -> Tuple[int, bytes]:
+    """GET, or POST a JSON body; returns (status, payload)."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies: List[float]) -> str:
+    if not latencies:
+        return "-"
+    return (f"{percentile(latencies, 50) * 1000:6.0f} {percentile(latencies, 95) * 1000:6.0f} "
+            f"{max(latencies) * 1000:6.0f}")
+
+
+def run_load(base_url: str, share_id: str, chats: int, probe_interval: float, same_message: bool) -> Dict:
+    """Fire `chats` concurrent chats and probe the other endpoints until they finish."""
+    chat_results = []
+    probes = {"health": [], "share": []}
+    done = threading.Event()
+
+    def chat(i):
+        # Unique open questions: no cache hits, no theory-engine answers
+        session = 1 if same_message else i
+        body = {"message": f"How should I structure practice session {session} this week?",
+                "conversation_history": []}
+        start = time.perf_counter()
+        try:
+            status, _ = request(f"{base_url}/api/assistant", body)
+        except OSError:
+            status = "error"
+        chat_results.append((status, time.perf_counter() - start))
+
+    def probe():
+        while not done.is_set():
+            for name, path in (("health", "/health"), ("share", f"/api/share/{share_id}")):
+                start = time.perf_counter()
+                status, _ = request(f"{base_url}{path}")
+                assert status == 200, (path, status)
+                probes[name].append(time.perf_counter() - start)
+            time.sleep(probe_interval)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    time.sleep(0.2)
+    with ThreadPoolExecutor(max_workers=chats) as pool:
+        list(pool.map(chat, range(chats)))
+    done.set()
+    prober.join()
+    return {"chats": chat_results, "probes": probes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Non-LLM endpoint latency under assistant load")
+    parser.add_argument("--chats", type=int, default=48, help="Concurrent assistant requests")
+    parser.add_argument("--threads", type=int, default=24, help="Request threads of the WSGI server")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="LLM_MAX_IN_FLIGHT for the limited run")
+    parser.add_argument("--max-queued", type=int, default=4, help="LLM_MAX_QUEUED for the limited run")
+    parser.add_argument("--max-coalesced", type=int, default=4, help="LLM_MAX_COALESCED for the limited run")
+    parser.add_argument("--queue-timeout", type=float, default=5.0, help="LLM_QUEUE_TIMEOUT for the limited run")
+    parser.add_argument("--llm-seconds", type=float, default=2.0, help="Stub model latency per call")
+    parser.add_argument("--same-message", action="store_true", help="Send one identical question from every chat")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between probes")
+    args = parser.parse_args()
+
+    stub = StubLLMServer(base_latency=args.llm_seconds, prefill_seconds_per_token=0,
+                         cached_seconds_per_token=0, output_seconds_per_token=0).start()
+    os.environ.update({"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": stub.base_url, "LLM_CACHE": "0"})
+
+    import server  # noqa: E402  (reads the environment at import)
+    from llm_executor import LLMExecutor  # noqa: E402
+    from llm_singleflight import SingleFlight  # noqa: E402
+
+    wsgi = ThreadPoolWSGIServer("127.0.0.1", 0, server.app, args.threads)
+    threading.Thread(target=wsgi.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{wsgi.server_port}"
+
+    configurations = {
+        # Every request thread can block on the model, as before the executor
+        "unlimited": (LLMExecutor(max_in_flight=args.chats, max_queued=0, queue_timeout=0), SingleFlight()),
+        f"limit {args.max_in_flight}+{args.max_queued}+{args.max_coalesced}": (
+            LLMExecutor(max_in_flight=args.max_in_flight, max_queued=args.max_queued,
+                        queue_timeout=args.queue_timeout),
+            SingleFlight(max_waiting=args.max_coalesced)),
+    }
+
+    share_id = None
+    results = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, payload = request(f"{base_url}/api/share", {"composition": {"measures": []}})
+            share_id = json.loads(payload)["shareId"]
+            for name, (executor, flights) in configurations.items():
+                server.llm_executor = executor
+                server.assistant_flights = flights
+                model_calls = stub.requests
+                run = run_load(base_url, share_id, args.chats, args.probe_interval, args.same_message)
+                results[name] = (run, executor.stats(), stub.requests - model_calls)
+                executor.shutdown()
+    finally:
+        wsgi.shutdown()
+        wsgi.pool.shutdown(wait=False)
+        stub.stop()
+        if share_id:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(server.SHARES_DIR, f"{share_id}.json"))
+
+    print(f"{args.chats} concurrent chats, {args.threads} request threads, stub model {args.llm_seconds:.1f} s")
+    print(f"{'':18} {'health ms p50/p95/max':>22} {'share ms p50/p95/max':>22} "
+          f"{'chats 200/503/other':>20} {'chat ms p50/max':>16} {'model calls':>12} {'peak in flight/queued':>22}")
+    for name, (run, stats, model_calls) in results.items():
+        statuses = [status for status, _ in run["chats"]]
+        ok = statuses.count(200)
+        busy = statuses.count(503)
+        answered = [seconds for status, seconds in run["chats"] if status == 200]
+        chat_ms = (f"{percentile(answered, 50) * 1000:7.0f} {max(answered) * 1000:7.0f}" if answered else "-")
+        outcomes = f"{ok}/{busy}/{len(statuses) - ok - busy}"
+        peaks = f"{stats['peak_in_flight']}/{stats['peak_waiting']}"
+        print(f"{name:18} {summarize(run['probes']['health']):>22} {summarize(run['probes']['share']):>22} "
+              f"{outcomes:>20} {chat_ms:>16} {model_calls:12d} {peaks:>22}")
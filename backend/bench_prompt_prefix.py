@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Prompt layout benchmark: composition-in-the-middle vs static-prefix prompts.
+
+Sends the same composer requests to a local stub of the chat completions API
+(llm_stub_server.py, which models OpenAI prefix caching and prefill cost) with:
+
+- legacy: the previous composer prompt, an f-string that put the user's
+  composition and request inside the instructions (only the first sentence
+  was identical between requests)
+- interleaved: the current instructions (composer_prompt.txt) with the
+  composition and request inserted after the first paragraph, i.e. the same
+  tokens as prefix but in the old order
+- prefix: llm_prompts.build_composer_messages - composer_prompt.txt as an
+  identical system prefix, composition and request last
+
+and reports latency, cached prompt tokens and estimated cost per layout.
+Each layout starts with a cold stub cache.
+
+Usage:
+    python bench_prompt_prefix.py
+    python bench_prompt_prefix.py --requests 50 --measures 16
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from openai import OpenAI
+
+from llm_prompts import (COMPOSER_SYSTEM_PROMPT, build_composer_messages, composer_request_text,
+                         format_composition_for_gpt)
+from llm_stub_server import StubLLMServer
+from llm_usage import estimate_cost, usage_counts
+
+# The composer prompt as it was built before composer_prompt.txt
+LEGACY_COMPOSER_TEMPLATE = """You are a guitar composition assistant. The user is working on a guitar tablature composition.
+
+Current composition:
+{tab_context}
+
+User request: {user_message}
+
+You MUST respond with valid JSON in this format:
+
+{{
+  "chat_response": "Your explanation and teaching (required)",
+  "tab_additions": [
+    {{
+      "string": 1,
+      "fret": 0,
+      "duration": 0.25,
+      "measure_offset": 0
+    }}
+  ] or null
+}}
+
+- chat_response: Explain your suggestion conversationally
+- tab_additions: Array of notes to add to the composition (optional)
+  - string: 1-6 (1=high e, 6=low E)
+  - fret: 0-15
+  - duration: 0.0625, 0.125, 0.25, 0.5, 0.75, 1
+  - measure_offset: which measure to add to (0=current, 1=next, etc.)
+
+If the user asks for TAB/patterns/arpeggios/bass lines, include tab_additions.
+If just explaining theory, set tab_additions to null.
+
+Provide helpful, musical suggestions!"""
+
+REQUESTS = [
+    "Add a bass line to this progression",
+    "Write an arpeggio for the last measure",
+    "What key is this in?",
+    "Suggest a fill for the next measure",
+    "Continue this melody",
+]
+
+CHORDS = ["C", "Am", "F", "G", "Dm", "Em"]
+
+
+def random_composition(rng: random.Random, measures: int) -> dict:
+    """Composer-format composition with a chord and eighth notes per measure."""
+    result = {"title": "Bench", "tempo": 100, "timeSignature": "4/4", "measures": []}
+    for _ in range(measures):
+        events = [{"time": i * 0.5, "string": rng.randint(1, 6), "fret": rng.randint(0, 5),
+                   "duration": 0.125} for i in range(8)]
+        result["measures"].append({"chords": [{"name": rng.choice(CHORDS), "time": 0}], "events": events})
+    return result
+
+
+def legacy_messages(tab_context: str, user_message: str):
+    prompt = LEGACY_COMPOSER_TEMPLATE.format(tab_context=tab_context, user_message=user_message)
+    return [{"role": "system", "content": prompt}, {"role": "user", "content": user_message}]
+
+
+def interleaved_messages(tab_context: str, user_message: str):
+    intro, rest = COMPOSER_SYSTEM_PROMPT.split("\n\n", 1)
+    prompt = f"{intro}\n\n{composer_request_text(tab_context, user_message)}\n\n{rest}"
+    return [{"role": "system", "content": prompt}, {"role": "user", "content": user_message}]
+
+
+def run_layout(client: OpenAI, stub: StubLLMServer, build, workload):
+    stub.reset_cache()
+    latencies, prompt, cached, completion, cost = [], 0, 0, 0, 0.0
+    for tab_context, user_message in workload:
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            model="gpt-4o", messages=build(tab_context, user_message),
+            temperature=0.7, max_tokens=1500, response_format={"type": "json_object"})
+        latencies.append(time.perf_counter() - start)
+        counts = usage_counts(response.usage)
+        prompt += counts["prompt_tokens"]
+        cached += counts["cached_tokens"]
+        completion += counts["completion_tokens"]
+        cost += estimate_cost("gpt-4o", counts["prompt_tokens"], counts["cached_tokens"],
+                              counts["completion_tokens"])
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "prompt_tokens": prompt / len(workload),
+        "cached_ratio": cached / prompt if prompt else 0.0,
+        "cost_per_1k": cost / len(workload) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark composer prompt layouts against a stub LLM")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--measures", type=int, default=8, help="Measures per composition")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workload = []
+    for i in range(args.requests):
+        composition = random_composition(rng, args.measures)
+        workload.append((format_composition_for_gpt(composition), REQUESTS[i % len(REQUESTS)]))
+
+    # Prefill-dominated latency model (~0.4 ms per uncached prompt token)
+    stub = StubLLMServer(base_latency=0.03, prefill_seconds_per_token=0.0004,
+                         cached_seconds_per_token=0.00004, output_seconds_per_token=0.0005).start()
+    client = OpenAI(base_url=stub.base_url, api_key="stub", max_retries=0)
+    try:
+        results = {
+            "legacy": run_layout(client, stub, legacy_messages, workload),
+            "interleaved": run_layout(client, stub, interleaved_messages, workload),
+            "prefix": run_layout(client, stub, build_composer_messages, workload),
+        }
+    finally:
+        stub.stop()
+
+    print(f"{args.requests} composer requests, {args.measures} measures each (stub LLM)")
+    print(f"{'layout':12} {'mean ms':>9} {'p50 ms':>9} {'prompt tok':>11} {'cached':>8} {'$ / 1k req':>11}")
+    for name, result in results.items():
+        print(f"{name:12} {result['mean_ms']:9.0f} {result['p50_ms']:9.0f} {result['prompt_tokens']:11.0f} "
+              f"{result['cached_ratio']:7.0%} {result['cost_per_1k']:11.2f}")
+
+    interleaved, prefix = results["interleaved"], results["prefix"]
+    print()
+    print(f"Static prefix vs interleaved (same prompt): mean latency {interleaved['mean_ms']:.0f} -> "
+          f"{prefix['mean_ms']:.0f} ms, cost {interleaved['cost_per_1k']:.2f} -> {prefix['cost_per_1k']:.2f} $ / 1k")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory per event: dict-based vs array-backed TabComposition.
+
+Builds the same synthetic composition both ways and reports tracemalloc
+allocations per event.
+
+Usage:
+    python bench_tab_memory.py [--measures N] [--notes-per-measure N]
+"""
+
+import argparse
+import tracemalloc
+
+from tab_composition import TabComposition
+
+
+def build_dict_composition(measures: int, notes_per_measure: int) -> dict:
+    """Build a composition in the per-event dict shape."""
+    step = 1.0 / notes_per_measure
+    return {
+        "title": "Benchmark",
+        "tempo": 120,
+        "timeSignature": "4/4",
+        "measures": [
+            {
+                "timeSignature": "4/4",
+                "events": [
+                    {
+                        "time": i * step,
+                        "string": 1 + i % 6,
+                        "fret": (m + i) % 13,
+                        "duration": step,
+                        "leftFinger": None
+                    }
+                    for i in range(notes_per_measure)
+                ],
+                "chords": []
+            }
+            for m in range(measures)
+        ],
+        "version": "1.0"
+    }
+
+
+def build_columnar_composition(measures: int, notes_per_measure: int) -> TabComposition:
+    """Build the same composition as columns."""
+    tab = TabComposition("Benchmark", 120, "4/4", notes_per_measure)
+    for m in range(measures):
+        tab.add_measure("4/4")
+        for i in range(notes_per_measure):
+            tab.add_event(i, 1 + i % 6, (m + i) % 13, 1)
+    return tab
+
+
+def measure_allocation(builder, *args) -> int:
+    """Return bytes still allocated by builder(*args) after it returns."""
+    tracemalloc.start()
+    result = builder(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare TabComposition memory per event")
+    parser.add_argument("--measures", type=int, default=2000)
+    parser.add_argument("--notes-per-measure", type=int, default=16)
+    args = parser.parse_args()
+
+    events = args.measures * args.notes_per_measure
+    dict_bytes = measure_allocation(build_dict_composition, args.measures, args.notes_per_measure)
+    column_bytes = measure_allocation(build_columnar_composition, args.measures, args.notes_per_measure)
+
+    print(f"Events: {events}")
+    print(f"  dict measures:   {dict_bytes / events:8.1f} bytes/event ({dict_bytes / 1024 / 1024:.2f} MB)")
+    print(f"  array columns:   {column_bytes / events:8.1f} bytes/event ({column_bytes / 1024 / 1024:.2f} MB)")
+    print(f"  reduction:       {dict_bytes / column_bytes:8.1f}x")
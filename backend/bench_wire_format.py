@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Size and parse-time comparison: verbose vs compact TabComposition JSON.
+
+By default, one synthetic composition is generated per book in ../score,
+sized from the book's page count (MEASURES_PER_PAGE measures per page), since
+the score corpus indexes the books rather than storing converted tabs.
+Existing composition files (e.g. omr_jobs/*/composition.json or shares/*.json)
+can be passed explicitly instead.
+
+Usage:
+    python bench_wire_format.py
+    python bench_wire_format.py omr_jobs/*/composition.json
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from tab_composition import TabComposition
+from tab_wire import encode_compact, decode_compact
+
+SCORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'score')
+MEASURES_PER_PAGE = 12
+
+
+def synthetic_book(title: str, pages: int) -> dict:
+    """Fingerpicking-style book: bass + 8th-note arpeggio, occasional chords."""
+    tab = TabComposition(title, 100, "4/4", 8)
+    for m in range(pages * MEASURES_PER_PAGE):
+        tab.add_measure("4/4", [(0, "C")] if m % 2 == 0 else [])
+        tab.add_event(0, 5 + m % 2, 3, 4)
+        for i in range(8):
+            tab.add_event(i, 1 + (i + m) % 3, (m + i) % 4, 1)
+        if m % 4 == 3:
+            for string in (1, 2, 3):
+                tab.add_event(4, string, 1, 4)
+    return tab.to_dict()
+
+
+def load_corpus(paths):
+    """Yield (name, composition dict) pairs."""
+    if paths:
+        for path in paths:
+            with open(path) as f:
+                data = json.load(f)
+            yield Path(path).name, data.get('composition', data)
+        return
+
+    for index_path in sorted(glob.glob(os.path.join(SCORE_DIR, '*_index.json'))):
+        with open(index_path) as f:
+            index = json.load(f)
+        name = Path(index_path).stem.replace('_index', '')
+        yield name, synthetic_book(name, index.get('total_pages', 1))
+
+
+def time_call(fn, *args, repeat: int = 3) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    compact_separators = (',', ':')
+    totals = {"verbose": 0, "compact": 0, "verbose_gz": 0, "compact_gz": 0}
+
+    print(f"{'composition':32} {'verbose':>10} {'compact':>10} {'gz verb':>9} {'gz comp':>9} "
+          f"{'parse ms':>9} {'parse cmp':>9} {'+decode':>9}")
+
+    for name, composition in load_corpus(sys.argv[1:]):
+        verbose = json.dumps(composition, separators=compact_separators).encode()
+        compact = json.dumps(encode_compact(composition), separators=compact_separators).encode()
+
+        assert decode_compact(json.loads(compact)) == json.loads(verbose), f"Round-trip failed: {name}"
+
+        sizes = {
+            "verbose": len(verbose),
+            "compact": len(compact),
+            "verbose_gz": len(gzip.compress(verbose)),
+            "compact_gz": len(gzip.compress(compact)),
+        }
+        for key, value in sizes.items():
+            totals[key] += value
+
+        parse_verbose = time_call(json.loads, verbose)
+        parse_only = time_call(json.loads, compact)
+        parse_compact = time_call(lambda data: decode_compact(json.loads(data)), compact)
+
+        print(f"{name[:32]:32} {sizes['verbose'] / 1024:9.0f}K {sizes['compact'] / 1024:9.0f}K "
+              f"{sizes['verbose_gz'] / 1024:8.0f}K {sizes['compact_gz'] / 1024:8.0f}K "
+              f"{parse_verbose:9.1f} {parse_only:9.1f} {parse_compact:9.1f}")
+
+    print()
+    print(f"Total: {totals['verbose'] / 1024 / 1024:.1f} MB -> {totals['compact'] / 1024 / 1024:.1f} MB "
+          f"({totals['verbose'] / max(totals['compact'], 1):.1f}x), gzipped "
+          f"{totals['verbose_gz'] / 1024 / 1024:.2f} MB -> {totals['compact_gz'] / 1024 / 1024:.2f} MB "
+          f"({totals['verbose_gz'] / max(totals['compact_gz'], 1):.1f}x)")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Response cache for LLM calls.
+
+Many assistant questions are asked verbatim by different users ("Show me a
+2-5-1 in C Major"). ResponseCache stores parsed model responses under a key
+derived from everything that shapes the answer:
+
+- model name and generation parameters
+- system prompt version (a hash of its text, so editing the prompt
+  invalidates old entries)
+- the conversation history and the user message, with whitespace
+  normalized (case is kept: CM7 and Cm7 are different chords)
+
+Two tiers:
+- memory: LRU (OrderedDict) capped at max_entries
+- disk: one JSON file per key in cache_dir, so entries survive restarts
+
+Both tiers expire entries after ttl_seconds. Hit/miss counters are kept for
+the stats endpoint. The lock only guards the memory tier and counters; disk
+reads, writes and pruning run outside it, so memory hits never wait on I/O.
+Clients can bypass the cache per request (see bypass_requested).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# In-memory entries kept (least recently used evicted first)
+DEFAULT_MAX_ENTRIES = 512
+
+# Entry lifetime in both tiers
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Disk entries kept; the oldest are pruned beyond this
+DEFAULT_MAX_DISK_ENTRIES = 5000
+
+# Request header that skips the cache lookup (the fresh answer is still stored)
+BYPASS_HEADER = 'X-LLM-Cache'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace so trivially different prompts share a key.
+
+    Case is kept: chord symbols depend on it (CM7 is major 7th, Cm7 minor 7th).
+    """
+    return re.sub(r'\s+', ' ', str(text)).strip()
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Short content hash identifying a system prompt revision."""
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]
+
+
+def make_cache_key(model: str, system_prompt_version: str, history: List[Dict],
+                   message: str, params: Optional[Dict] = None) -> str:
+    """
+    Build the cache key for one LLM call.
+
+    Args:
+        model: Model name
+        system_prompt_version: See prompt_version()
+        history: Conversation messages of the request
+        message: Current user message
+        params: Generation parameters that change the output (temperature, max_tokens, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {
+        "model": model,
+        "system": system_prompt_version,
+        "history": [[msg.get('role'), normalize_text(msg.get('content', ''))] for msg in history],
+        "message": normalize_text(message),
+        "params": params or {}
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def bypass_requested(headers) -> bool:
+    """
+    True if the client opted out of cached answers for this request.
+
+    Accepts `X-LLM-Cache: bypass` (or `off`/`0`) and `Cache-Control: no-cache`.
+    """
+    value = (headers.get(BYPASS_HEADER) or '').strip().lower()
+    if value in ('bypass', 'off', '0', 'no'):
+        return True
+    return 'no-cache' in (headers.get('Cache-Control') or '').lower()
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache with an optional disk tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 cache_dir: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        """
+        Args:
+            max_entries: In-memory LRU capacity (0 disables the memory tier)
+            ttl_seconds: Entry lifetime
+            cache_dir: Directory for the disk tier (None disables it)
+            max_disk_entries: Disk entries kept before the oldest are pruned
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                       "stores": 0, "evictions": 0, "expired": 0}
+
+        self._disk_count = 0
+        self._pruning = False
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_count = sum(1 for name in os.listdir(cache_dir) if name.endswith('.json'))
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _load_from_disk(self, key: str, now: float) -> Optional[tuple]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Unreadable LLM cache entry {path}: {e}")
+            return None
+
+        if entry.get('expires_at', 0) <= now:
+            try:
+                os.remove(path)
+                removed = 1
+            except OSError:
+                removed = 0
+            with self._lock:
+                self._disk_count -= removed
+                self._stats["expired"] += 1
+            return None
+        return entry['expires_at'], entry['value']
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+            if not self.cache_dir:
+                self._stats["misses"] += 1
+                return None
+
+        entry = self._load_from_disk(key, now)
+        with self._lock:
+            if entry is not None:
+                self._remember(key, *entry)
+                self._stats["disk_hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in both tiers."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats["stores"] += 1
+
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        existed = os.path.exists(path)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'value': value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not write LLM cache entry {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if not existed:
+                self._disk_count += 1
+            # One thread prunes at a time; the others carry on
+            prune = self._disk_count > self.max_disk_entries and not self._pruning
+            self._pruning = self._pruning or prune
+        if prune:
+            try:
+                self._prune_disk()
+            finally:
+                with self._lock:
+                    self._pruning = False
+
+    def _prune_disk(self) -> None:
+        """
+        Drop expired entries, then the oldest, down to 90% of max_disk_entries.
+
+        Runs without the lock; only the resulting counts are updated under it.
+        """
+        now = time.time()
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        files.sort()
+
+        keep = int(self.max_disk_entries * 0.9)
+        cutoff = now - self.ttl_seconds
+        removed = 0
+        for index, (mtime, path) in enumerate(files):
+            if mtime > cutoff and len(files) - index <= keep:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_count = len(files) - removed
+            self._stats["evictions"] += removed
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.json'):
+                        os.remove(os.path.join(self.cache_dir, name))
+            self._disk_count = 0
+
+    def stats(self) -> Dict:
+        """Counters and sizes for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+            stats["memory_entries"] = len(self._entries)
+            stats["disk_entries"] = self._disk_count if self.cache_dir else None
+            stats["ttl_seconds"] = self.ttl_seconds
+            return stats
+
+
+def cache_from_env(default_dir: str) -> Optional[ResponseCache]:
+    """
+    Build the server's cache from environment settings.
+
+    LLM_CACHE=0 disables caching; LLM_CACHE_DIR (default default_dir, empty
+    for memory only), LLM_CACHE_MAX_ENTRIES and LLM_CACHE_TTL_SECONDS tune it.
+    """
+    if os.getenv('LLM_CACHE', '1') == '0':
+        return None
+    return ResponseCache(
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES') or DEFAULT_MAX_ENTRIES),
+        ttl_seconds=float(os.getenv('LLM_CACHE_TTL_SECONDS') or DEFAULT_TTL_SECONDS),
+        cache_dir=os.getenv('LLM_CACHE_DIR', default_dir) or None
+    )
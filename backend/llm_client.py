@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Shared OpenAI client with explicit pooling, retries and a circuit breaker.
+
+The default OpenAI client allows 1000 connections, waits up to 10 minutes for
+a response and retries twice on its own schedule. When the upstream slows
+down, requests pile up behind it until every worker thread is stuck.
+LLMClient wraps one process-wide client configured explicitly:
+
+- Transport: a bounded keepalive connection pool (max_connections,
+  max_keepalive) and per-call connect/read/write/pool timeouts. The read
+  timeout applies between bytes, so it bounds each streamed chunk too.
+- Retries: the client's own retries are off (max_retries=0); create() retries
+  429, 5xx, connection errors and timeouts with full-jitter exponential
+  backoff. A Retry-After (or retry-after-ms) header is honored when it is
+  within max_retry_after; a longer one is not waited out.
+- Circuit breaker: after failure_threshold consecutive failed calls (after
+  their retries) the circuit opens and calls fail at once with
+  CircuitOpenError for reset_timeout seconds. Then a single trial call is let
+  through: success closes the circuit, failure opens it again.
+
+Client errors (400, 401, ...) are raised without retrying and don't count as
+upstream failures.
+
+    llm = client_from_env(api_key)
+    response = llm.create(model="gpt-4o", messages=[...])
+"""
+
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import openai
+from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI, Timeout
+
+# The SDK's transport exports Timeout but not Limits; take its class from the
+# SDK's default, so limits always match the transport DefaultHttpxClient uses
+Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+# Connection pool: open connections to the API and idle ones kept alive
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE = 16
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Per-call timeouts in seconds; read is the longest gap between received bytes
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_WRITE_TIMEOUT = 10.0
+DEFAULT_POOL_TIMEOUT = 5.0
+
+# Retries after the first attempt, and the backoff ceiling per delay
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+
+# Longest Retry-After waited out; longer ones fail the call right away
+DEFAULT_MAX_RETRY_AFTER = 20.0
+
+# Consecutive failed calls that open the circuit, and how long it stays open
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Errors worth another attempt: rate limits, server errors, network trouble
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError,
+                    openai.APIConnectionError)  # APITimeoutError is an APIConnectionError
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM upstream unavailable, retry in {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the response's retry-after-ms or Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # HTTP date form
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)."""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._stats = {"opened": 0, "short_circuited": 0}
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its trial call running
+        """
+        with self._lock:
+            if self._state == "open":
+                remaining = self._opened_at + self.reset_timeout - self._clock()
+                if remaining > 0:
+                    self._stats["short_circuited"] += 1
+                    raise CircuitOpenError(remaining)
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._trial_running:
+                    self._stats["short_circuited"] += 1
+                    raise CircuitOpenError(1.0)
+                self._trial_running = True
+
+    def check(self) -> None:
+        """
+        Raise CircuitOpenError while the circuit is open, without taking the trial call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and its reset_timeout has not passed
+        """
+        with self._lock:
+            if self._state == "open":
+                remaining = self._opened_at + self.reset_timeout - self._clock()
+                if remaining > 0:
+                    self._stats["short_circuited"] += 1
+                    raise CircuitOpenError(remaining)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed upstream (e.g. a 400)."""
+        with self._lock:
+            self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and self._clock() >= self._opened_at + self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def stats(self) -> Dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures,
+                    "failure_threshold": self.failure_threshold, "reset_timeout_seconds": self.reset_timeout,
+                    **self._stats}
+
+
+class LLMClient:
+    """OpenAI chat completions with retries, backoff and a circuit breaker."""
+
+    def __init__(self, client: OpenAI, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 max_retry_after: float = DEFAULT_MAX_RETRY_AFTER, breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        """
+        Args:
+            client: OpenAI client, created with max_retries=0
+            max_retries: Attempts after the first one
+            base_delay: Backoff scale; attempt n waits up to base_delay * 2**n
+            max_delay: Cap for each backoff delay
+            max_retry_after: Longest Retry-After to wait; longer ones end the retries
+            breaker: Circuit breaker (a default one if None)
+            sleep, rng: Injectable for tests
+        """
+        self.client = client
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "retry_after_honored": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def backoff(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Seconds to wait before retry number attempt+1, or None to stop retrying."""
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            if requested > self.max_retry_after:
+                return None
+            self._count("retry_after_honored")
+            return requested
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def create(self, **kwargs) -> Any:
+        """
+        client.chat.completions.create(**kwargs) with retries. For stream=True
+        only opening the stream is retried.
+
+        Raises:
+            CircuitOpenError: If the upstream is considered unhealthy
+            openai.APIError: The last error once retries are exhausted, or a non-retryable one
+        """
+        self.breaker.before_call()
+        self._count("calls")
+        attempt = 0
+        settled = False
+        try:
+            while True:
+                try:
+                    response = self.client.chat.completions.create(**kwargs)
+                except Exception as e:
+                    if not is_retryable(e):
+                        self._count("failed")
+                        raise
+                    delay = self.backoff(attempt, e) if attempt < self.max_retries else None
+                    if delay is None:
+                        settled = True
+                        self.breaker.record_failure()
+                        self._count("failed")
+                        raise
+                    attempt += 1
+                    self._count("retries")
+                    print(f"Warning: OpenAI call failed ({type(e).__name__}), retry {attempt} in {delay:.1f} s")
+                    self._sleep(delay)
+                    continue
+                settled = True
+                self.breaker.record_success()
+                self._count("succeeded")
+                return response
+        finally:
+            # Client errors and anything else (KeyboardInterrupt, ...) end a
+            # half-open trial without deciding it
+            if not settled:
+                self.breaker.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+
+def make_http_client(max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                     max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                     keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                     connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                     read_timeout: float = DEFAULT_READ_TIMEOUT,
+                     write_timeout: float = DEFAULT_WRITE_TIMEOUT,
+                     pool_timeout: float = DEFAULT_POOL_TIMEOUT):
+    """Pooled HTTP client for the OpenAI SDK with explicit limits and timeouts."""
+    return DefaultHttpxClient(
+        limits=Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                      keepalive_expiry=keepalive_expiry),
+        timeout=Timeout(connect=connect_timeout, read=read_timeout, write=write_timeout,
+                        pool=pool_timeout)
+    )
+
+
+def client_from_env(api_key: str, base_url: Optional[str] = None) -> LLMClient:
+    """
+    Build the server's LLM client from environment settings.
+
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE, LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT,
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_MAX_RETRY_AFTER,
+    LLM_BREAKER_FAILURES and LLM_BREAKER_RESET tune it. base_url defaults to
+    OPENAI_BASE_URL, as in the SDK.
+    """
+    def setting(name, default):
+        return float(os.getenv(name) or default)
+
+    http_client = make_http_client(
+        max_connections=int(setting('LLM_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive=int(setting('LLM_MAX_KEEPALIVE', DEFAULT_MAX_KEEPALIVE)),
+        connect_timeout=setting('LLM_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=setting('LLM_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)
+    )
+    client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0,
+                    timeout=http_client.timeout)
+    return LLMClient(
+        client,
+        max_retries=int(setting('LLM_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+        base_delay=setting('LLM_RETRY_BASE_DELAY', DEFAULT_BASE_DELAY),
+        max_retry_after=setting('LLM_MAX_RETRY_AFTER', DEFAULT_MAX_RETRY_AFTER),
+        breaker=CircuitBreaker(
+            failure_threshold=int(setting('LLM_BREAKER_FAILURES', DEFAULT_FAILURE_THRESHOLD)),
+            reset_timeout=setting('LLM_BREAKER_RESET', DEFAULT_RESET_TIMEOUT)
+        )
+    )
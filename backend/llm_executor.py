@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Bounded thread pool for blocking LLM calls.
+
+OpenAI calls take seconds. Run on the request threads, a few concurrent
+chats can take every worker thread, and /health and share loads queue behind
+them. LLMExecutor runs the calls on a dedicated I/O pool and admits at most
+`max_in_flight` of them at a time. Up to `max_queued` more may wait
+`queue_timeout` seconds for a slot; anything beyond that is rejected at once
+with LLMBusyError (the server answers 503 with Retry-After). So LLM requests
+can tie up at most max_in_flight + max_queued request threads, and the rest
+keep serving the other endpoints.
+
+    response = executor.run(client.chat.completions.create, timeout=60, model=..., ...)
+    for chunk in executor.iterate(client.chat.completions.create, stream=True, ...):
+        ...
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Marks the end of a streamed result in the hand-off queue
+_DONE = object()
+
+
+class LLMBusyError(Exception):
+    """Raised when the in-flight limit is reached and no slot frees up in time."""
+
+
+class LLMExecutor:
+    """Runs LLM calls on a bounded pool with admission control."""
+
+    def __init__(self, max_in_flight: int = 8, max_queued: int = 8, queue_timeout: float = 10.0):
+        """
+        Args:
+            max_in_flight: Calls running at once (pool size)
+            max_queued: Calls allowed to wait for a slot; more are rejected immediately
+            queue_timeout: Seconds a call may wait for a slot before it is rejected
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._counters = {"admitted": 0, "rejected": 0, "completed": 0, "failed": 0,
+                          "peak_in_flight": 0, "peak_waiting": 0}
+        self._wait_seconds = 0.0
+
+    # ------------------------------------------------------------------
+
+    def _admit(self, wait: bool = True) -> None:
+        start = time.perf_counter()
+        with self._cond:
+            if self._in_flight >= self.max_in_flight:
+                if not wait or self._waiting >= self.max_queued:
+                    self._counters["rejected"] += 1
+                    raise LLMBusyError("Too many LLM requests in flight")
+                self._waiting += 1
+                self._counters["peak_waiting"] = max(self._counters["peak_waiting"], self._waiting)
+                try:
+                    deadline = start + self.queue_timeout
+                    while self._in_flight >= self.max_in_flight:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            self._counters["rejected"] += 1
+                            raise LLMBusyError("Timed out waiting for an LLM slot")
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+            self._counters["peak_in_flight"] = max(self._counters["peak_in_flight"], self._in_flight)
+            self._wait_seconds += time.perf_counter() - start
+
+    def _release(self, failed: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._counters["failed" if failed else "completed"] += 1
+            self._cond.notify()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) on the pool.
+
+        Raises:
+            LLMBusyError: If no slot is available within queue_timeout
+        """
+        self._admit()
+        return self._start(fn, args, kwargs)
+
+    def try_submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Like submit(), but never waits for a slot (for optional background calls).
+
+        Raises:
+            LLMBusyError: If all max_in_flight slots are taken
+        """
+        self._admit(wait=False)
+        return self._start(fn, args, kwargs)
+
+    def _start(self, fn: Callable, args, kwargs) -> Future:
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(failed=True)
+            raise
+        future.add_done_callback(lambda f: self._release(failed=f.exception() is not None))
+        return future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run fn on the pool and wait for its result.
+
+        Raises:
+            LLMBusyError: If no slot is available within queue_timeout
+            TimeoutError: If the call takes longer than timeout seconds (it keeps
+                its slot until it actually finishes)
+        """
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def iterate(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Iterator:
+        """
+        Call fn on the pool and iterate its (streamed) result from the caller.
+
+        The slot is taken before returning, so LLMBusyError is raised here
+        rather than mid-stream; it is held until the stream is exhausted or the
+        consumer stops (e.g. the client disconnected).
+
+        Args:
+            timeout: Max seconds to wait for each item
+        """
+        items: "queue.Queue" = queue.Queue()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                result = fn(*args, **kwargs)
+                try:
+                    for item in result:
+                        if cancelled.is_set():
+                            break
+                        items.put(item)
+                finally:
+                    if hasattr(result, "close"):
+                        result.close()
+            except BaseException as e:
+                items.put(_Failure(e))
+                raise
+            finally:
+                items.put(_DONE)
+
+        self.submit(produce)
+
+        def consume():
+            try:
+                while True:
+                    try:
+                        item = items.get(timeout=timeout)
+                    except queue.Empty:
+                        raise TimeoutError(f"No LLM output for {timeout} seconds")
+                    if item is _DONE:
+                        return
+                    if isinstance(item, _Failure):
+                        raise item.error
+                    yield item
+            finally:
+                cancelled.set()
+
+        return consume()
+
+    def stats(self) -> Dict:
+        """Limits, current load and counters."""
+        with self._cond:
+            admitted = self._counters["admitted"]
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queued": self.max_queued,
+                "queue_timeout_seconds": self.queue_timeout,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                **self._counters,
+                "mean_wait_ms": round(self._wait_seconds / admitted * 1000, 1) if admitted else 0.0
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class _Failure:
+    """An exception raised by a streaming producer, handed to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def executor_from_env() -> LLMExecutor:
+    """Build the LLM executor from LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUED and LLM_QUEUE_TIMEOUT."""
+    return LLMExecutor(
+        max_in_flight=int(os.getenv('LLM_MAX_IN_FLIGHT', 8)),
+        max_queued=int(os.getenv('LLM_MAX_QUEUED', 8)),
+        queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', 10))
+    )
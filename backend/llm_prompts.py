@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Prompt construction for the LLM endpoints.
+
+Prompts are laid out for provider-side prefix caching: the static
+instructions (system_prompt.txt, composer_prompt.txt) always come first and
+are byte-identical across requests, and everything that varies per request
+(history, composition, user message) comes after them. OpenAI caches prompt
+prefixes of 1024+ tokens, so only the per-request tail is processed at full
+cost when the prefix is warm. Prompts long enough to be cached are also sent
+with a prompt_cache_key, so requests sharing the prefix are routed to the same
+cache; shorter prompts are not padded to qualify.
+"""
+
+import hashlib
+import os
+from fractions import Fraction
+from math import gcd
+from typing import Dict, List, Optional
+
+from prompt_budget import count_tokens
+
+PROMPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shortest prefix the provider caches
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Default token budget for the composition in a composer prompt; measures are
+# added newest first until it is used up
+COMPOSITION_TOKEN_BUDGET = 1200
+
+# Tab grid resolution (columns per whole note), and the finest grid used when
+# onsets fall between eighth-note steps (96 covers triplets and 32nd notes)
+TAB_GRID_DENOMINATOR = 8
+TAB_MAX_GRID_DENOMINATOR = 96
+
+STRING_LABELS = {1: "e", 2: "B", 3: "G", 4: "D", 5: "A", 6: "E"}
+
+# Duration markers by note value (fraction of a whole note)
+DURATION_MARKERS = {
+    Fraction(1): "w",
+    Fraction(1, 2): "h",
+    Fraction(1, 4): "q",
+    Fraction(1, 8): "e",
+    Fraction(1, 16): "s",
+    Fraction(1, 32): "t",
+}
+
+
+def load_prompt(filename: str) -> str:
+    """Read a prompt file from the backend directory."""
+    with open(os.path.join(PROMPTS_DIR, filename), 'r') as f:
+        return f.read()
+
+
+ASSISTANT_SYSTEM_PROMPT = load_prompt('system_prompt.txt')
+COMPOSER_SYSTEM_PROMPT = load_prompt('composer_prompt.txt')
+
+
+def prompt_cache_params(name: str, system_prompt: str) -> Dict[str, str]:
+    """
+    Extra chat completion arguments for requests led by system_prompt.
+
+    Returns:
+        {"prompt_cache_key": "<name>-<prompt hash>"}, or {} if the prompt is
+        too short to be cached
+    """
+    if count_tokens(system_prompt) < PROMPT_CACHE_MIN_TOKENS:
+        return {}
+    return {"prompt_cache_key": f"{name}-{hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]}"}
+
+
+def duration_marker(duration) -> str:
+    """Tab-grid duration marker: w h q e s t, '.' for dotted, '3' for triplets."""
+    value = Fraction(duration).limit_denominator(TAB_MAX_GRID_DENOMINATOR)
+    for base, marker in DURATION_MARKERS.items():
+        if value == base:
+            return marker
+        if value == base * Fraction(3, 2):
+            return marker + "."
+        if value == base * Fraction(2, 3):
+            return marker + "3"
+    return str(value)
+
+
+def _format_beat(time, beat_unit: int) -> str:
+    return f"{float(time) * beat_unit + 1:g}"
+
+
+def encode_measure_tab(measure: Dict, number: int, default_time_signature: str = "4/4") -> str:
+    """
+    Render one measure as a compact tab grid.
+
+    Six string lines (high e first) with one column per grid step (an eighth
+    note unless onsets need a finer grid), followed by a line with a duration
+    marker under each onset. Columns are separated by "-"; columns holding
+    two-digit frets or long markers are widened on every line, so onsets stay
+    aligned.
+
+    Args:
+        measure: Composition measure ({"events": [...], "chords": [...]})
+        number: 1-based measure number for the header
+        default_time_signature: Composition time signature (shown only if different)
+
+    Returns:
+        Tab text, e.g. "M1 C@1 G@3" followed by the grid lines
+    """
+    time_signature = measure.get('timeSignature') or default_time_signature
+    beats, beat_unit = (int(part) for part in time_signature.split('/'))
+
+    header = f"M{number}"
+    if time_signature != default_time_signature:
+        header += f" ({time_signature})"
+    chords = measure.get('chords') or []
+    if chords:
+        header += " " + " ".join(f"{c['name']}@{_format_beat(c.get('time', 0), beat_unit)}" for c in chords)
+
+    events = measure.get('events') or []
+    if not events:
+        return header + ": empty"
+
+    onsets = [Fraction(e.get('time', 0)).limit_denominator(TAB_MAX_GRID_DENOMINATOR) for e in events]
+    grid = TAB_GRID_DENOMINATOR
+    for onset in onsets:
+        grid = grid * onset.denominator // gcd(grid, onset.denominator)
+    grid = min(grid, TAB_MAX_GRID_DENOMINATOR)
+    if grid != TAB_GRID_DENOMINATOR:
+        header += f" grid 1/{grid}"
+
+    frets_by_slot: Dict[int, Dict[int, str]] = {}
+    durations_by_slot: Dict[int, float] = {}
+    length = Fraction(beats, beat_unit)
+    for event, onset in zip(events, onsets):
+        slot = round(onset * grid)
+        duration = event.get('duration') or 0
+        length = max(length, onset + Fraction(duration).limit_denominator(TAB_MAX_GRID_DENOMINATOR))
+        if duration and (slot not in durations_by_slot or duration < durations_by_slot[slot]):
+            durations_by_slot[slot] = duration
+        if event.get('string') and event.get('fret') is not None and not event.get('isRest'):
+            frets_by_slot.setdefault(slot, {})[event['string']] = str(event['fret'])
+        else:
+            frets_by_slot.setdefault(slot, {})
+
+    slots = max(int(-(-length * grid // 1)), max(frets_by_slot) + 1)
+    markers = {slot: duration_marker(d) for slot, d in durations_by_slot.items()}
+    widths = [max([len(fret) for fret in frets_by_slot.get(slot, {}).values()]
+                  + [len(markers.get(slot, "")), 1])
+              for slot in range(slots)]
+
+    lines = [header]
+    for string in range(1, 7):
+        cells = "".join(frets_by_slot.get(slot, {}).get(string, "").ljust(width + 1, "-")
+                        for slot, width in enumerate(widths))
+        lines.append(f"{STRING_LABELS[string]}|{cells}|")
+    lines.append(("  " + "".join(markers.get(slot, "").ljust(width + 1)
+                                 for slot, width in enumerate(widths))).rstrip())
+    return "\n".join(lines)
+
+
+def format_composition_for_gpt(composition, selected_region=None, token_budget=COMPOSITION_TOKEN_BUDGET):
+    """
+    Format composition data as compact tab for GPT context.
+
+    Measures are encoded with encode_measure_tab and added newest first until
+    token_budget is reached (at least one measure is always included).
+
+    Args:
+        composition: Composition dict with "measures"
+        selected_region: Optional {"start_measure", "end_measure"} (0-based, inclusive)
+        token_budget: Max tokens for the formatted text, or None for no limit
+
+    Returns:
+        Text for the composer prompt
+    """
+    if not composition or 'measures' not in composition:
+        return "No composition data available."
+
+    measures = composition['measures']
+    time_signature = composition.get('timeSignature', '4/4')
+
+    # Determine which measures may be included
+    if selected_region:
+        start = selected_region.get('start_measure', 0)
+        end = min(selected_region.get('end_measure', len(measures)), len(measures) - 1)
+    else:
+        start, end = 0, len(measures) - 1
+
+    output = [f"Time Signature: {time_signature}", f"Tempo: {composition.get('tempo', 120)} BPM"]
+    used = count_tokens("\n".join(output)) + 20  # Room for the region line
+
+    blocks = []
+    first = end + 1
+    for index in range(end, start - 1, -1):
+        block = encode_measure_tab(measures[index], index + 1, time_signature)
+        tokens = count_tokens(block) + 1
+        if blocks and token_budget is not None and used + tokens > token_budget:
+            break
+        blocks.append(block)
+        used += tokens
+        first = index
+    blocks.reverse()
+
+    if selected_region:
+        region = f"Selected region: Measures {start + 1} to {end + 1}"
+        if first > start:
+            region += f" (showing measures {first + 1}-{end + 1})"
+        output.insert(0, region)
+    elif first > 0:
+        output.insert(0, f"Showing last {len(blocks)} measures (total: {len(measures)} measures)")
+
+    return "\n".join(output + [""] + blocks)
+
+
+def composer_request_text(tab_context: str, user_message: str) -> str:
+    """The per-request part of a composer prompt."""
+    return f"Current composition:\n{tab_context}\n\nUser request: {user_message}"
+
+
+def build_composer_messages(tab_context: str, user_message: str) -> List[Dict[str, str]]:
+    """Static composer instructions first, then the composition and request."""
+    return [
+        {"role": "system", "content": COMPOSER_SYSTEM_PROMPT},
+        {"role": "user", "content": composer_request_text(tab_context, user_message)}
+    ]
+
+
+def build_assistant_messages(history: List[Dict[str, str]], user_message: str,
+                             system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Static assistant instructions first, then (budgeted) history and the message."""
+    return ([{"role": "system", "content": system_prompt or ASSISTANT_SYSTEM_PROMPT}]
+            + list(history)
+            + [{"role": "user", "content": user_message}])
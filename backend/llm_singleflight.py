@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Coalescing of identical in-flight LLM requests ("singleflight").
+
+When a class clicks the same suggested prompt at once, every request misses
+the response cache (nothing is stored until the first answer arrives) and
+each one pays for its own OpenAI call. SingleFlight lets the first request
+for a key make the call while concurrent requests with the same key wait for
+it and share its result, or its exception. Once the call finishes the key is
+released; later requests go through the response cache as usual.
+
+Each waiting duplicate still holds a request thread, so at most max_waiting
+of them wait at a time; beyond that a duplicate makes its own call (and is
+subject to the LLM in-flight limit like any other request).
+
+Keys are the response cache keys (llm_cache.make_cache_key), so requests are
+duplicates when model, prompt version, history, message and parameters match
+after normalization.
+
+    result, shared = singleflight.do(key, call_openai, timeout=130)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Flight:
+    """One in-progress call and the requests waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time and shares its outcome with duplicates."""
+
+    def __init__(self, max_waiting: Optional[int] = None):
+        """
+        Args:
+            max_waiting: Duplicates allowed to wait at once, across keys (None: no limit)
+        """
+        self.max_waiting = max_waiting
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._waiting = 0
+        self._stats = {"calls": 0, "coalesced": 0, "shared_errors": 0, "follower_timeouts": 0,
+                       "overflow": 0, "peak_followers": 0}
+        self._wait_seconds = 0.0
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Return fn()'s result, calling fn only if no call for key is in flight.
+
+        Args:
+            key: Request identity (e.g. the response cache key)
+            fn: The call to make; its exception is re-raised to every waiter
+            timeout: Max seconds a duplicate waits for the call in flight
+
+        Returns:
+            (result, shared) - shared is True if another request made the call
+
+        Raises:
+            TimeoutError: If a duplicate waited longer than timeout
+        """
+        overflow = False
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["calls"] += 1
+            elif self.max_waiting is not None and self._waiting >= self.max_waiting:
+                overflow = True
+                self._stats["overflow"] += 1
+            else:
+                flight.followers += 1
+                self._waiting += 1
+                self._stats["peak_followers"] = max(self._stats["peak_followers"], flight.followers)
+
+        if overflow:
+            return fn(), False
+
+        if leader:
+            try:
+                flight.result = fn()
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.result, False
+
+        start = time.perf_counter()
+        finished = flight.done.wait(timeout)
+        with self._lock:
+            flight.followers -= 1
+            self._waiting -= 1
+            if not finished:
+                self._stats["follower_timeouts"] += 1
+        if not finished:
+            raise TimeoutError("Timed out waiting for an identical request in flight")
+        with self._lock:
+            if flight.error is not None:
+                self._stats["shared_errors"] += 1
+            else:
+                self._stats["coalesced"] += 1
+                self._wait_seconds += time.perf_counter() - start
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def stats(self) -> Dict:
+        """Calls made, requests served by another request's call, and calls and duplicates in flight."""
+        with self._lock:
+            requests = self._stats["calls"] + self._stats["coalesced"]
+            return {
+                **self._stats,
+                "max_waiting": self.max_waiting,
+                "in_flight_keys": len(self._flights),
+                "waiting": self._waiting,
+                "coalesced_rate": round(self._stats["coalesced"] / requests, 3) if requests else 0.0,
+                "mean_coalesced_wait_ms": (round(self._wait_seconds / self._stats["coalesced"] * 1000, 1)
+                                           if self._stats["coalesced"] else 0.0)
+            }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Streaming helpers for structured (JSON object) LLM responses.
+
+The assistant's model output is one JSON object, e.g.
+{"chat_response": "...", "fretboard_sequence": [...], "tab_display": "..."}.
+StreamingJSONParser consumes it incrementally as tokens arrive and reports:
+
+- ("delta", key, text): new characters of a streamed string value
+  (chat_response by default), decoded, as soon as they are generated
+- ("value", key, value): a top-level value, parsed, as soon as it closes
+
+stream_structured_events() turns a sequence of text chunks into Server-Sent
+Events for /api/assistant streaming mode.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Event = Tuple[str, str, Any]
+
+_WHITESPACE = ' \t\r\n'
+
+
+class StreamingJSONParser:
+    """Incremental parser for a single top-level JSON object."""
+
+    def __init__(self, stream_keys: Iterable[str] = ("chat_response",)):
+        self.stream_keys = set(stream_keys)
+        self._text: List[str] = []
+        self._state = "start"
+        self._key: Optional[str] = None
+        self._raw: List[str] = []        # Raw characters of the current key or value
+        self._depth = 0                  # Nesting depth inside an object/array value
+        self._in_string = False          # Inside a string nested in an object/array value
+        self._escape = False             # Previous character was a backslash
+        self._escape_start: Optional[int] = None  # Raw index of an unfinished escape
+        self._unicode_digits = 0         # Hex digits still expected for a \\u escape
+        self._high_surrogate = False     # Last escape was a high surrogate
+        self._emitted = 0                # Raw characters of a streamed string already emitted
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the object has been read."""
+        return self._state == "done"
+
+    def feed(self, text: str) -> List[Event]:
+        """Consume a chunk of model output and return the events it completes."""
+        self._text.append(text)
+        events: List[Event] = []
+        for char in text:
+            self._consume(char, events)
+
+        if self._state == "string" and self._key in self.stream_keys:
+            self._emit_delta(events, final=False)
+        return events
+
+    def result(self) -> Dict:
+        """Parse the complete text (raises json.JSONDecodeError if it is invalid)."""
+        return json.loads(''.join(self._text))
+
+    # ------------------------------------------------------------------
+
+    def _emit_delta(self, events: List[Event], final: bool) -> None:
+        end = len(self._raw)
+        if not final and self._escape_start is not None:
+            end = self._escape_start  # Hold back a partial escape sequence
+        if end > self._emitted:
+            segment = ''.join(self._raw[self._emitted:end])
+            events.append(("delta", self._key, json.loads(f'"{segment}"', strict=False)))
+            self._emitted = end
+
+    def _finish_value(self, value: Any, events: List[Event]) -> None:
+        events.append(("value", self._key, value))
+        self._state = "after_value"
+
+    def _consume_string_char(self, char: str) -> bool:
+        """Track escapes for a string value. Returns True at the closing quote."""
+        raw = self._raw
+        if self._unicode_digits:
+            raw.append(char)
+            self._unicode_digits -= 1
+            if not self._unicode_digits:
+                code = int(''.join(raw[-4:]), 16)
+                if 0xD800 <= code <= 0xDBFF and not self._high_surrogate:
+                    self._high_surrogate = True  # Keep holding until the low surrogate
+                else:
+                    self._high_surrogate = False
+                    self._escape_start = None
+            return False
+        if self._escape:
+            raw.append(char)
+            self._escape = False
+            if char == 'u':
+                self._unicode_digits = 4
+            else:
+                self._high_surrogate = False
+                self._escape_start = None
+            return False
+        if char == '\\':
+            if not self._high_surrogate:
+                self._escape_start = len(raw)
+            raw.append(char)
+            self._escape = True
+            return False
+        if self._high_surrogate:
+            self._high_surrogate = False
+            self._escape_start = None
+        if char == '"':
+            return True
+        raw.append(char)
+        return False
+
+    def _consume(self, char: str, events: List[Event]) -> None:
+        state = self._state
+
+        if state == "start":
+            if char == '{':
+                self._state = "key_or_end"
+            elif char not in _WHITESPACE:
+                raise ValueError(f"Expected a JSON object, got {char!r}")
+
+        elif state == "key_or_end":
+            if char == '"':
+                self._raw = []
+                self._state = "key"
+            elif char == '}':
+                self._state = "done"
+
+        elif state == "key":
+            if self._consume_string_char(char):
+                self._key = json.loads(f'"{"".join(self._raw)}"', strict=False)
+                self._state = "colon"
+
+        elif state == "colon":
+            if char == ':':
+                self._state = "value_start"
+
+        elif state == "value_start":
+            if char in _WHITESPACE:
+                return
+            self._raw = []
+            if char == '"':
+                self._emitted = 0
+                self._state = "string"
+            elif char in '{[':
+                self._raw.append(char)
+                self._depth = 1
+                self._in_string = False
+                self._escape = False
+                self._state = "nested"
+            else:
+                self._raw.append(char)
+                self._state = "scalar"
+
+        elif state == "string":
+            if self._consume_string_char(char):
+                if self._key in self.stream_keys:
+                    self._emit_delta(events, final=True)
+                value = json.loads(f'"{"".join(self._raw)}"', strict=False)
+                self._finish_value(value, events)
+
+        elif state == "nested":
+            self._raw.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    self._finish_value(json.loads(''.join(self._raw), strict=False), events)
+
+        elif state == "scalar":
+            if char in ',}' or char in _WHITESPACE:
+                self._finish_value(json.loads(''.join(self._raw)), events)
+                self._consume(char, events)
+            else:
+                self._raw.append(char)
+
+        elif state == "after_value":
+            if char == ',':
+                self._state = "key_or_end"
+            elif char == '}':
+                self._state = "done"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_structured_events(chunks: Iterable[str],
+                             required_key: str = "chat_response",
+                             on_complete: Optional[Callable[[Dict], None]] = None) -> Iterator[str]:
+    """
+    Turn streamed model output into SSE messages.
+
+    Events:
+    - chat_response: {"delta": "..."} for each new piece of chat_response text
+    - field: {"key": ..., "value": ...} when any other top-level value closes
+    - done: the complete response object
+    - error: {"error": "..."} if the output is not valid JSON or lacks required_key
+
+    Args:
+        chunks: Text deltas from the model
+        required_key: Key the final object must contain
+        on_complete: Called with the complete response object before "done"
+    """
+    parser = StreamingJSONParser(stream_keys=(required_key,))
+    try:
+        for chunk in chunks:
+            for kind, key, value in parser.feed(chunk):
+                if kind == "delta":
+                    yield format_sse(required_key, {"delta": value})
+                elif key != required_key:
+                    yield format_sse("field", {"key": key, "value": value})
+
+        response_json = parser.result()
+        if required_key not in response_json:
+            yield format_sse("error", {"error": f"Invalid response from AI - missing {required_key}"})
+            return
+        if on_complete:
+            on_complete(response_json)
+        yield format_sse("done", response_json)
+
+    except (ValueError, json.JSONDecodeError) as e:
+        yield format_sse("error", {"error": f"Invalid JSON from AI: {e}"})
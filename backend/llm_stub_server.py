@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Local stub of the OpenAI chat completions endpoint, for benchmarks and tests.
+
+Serves POST /v1/chat/completions (plain and stream=True) on a local port, so
+the real OpenAI client can be pointed at it with base_url. It models the two
+things that matter for prompt layout and latency work:
+
+- Prompt prefix caching like OpenAI's: prompts are hashed in 128-token blocks;
+  the longest previously seen prefix of at least 1024 tokens is reported as
+  usage.prompt_tokens_details.cached_tokens.
+- Latency: a fixed overhead, plus prefill time per uncached and cached prompt
+  token, plus generation time per output token (streamed token by token).
+
+Replies are JSON objects with a chat_response (plus tab_additions for composer
+prompts) padded to about completion_tokens tokens.
+
+Faults can be injected to test retries and circuit breaking: scripted ones
+for the next requests with inject_faults() (an error status with optional
+Retry-After, an extra delay, or a dropped connection), and random errors
+with fail_rate.
+
+Usage:
+    python llm_stub_server.py --port 8099
+    python llm_stub_server.py --port 8099 --fail-rate 0.3 --fail-status 503 --retry-after 1
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 python server.py
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prompt_budget import CHARS_PER_TOKEN, count_tokens
+
+# OpenAI caches prompt prefixes from 1024 tokens, in 128-token increments
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+# Prefix block hashes remembered
+CACHE_MAX_BLOCKS = 200000
+
+
+def prompt_text(messages: List[Dict]) -> str:
+    """Flatten chat messages the way the prefix cache sees them."""
+    return "".join(f"<|{m.get('role')}|>{m.get('content', '')}\n" for m in messages)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out or disconnect mid-reply are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubLLMServer:
+    """Threaded HTTP server imitating the chat completions API."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 base_latency: float = 0.05,
+                 prefill_seconds_per_token: float = 0.0002,
+                 cached_seconds_per_token: float = 0.00002,
+                 output_seconds_per_token: float = 0.002,
+                 completion_tokens: int = 120,
+                 respond: Optional[Callable[[Dict], str]] = None,
+                 fail_rate: float = 0.0, fail_status: int = 503,
+                 retry_after: Optional[float] = None, seed: Optional[int] = None):
+        """
+        Args:
+            host, port: Address to listen on (port 0 picks a free port)
+            base_latency: Seconds of fixed overhead per request
+            prefill_seconds_per_token: Time per uncached prompt token
+            cached_seconds_per_token: Time per cached prompt token
+            output_seconds_per_token: Time per generated token
+            completion_tokens: Approximate length of generated replies
+            respond: Optional fn(request_body) -> reply text, replacing the default
+            fail_rate: Fraction of requests answered with fail_status
+            fail_status: HTTP status of random failures
+            retry_after: Retry-After seconds sent with random failures (None: no header)
+            seed: Seed for random failures
+        """
+        self.base_latency = base_latency
+        self.prefill_seconds_per_token = prefill_seconds_per_token
+        self.cached_seconds_per_token = cached_seconds_per_token
+        self.output_seconds_per_token = output_seconds_per_token
+        self.completion_tokens = completion_tokens
+        self.respond = respond or self.default_reply
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.faults_served = 0
+        self._faults: List[Dict] = []
+        self._rng = random.Random(seed)
+        self._blocks: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                stub.handle(self)
+
+        self._httpd = _HTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_cache(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+    def inject_faults(self, *faults: Dict) -> None:
+        """
+        Queue faults for the next requests, one per request, in order.
+
+        Each fault is a dict with any of:
+            status: HTTP error status to answer with (e.g. 429, 500, 503)
+            retry_after: Retry-After header value sent with the status
+            delay: Seconds to wait first (without status: then answer normally)
+            drop: True to close the connection without a response
+        """
+        with self._lock:
+            self._faults.extend(faults)
+
+    def _next_fault(self) -> Optional[Dict]:
+        with self._lock:
+            if self._faults:
+                return self._faults.pop(0)
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                return {"status": self.fail_status, "retry_after": self.retry_after}
+            return None
+
+    def _send_fault(self, handler, fault: Dict) -> bool:
+        """Apply a fault; True if it answered (or dropped) the request."""
+        if fault.get("delay"):
+            time.sleep(fault["delay"])
+        if fault.get("drop"):
+            handler.close_connection = True
+            return True
+        if not fault.get("status"):
+            return False
+        headers = {}
+        if fault.get("retry_after") is not None:
+            headers["Retry-After"] = str(fault["retry_after"])
+        self._send_json(handler, fault["status"], {"error": {
+            "message": f"Injected fault {fault['status']}", "type": "server_error", "code": None}}, headers)
+        return True
+
+    # ------------------------------------------------------------------
+
+    def cached_prefix_tokens(self, text: str) -> Tuple[int, int]:
+        """
+        Look up and remember the prompt's prefix blocks.
+
+        Returns:
+            (prompt_tokens, cached_tokens)
+        """
+        block_chars = CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        digests = []
+        digest = hashlib.sha256()
+        for end in range(block_chars, len(text) + 1, block_chars):
+            digest.update(text[end - block_chars:end].encode("utf-8"))
+            digests.append(digest.hexdigest())
+
+        with self._lock:
+            hit_blocks = 0
+            for block_digest in digests:
+                if block_digest not in self._blocks:
+                    break
+                self._blocks.move_to_end(block_digest)
+                hit_blocks += 1
+            for block_digest in digests[hit_blocks:]:
+                self._blocks[block_digest] = None
+            while len(self._blocks) > CACHE_MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+
+        prompt_tokens = count_tokens(text)
+        cached_chars = hit_blocks * block_chars
+        if cached_chars < CACHE_MIN_TOKENS * CHARS_PER_TOKEN:
+            return prompt_tokens, 0
+        return prompt_tokens, min(prompt_tokens, count_tokens(text[:cached_chars]))
+
+    def default_reply(self, body: Dict) -> str:
+        messages = body.get("messages", [])
+        question = next((str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"), "")
+        question = question.splitlines()[-1][:80] if question else ""
+        reply = {"chat_response": f"Stub answer to: {question}."}
+        if any("tab_additions" in str(m.get("content", "")) for m in messages if m.get("role") == "system"):
+            reply["tab_additions"] = None
+        else:
+            reply.update({"fretboard_sequence": None, "tab_display": None, "additional_notes": None})
+
+        padding = self.completion_tokens - count_tokens(json.dumps(reply))
+        if padding > 0:
+            reply["chat_response"] += " Practice slowly." * (padding // 4)
+        return json.dumps(reply)
+
+    def _send_json(self, handler, status: int, payload: Dict, headers: Optional[Dict] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def handle(self, handler) -> None:
+        if handler.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(handler, 404, {"error": {"message": "Not found"}})
+            return
+
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}")
+        with self._lock:
+            self.requests += 1
+            request_number = self.requests
+
+        fault = self._next_fault()
+        if fault:
+            with self._lock:
+                self.faults_served += 1
+            if self._send_fault(handler, fault):
+                return
+
+        prompt_tokens, cached_tokens = self.cached_prefix_tokens(prompt_text(body.get("messages", [])))
+        content = self.respond(body)
+        completion_tokens = count_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+        model = body.get("model", "gpt-4o")
+        completion_id = f"chatcmpl-stub{request_number}"
+        created = int(time.time())
+
+        time.sleep(self.base_latency
+                   + (prompt_tokens - cached_tokens) * self.prefill_seconds_per_token
+                   + cached_tokens * self.cached_seconds_per_token)
+
+        if not body.get("stream"):
+            time.sleep(completion_tokens * self.output_seconds_per_token)
+            self._send_json(handler, 200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": usage
+            })
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+
+        def send(payload):
+            handler.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+        for start in range(0, len(content), CHARS_PER_TOKEN):
+            time.sleep(self.output_seconds_per_token)
+            send({**base, "choices": [{"index": 0, "finish_reason": None,
+                                       "delta": {"content": content[start:start + CHARS_PER_TOKEN]}}]})
+        send({**base, "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            send({**base, "choices": [], "usage": usage})
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+        handler.close_connection = True
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub of the OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--base-latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=503, help="HTTP status of failed requests")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with failures")
+
+    args = parser.parse_args()
+
+    stub = StubLLMServer(args.host, args.port, base_latency=args.base_latency,
+                         completion_tokens=args.completion_tokens, fail_rate=args.fail_rate,
+                         fail_status=args.fail_status, retry_after=args.retry_after)
+    print(f"Stub LLM listening on {stub.base_url}")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
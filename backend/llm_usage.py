@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Token usage, prompt-cache and latency accounting for LLM calls.
+
+UsageTracker.record() takes the `usage` object (or dict) of a chat completion
+response and accumulates, per endpoint: calls, prompt tokens, cached prompt
+tokens (usage.prompt_tokens_details.cached_tokens), completion tokens,
+latency and an estimated cost from MODEL_PRICES.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+# USD per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+
+def _field(obj: Any, name: str, default=None):
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """Read prompt/cached/completion token counts from an OpenAI usage object or dict."""
+    details = _field(usage, "prompt_tokens_details")
+    return {
+        "prompt_tokens": _field(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": _field(details, "cached_tokens", 0) or 0,
+        "completion_tokens": _field(usage, "completion_tokens", 0) or 0,
+    }
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call (0 for unknown models)."""
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    return ((prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * output_price) / 1_000_000
+
+
+class UsageTracker:
+    """Thread-safe per-endpoint usage totals."""
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, model: str, usage: Any, latency_seconds: Optional[float] = None) -> Dict:
+        """
+        Add one call's usage.
+
+        Returns:
+            The call's counts plus its estimated cost
+        """
+        counts = usage_counts(usage)
+        cost = estimate_cost(model, counts["prompt_tokens"], counts["cached_tokens"],
+                             counts["completion_tokens"])
+        with self._lock:
+            totals = self._totals.setdefault(endpoint, {
+                "calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                "latency_seconds": 0.0, "timed_calls": 0, "cost_usd": 0.0
+            })
+            totals["calls"] += 1
+            for key, value in counts.items():
+                totals[key] += value
+            totals["cost_usd"] += cost
+            if latency_seconds is not None:
+                totals["latency_seconds"] += latency_seconds
+                totals["timed_calls"] += 1
+        return {**counts, "cost_usd": cost}
+
+    def stats(self) -> Dict[str, Dict]:
+        """Totals per endpoint with cache hit ratio and mean latency."""
+        with self._lock:
+            result = {}
+            for endpoint, totals in self._totals.items():
+                prompt = totals["prompt_tokens"]
+                result[endpoint] = {
+                    "calls": totals["calls"],
+                    "prompt_tokens": prompt,
+                    "cached_tokens": totals["cached_tokens"],
+                    "completion_tokens": totals["completion_tokens"],
+                    "cached_ratio": round(totals["cached_tokens"] / prompt, 3) if prompt else 0.0,
+                    "mean_latency_ms": round(totals["latency_seconds"] / totals["timed_calls"] * 1000, 1)
+                    if totals["timed_calls"] else None,
+                    "cost_usd": round(totals["cost_usd"], 6)
+                }
+            return result
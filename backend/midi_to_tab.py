@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Standard MIDI File to TabComposition Converter
+
+Converts .mid/.midi files to GuitarHub's TabComposition JSON format without
+going through notation/OMR. Pure Python SMF parser (formats 0 and 1, PPQ time
+division); tracks are read and parsed one chunk at a time, so only the current
+track's bytes and the quantized notes are held in memory.
+
+Note onsets are quantized to a sixteenth-note grid and durations snapped to the
+composer's duration values, then positions are assigned with the same
+fingering logic as the MusicXML converter (assign_chord_positions).
+"""
+
+import json
+import math
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from musicxml_to_tab import (
+    GUITAR_TUNING,
+    MAX_FRET,
+    assign_chord_positions,
+    calculate_measure_ticks
+)
+from tab_composition import TabComposition
+
+# Quantization grid for note onsets, in whole notes (sixteenth notes)
+ONSET_GRID = 0.0625
+
+# Composer duration values (whole-note fractions), see formatDuration in composer.js
+DURATION_GRID = (1.0, 0.75, 0.5, 0.375, 0.25, 0.1875, 0.125, 0.0625)
+
+# General MIDI percussion channel (0-based), excluded unless channels are given
+MIDI_DRUM_CHANNEL = 9
+
+# Playable MIDI range; notes outside it are moved by octaves into it
+LOWEST_NOTE = GUITAR_TUNING[6]
+HIGHEST_NOTE = GUITAR_TUNING[1] + MAX_FRET
+
+MIDI_EXTENSIONS = ('.mid', '.midi')
+
+# Longest import; a corrupt delta time can otherwise place a note millions of
+# measures in (about an hour of 4/4 at 120 BPM)
+MAX_MEASURES = 2000
+
+# Largest time signature denominator, as a power of two (x/64)
+MAX_TIME_SIGNATURE_EXPONENT = 6
+
+
+class MidiTrack:
+    """Notes and meta events of one MTrk chunk (times in MIDI ticks)."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.name: Optional[str] = None
+        self.notes: List[Tuple[int, int, int, int]] = []  # (start, end, channel, note)
+        self.tempos: List[Tuple[int, int]] = []            # (tick, microseconds per quarter)
+        self.time_signatures: List[Tuple[int, str]] = []   # (tick, "3/4")
+
+    @property
+    def channels(self) -> List[int]:
+        return sorted({channel for _, _, channel, _ in self.notes})
+
+
+def read_varlen(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read a variable-length quantity. Returns (value, new position)."""
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def read_midi_header(f: BinaryIO) -> Tuple[int, int, int]:
+    """
+    Read the MThd chunk.
+
+    Returns:
+        Tuple of (format, number of tracks, ticks per quarter note)
+    """
+    header = f.read(8)
+    if len(header) < 8:
+        raise ValueError("Not a Standard MIDI File")
+    chunk_type, length = struct.unpack('>4sI', header)
+    if chunk_type != b'MThd' or length < 6:
+        raise ValueError("Not a Standard MIDI File")
+
+    fields = f.read(6)
+    if len(fields) < 6:
+        raise ValueError("Truncated MIDI header")
+    fmt, ntracks, division = struct.unpack('>HHH', fields)
+    f.read(length - 6)
+
+    if fmt == 2:
+        raise ValueError("MIDI format 2 (independent sequences) is not supported")
+    if division & 0x8000:
+        raise ValueError("SMPTE time division is not supported")
+    return fmt, ntracks, division
+
+
+def parse_track(data: bytes, index: int) -> MidiTrack:
+    """
+    Parse the events of one MTrk chunk.
+
+    Raises:
+        ValueError: If an event runs past the end of the chunk
+    """
+    try:
+        return _parse_track_events(data, index)
+    except IndexError:
+        # Every read past the end of the chunk lands here (payload lengths are checked too)
+        raise ValueError(f"Truncated MIDI track {index}: an event runs past the end of the chunk") from None
+
+
+def _parse_track_events(data: bytes, index: int) -> MidiTrack:
+    track = MidiTrack(index)
+    open_notes: Dict[Tuple[int, int], List[int]] = {}
+    tick = 0
+    pos = 0
+    status = None
+
+    while pos < len(data):
+        delta, pos = read_varlen(data, pos)
+        tick += delta
+        byte = data[pos]
+
+        if byte == 0xFF:
+            # Meta event
+            meta_type = data[pos + 1]
+            length, pos = read_varlen(data, pos + 2)
+            if pos + length > len(data):
+                raise IndexError(pos + length)
+            payload = data[pos:pos + length]
+            pos += length
+            status = None
+
+            if meta_type == 0x2F:
+                break
+            elif meta_type == 0x03 and track.name is None:
+                track.name = payload.decode('latin-1').strip() or None
+            elif meta_type == 0x51 and length == 3:
+                track.tempos.append((tick, int.from_bytes(payload, 'big')))
+            elif meta_type == 0x58 and length >= 2:
+                if payload[0] == 0 or payload[1] > MAX_TIME_SIGNATURE_EXPONENT:
+                    raise ValueError(f"Track {index}: invalid time signature "
+                                     f"(numerator {payload[0]}, denominator exponent {payload[1]})")
+                track.time_signatures.append((tick, f"{payload[0]}/{2 ** payload[1]}"))
+            continue
+
+        if byte in (0xF0, 0xF7):
+            # SysEx event
+            length, pos = read_varlen(data, pos + 1)
+            if pos + length > len(data):
+                raise IndexError(pos + length)
+            pos += length
+            status = None
+            continue
+
+        if byte & 0x80:
+            status = byte
+            pos += 1
+        elif status is None:
+            raise ValueError(f"Track {index}: running status without a status byte")
+
+        kind = status & 0xF0
+        channel = status & 0x0F
+        if kind in (0xC0, 0xD0):
+            if pos >= len(data):
+                raise IndexError(pos)
+            pos += 1
+            continue
+
+        note, velocity = data[pos], data[pos + 1]
+        pos += 2
+
+        if kind == 0x90 and velocity > 0:
+            open_notes.setdefault((channel, note), []).append(tick)
+        elif kind == 0x80 or kind == 0x90:
+            starts = open_notes.get((channel, note))
+            if starts:
+                track.notes.append((starts.pop(0), tick, channel, note))
+
+    # Notes never switched off end with the track
+    for (channel, note), starts in open_notes.items():
+        for start in starts:
+            track.notes.append((start, tick, channel, note))
+
+    track.notes.sort()
+    return track
+
+
+def iter_midi_tracks(f: BinaryIO) -> Iterator[MidiTrack]:
+    """Yield parsed tracks one at a time, reading one chunk per track."""
+    _, ntracks, _ = read_midi_header(f)
+    index = 0
+    while index < ntracks:
+        header = f.read(8)
+        if not header:
+            break  # Fewer tracks than the header announces
+        if len(header) < 8:
+            raise ValueError(f"Truncated MIDI track {index}: incomplete chunk header")
+        chunk_type, length = struct.unpack('>4sI', header)
+        data = f.read(length)
+        if len(data) < length:
+            raise ValueError(f"Truncated MIDI track {index}: {len(data)} of {length} bytes")
+        if chunk_type != b'MTrk':
+            continue  # Unknown chunks are skipped per the SMF spec
+        yield parse_track(data, index)
+        index += 1
+
+
+def track_summary(track: MidiTrack) -> Dict:
+    """Index, name, note count and channels of a track (for track/channel selection)."""
+    return {"index": track.index, "name": track.name, "notes": len(track.notes),
+            "channels": track.channels}
+
+
+def list_midi_tracks(midi_path: str) -> List[Dict]:
+    """Summarize the tracks of a MIDI file (for track/channel selection)."""
+    with open(midi_path, 'rb') as f:
+        return [track_summary(track) for track in iter_midi_tracks(f)]
+
+
+def fit_to_guitar_range(midi_note: int) -> int:
+    """Move a note by octaves into the guitar's playable range."""
+    while midi_note < LOWEST_NOTE:
+        midi_note += 12
+    while midi_note > HIGHEST_NOTE:
+        midi_note -= 12
+    return midi_note
+
+
+def snap_duration(ticks: int, ticks_per_whole: int, limit: Optional[int] = None) -> int:
+    """
+    Snap a duration to the nearest DURATION_GRID value.
+
+    Args:
+        ticks: Raw duration in ticks
+        ticks_per_whole: Tick resolution
+        limit: Optional maximum (e.g. the rest of the measure); the longest
+               grid value not exceeding it is used if the nearest one is too long
+
+    Returns:
+        Duration in ticks (at least one grid step)
+    """
+    grid = [round(value * ticks_per_whole) for value in DURATION_GRID]
+    if limit is not None:
+        grid = [value for value in grid if value <= limit] or [limit]
+    return min(grid, key=lambda value: (abs(value - ticks), -value))
+
+
+def convert_midi_to_columns(midi_path: str, tracks: Optional[Iterable[int]] = None,
+                            channels: Optional[Iterable[int]] = None) -> TabComposition:
+    """
+    Convert a Standard MIDI File to an array-backed TabComposition.
+
+    Args:
+        midi_path: Path to .mid/.midi file
+        tracks: Track indices to import (default: all)
+        channels: 0-based MIDI channels to import (default: all but drums)
+
+    Returns:
+        TabComposition with one column entry per note
+    """
+    return convert_midi_with_tracks(midi_path, tracks, channels)[0]
+
+
+def convert_midi_with_tracks(midi_path: str, tracks: Optional[Iterable[int]] = None,
+                             channels: Optional[Iterable[int]] = None) -> Tuple[TabComposition, List[Dict]]:
+    """
+    Convert a Standard MIDI File and summarize its tracks in the same pass.
+
+    Args:
+        midi_path: Path to .mid/.midi file
+        tracks: Track indices to import (default: all)
+        channels: 0-based MIDI channels to import (default: all but drums)
+
+    Returns:
+        Tuple of (TabComposition, track summaries as from list_midi_tracks -
+        every track, not just the imported ones)
+    """
+    track_filter = set(tracks) if tracks is not None else None
+    channel_filter = set(channels) if channels is not None else \
+        set(range(16)) - {MIDI_DRUM_CHANNEL}
+
+    title = None
+    tempo = None
+    time_signatures: List[Tuple[int, str]] = []
+    # Quantized notes as (onset tick, duration tick, midi note)
+    notes: List[Tuple[int, int, int]] = []
+    summaries: List[Dict] = []
+
+    with open(midi_path, 'rb') as f:
+        _, _, ticks_per_quarter = read_midi_header(f)
+        f.seek(0)
+
+        ticks_per_whole = 16
+        midi_ticks_per_whole = ticks_per_quarter * 4
+        onset_step = round(ONSET_GRID * ticks_per_whole)
+
+        def to_grid(midi_ticks: int) -> int:
+            return round(midi_ticks * ticks_per_whole / midi_ticks_per_whole / onset_step) * onset_step
+
+        for track in iter_midi_tracks(f):
+            summaries.append(track_summary(track))
+            # Tempo and meter come from any track (the conductor track in format 1)
+            if tempo is None and track.tempos:
+                tempo = round(60_000_000 / track.tempos[0][1])
+            time_signatures.extend(track.time_signatures)
+            if title is None and track.name:
+                title = track.name
+
+            if track_filter is not None and track.index not in track_filter:
+                continue
+
+            for start, end, channel, note in track.notes:
+                if channel not in channel_filter:
+                    continue
+                onset = to_grid(start)
+                length = (end - start) * ticks_per_whole / midi_ticks_per_whole
+                notes.append((onset, length, fit_to_guitar_range(note)))
+
+    # Tick resolution must also cover every measure length
+    for _, time_sig in time_signatures:
+        ticks_per_whole = math.lcm(ticks_per_whole, int(time_sig.split('/')[1]))
+    if ticks_per_whole != 16:
+        factor = ticks_per_whole // 16
+        notes = [(onset * factor, length * factor, note) for onset, length, note in notes]
+
+    time_signatures.sort()
+    initial_time_sig = time_signatures[0][1] if time_signatures and time_signatures[0][0] == 0 \
+        else "4/4"
+    composition = TabComposition(title or Path(midi_path).stem, tempo or 120,
+                                 initial_time_sig, ticks_per_whole)
+    meter_changes = [(round(tick * ticks_per_whole / midi_ticks_per_whole), sig)
+                     for tick, sig in time_signatures]
+
+    # Group simultaneous notes (same quantized onset) into chords
+    notes.sort()
+    last_onset = notes[-1][0] if notes else -1
+    i = 0
+    measure_start = 0
+    time_sig = initial_time_sig
+    change = 0
+
+    while measure_start <= last_onset:
+        while change < len(meter_changes) and meter_changes[change][0] <= measure_start:
+            time_sig = meter_changes[change][1]
+            change += 1
+        measure_ticks = calculate_measure_ticks(time_sig, ticks_per_whole)
+        measure_end = measure_start + measure_ticks
+        if composition.num_measures >= MAX_MEASURES:
+            raise ValueError(f"MIDI file is longer than {MAX_MEASURES} measures")
+        composition.add_measure(time_sig)
+
+        events = []
+        while i < len(notes) and notes[i][0] < measure_end:
+            onset = notes[i][0]
+            durations: Dict[int, int] = {}
+            while i < len(notes) and notes[i][0] == onset:
+                _, length, note = notes[i]
+                # Notes carried over the barline are cut at it
+                duration = snap_duration(length, ticks_per_whole, measure_end - onset)
+                durations[note] = max(duration, durations.get(note, 0))
+                i += 1
+
+            for midi_note, string, fret in assign_chord_positions(list(durations)):
+                events.append((onset - measure_start, string, fret, durations[midi_note]))
+
+        events.sort()
+        for time, string, fret, duration in events:
+            composition.add_event(time, string, fret, duration)
+        measure_start = measure_end
+
+    if composition.num_measures == 0:
+        composition.add_measure(composition.time_signature)
+
+    return composition, summaries
+
+
+def convert_midi_to_tab(midi_path: str, tracks: Optional[Iterable[int]] = None,
+                        channels: Optional[Iterable[int]] = None) -> Dict:
+    """
+    Convert a Standard MIDI File to TabComposition format.
+
+    Args:
+        midi_path: Path to .mid/.midi file
+        tracks: Track indices to import (default: all)
+        channels: 0-based MIDI channels to import (default: all but drums)
+
+    Returns:
+        TabComposition dictionary
+    """
+    return convert_midi_to_columns(midi_path, tracks, channels).to_dict()
+
+
+def parse_index_list(value: Optional[str]) -> Optional[List[int]]:
+    """Parse "0,2,3" into [0, 2, 3]; empty or None means no selection."""
+    if not value:
+        return None
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Convert a Standard MIDI File to GuitarHub TabComposition format"
+    )
+    parser.add_argument("input", help="Input MIDI file (.mid or .midi)")
+    parser.add_argument("-o", "--output", help="Output JSON file (optional)")
+    parser.add_argument("--tracks", help="Comma-separated track indices (default: all)")
+    parser.add_argument("--channels",
+                        help="Comma-separated 0-based channels (default: all but drums)")
+    parser.add_argument("--list", action="store_true", help="List tracks and exit")
+
+    args = parser.parse_args()
+
+    try:
+        if args.list:
+            for info in list_midi_tracks(args.input):
+                print(f"{info['index']:3}  {info['name'] or '-':30} {info['notes']:6} notes  "
+                      f"channels {info['channels']}")
+            exit(0)
+
+        composition = convert_midi_to_tab(args.input, parse_index_list(args.tracks),
+                                          parse_index_list(args.channels))
+
+        print(f"Title: {composition['title']}")
+        print(f"Tempo: {composition['tempo']} BPM")
+        print(f"Time Signature: {composition['timeSignature']}")
+        print(f"Measures: {len(composition['measures'])}")
+        print(f"Total Notes: {sum(len(m['events']) for m in composition['measures'])}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(composition, f, indent=2)
+            print(f"\nSaved to: {args.output}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        exit(1)
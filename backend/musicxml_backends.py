@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+XML parser backends for the MusicXML converter.
+
+The converter only needs two things from an XML library: parsing a document
+(file path or file object) into an ElementTree-compatible root, and reading
+the handful of fields of a <note> element. Both are provided here by:
+
+- ElementTreeBackend: stdlib xml.etree.ElementTree (always available)
+- LxmlBackend: lxml.etree, used automatically when lxml is installed. It parses
+  in C with a reusable parser and reads each note in a single pass over its
+  children instead of one find() per field.
+
+Select explicitly with get_backend("etree"/"lxml") or the MUSICXML_PARSER
+environment variable.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+from typing import Optional, Tuple
+
+try:
+    from lxml import etree as lxml_etree
+    HAS_LXML = True
+except ImportError:
+    lxml_etree = None
+    HAS_LXML = False
+
+# (is_rest, is_chord, step, octave, alter, duration) - all raw text or None
+NoteFields = Tuple[bool, bool, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+class ElementTreeBackend:
+    """Stdlib ElementTree backend."""
+
+    name = "etree"
+
+    def parse(self, source):
+        """Parse a path or binary file object and return the root element."""
+        return ET.parse(source).getroot()
+
+    def read_note(self, note) -> NoteFields:
+        """Read the fields of a <note> element the converter needs."""
+        is_rest = note.find('rest') is not None
+        is_chord = note.find('chord') is not None
+
+        step = octave = alter = None
+        pitch_elem = note.find('pitch')
+        if pitch_elem is not None:
+            step_elem = pitch_elem.find('step')
+            octave_elem = pitch_elem.find('octave')
+            alter_elem = pitch_elem.find('alter')
+            step = step_elem.text if step_elem is not None else None
+            octave = octave_elem.text if octave_elem is not None else None
+            alter = alter_elem.text if alter_elem is not None else None
+
+        duration_elem = note.find('duration')
+        duration = duration_elem.text if duration_elem is not None else None
+
+        return is_rest, is_chord, step, octave, alter, duration
+
+
+class LxmlBackend:
+    """lxml backend with a reusable parser and single-pass note reads."""
+
+    name = "lxml"
+
+    def __init__(self):
+        if not HAS_LXML:
+            raise ImportError("lxml is not installed")
+        # Audiveris output can be large; huge_tree lifts lxml's depth/size limits.
+        # Entities and network access stay disabled for uploaded files.
+        self._parser = lxml_etree.XMLParser(
+            huge_tree=True, resolve_entities=False, no_network=True, remove_comments=True
+        )
+
+    def parse(self, source):
+        """Parse a path or binary file object and return the root element."""
+        return lxml_etree.parse(source, self._parser).getroot()
+
+    def read_note(self, note) -> NoteFields:
+        """Read the fields of a <note> element in one pass over its children."""
+        is_rest = is_chord = False
+        step = octave = alter = duration = None
+
+        for child in note:
+            tag = child.tag
+            if tag == 'pitch':
+                for part in child:
+                    part_tag = part.tag
+                    if part_tag == 'step':
+                        step = part.text
+                    elif part_tag == 'octave':
+                        octave = part.text
+                    elif part_tag == 'alter':
+                        alter = part.text
+            elif tag == 'duration':
+                duration = child.text
+            elif tag == 'rest':
+                is_rest = True
+            elif tag == 'chord':
+                is_chord = True
+
+        return is_rest, is_chord, step, octave, alter, duration
+
+
+_BACKENDS = {
+    ElementTreeBackend.name: ElementTreeBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+_instances = {}
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Return a parser backend.
+
+    Args:
+        name: "etree" or "lxml"; defaults to $MUSICXML_PARSER, then lxml if
+              installed, then etree
+
+    Returns:
+        Backend instance (shared per name)
+    """
+    if name is None:
+        name = os.getenv('MUSICXML_PARSER') or ("lxml" if HAS_LXML else "etree")
+
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown MusicXML parser backend: {name}")
+
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
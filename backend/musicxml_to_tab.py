@@ -3,16 +3,27 @@
 MusicXML to TabComposition Converter
 
 Converts MusicXML files (.mxl or .musicxml) to GuitarHub's TabComposition JSON format.
-Uses lowest fret position strategy for pitch-to-TAB conversion.
+Uses lowest fret position strategy for pitch-to-TAB conversion; chords are
+first matched against the precomputed voicing index (voicings.py).
 """
 
+import glob
 import json
+import math
 import os
+import tempfile
+import time
 import zipfile
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from musicxml_backends import get_backend
+from tab_composition import TabComposition
+from voicings import lookup_voicing
+
 
 # Standard guitar tuning (string number -> MIDI note number for open string)
 # String 1 (high E) = E4 = MIDI 64
@@ -33,6 +44,12 @@ GUITAR_TUNING = {
 # Maximum fret number
 MAX_FRET = 24
 
+# File extensions picked up when a directory is given to the batch CLI
+MUSICXML_EXTENSIONS = ('.mxl', '.musicxml', '.xml')
+
+# Number of parsed MusicXML documents kept by parse_musicxml_file(cache=True)
+PARSE_CACHE_SIZE = 32
+
 # Note name to semitone offset (C = 0)
 NOTE_TO_SEMITONE = {
     'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11
@@ -85,7 +102,10 @@ def midi_to_guitar_position(midi_note: int, excluded_strings: set = None) -> Opt
 def assign_chord_positions(midi_notes: List[int]) -> List[Tuple[int, int, int]]:
     """
     Assign guitar positions to a chord (multiple simultaneous notes).
-    Distributes notes across strings: highest pitch on highest string (string 1).
+
+    Chords matching a known open/barre/CAGED grip resolve through the voicing
+    index. Otherwise notes are distributed greedily across strings: highest
+    pitch on highest string (string 1).
 
     Args:
         midi_notes: List of MIDI note numbers
@@ -96,6 +116,10 @@ def assign_chord_positions(midi_notes: List[int]) -> List[Tuple[int, int, int]]:
     if not midi_notes:
         return []
 
+    voicing = lookup_voicing(midi_notes)
+    if voicing is not None:
+        return [(midi_note, string, fret) for string, fret, midi_note in voicing]
+
     # Sort by pitch, highest first (will go on string 1, then 2, etc.)
     sorted_notes = sorted(midi_notes, reverse=True)
 
@@ -132,30 +156,137 @@ def parse_musicxml_duration(duration_value: int, divisions: int) -> float:
     return whole_notes
 
 
-def parse_mxl_file(mxl_path: str) -> ET.Element:
+def parse_musicxml_ticks(duration_value: int, divisions: int, ticks_per_quarter: int) -> int:
+    """
+    Convert MusicXML duration to integer ticks.
+
+    ticks_per_quarter must be a multiple of divisions (see compute_ticks_per_quarter),
+    so the conversion is exact - no float rounding for triplets and other tuplets.
+    """
+    if divisions <= 0:
+        divisions = 1
+
+    return duration_value * (ticks_per_quarter // divisions)
+
+
+def compute_ticks_per_quarter(part: ET.Element) -> int:
+    """
+    Compute a tick resolution that represents every duration in a part exactly.
+
+    Returns the LCM of all <divisions> values in the part, further scaled so that
+    a whole note (4 quarters) divides evenly by every time signature beat type.
+    That keeps both note durations and expected measure lengths integral.
+    """
+    ticks_per_quarter = 1
+    for div_elem in part.iter('divisions'):
+        if div_elem.text:
+            try:
+                divisions = int(div_elem.text)
+            except ValueError:
+                continue
+            if divisions > 0:
+                ticks_per_quarter = math.lcm(ticks_per_quarter, divisions)
+
+    for beat_type_elem in part.iter('beat-type'):
+        if beat_type_elem.text:
+            try:
+                beat_type = int(beat_type_elem.text)
+            except ValueError:
+                continue
+            if beat_type > 0:
+                ticks_per_quarter = math.lcm(ticks_per_quarter * 4, beat_type) // 4
+
+    return ticks_per_quarter
+
+
+def ticks_to_whole_notes(ticks: int, ticks_per_whole: int) -> float:
+    """Convert integer ticks to a whole note fraction (the TabComposition JSON unit)."""
+    return ticks / ticks_per_whole
+
+
+def resolve_mxl_rootfile(zf: zipfile.ZipFile) -> str:
+    """
+    Find the main score inside a .mxl archive.
+
+    Uses the rootfile listed in META-INF/container.xml, as the MusicXML spec
+    requires. Falls back to the first non-META-INF .xml/.musicxml file for
+    archives without a (valid) container manifest.
+    """
+    names = zf.namelist()
+
+    if 'META-INF/container.xml' in names:
+        try:
+            with zf.open('META-INF/container.xml') as container_file:
+                container = ET.parse(container_file).getroot()
+            for rootfile in container.iter():
+                if not rootfile.tag.endswith('rootfile'):
+                    continue
+                media_type = rootfile.get('media-type')
+                full_path = rootfile.get('full-path')
+                # The first rootfile is the score; others may be e.g. PDF renderings
+                if full_path in names and media_type in (None, 'application/vnd.recordare.musicxml+xml'):
+                    return full_path
+        except ET.ParseError:
+            pass
+
+    xml_files = [f for f in names
+                 if f.lower().endswith(('.xml', '.musicxml')) and not f.startswith('META-INF')]
+
+    if not xml_files:
+        raise ValueError("No XML file found in .mxl archive")
+
+    return xml_files[0]
+
+
+def parse_mxl_file(mxl_path: str, backend: Optional[str] = None) -> ET.Element:
     """Parse a compressed MusicXML (.mxl) file and return the root element."""
     with zipfile.ZipFile(mxl_path, 'r') as zf:
-        # Find the main XML file
-        xml_files = [f for f in zf.namelist()
-                     if f.endswith('.xml') and not f.startswith('META-INF')]
+        rootfile = resolve_mxl_rootfile(zf)
 
-        if not xml_files:
-            raise ValueError("No XML file found in .mxl archive")
+        # Decompress straight into the parser, without reading the member into memory
+        with zf.open(rootfile) as xml_file:
+            return get_backend(backend).parse(xml_file)
 
-        # Usually the main file is listed in container.xml, but for simplicity
-        # we'll take the first non-META-INF xml file
-        with zf.open(xml_files[0]) as xml_file:
-            tree = ET.parse(xml_file)
-            return tree.getroot()
 
-
-def parse_musicxml_file(xml_path: str) -> ET.Element:
-    """Parse a MusicXML file (either .mxl or .musicxml)."""
-    if xml_path.endswith('.mxl'):
-        return parse_mxl_file(xml_path)
+def _parse_musicxml_uncached(xml_path: str, backend: str) -> ET.Element:
+    if xml_path.lower().endswith('.mxl'):
+        return parse_mxl_file(xml_path, backend)
     else:
-        tree = ET.parse(xml_path)
-        return tree.getroot()
+        return get_backend(backend).parse(xml_path)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_musicxml_cached(xml_path: str, mtime_ns: int, size: int, backend: str) -> ET.Element:
+    """Parse a MusicXML file; cached on (path, mtime, size, backend) by parse_musicxml_file."""
+    return _parse_musicxml_uncached(xml_path, backend)
+
+
+def parse_musicxml_file(xml_path: str, backend: Optional[str] = None,
+                        cache: bool = False) -> ET.Element:
+    """
+    Parse a MusicXML file (either .mxl or .musicxml).
+
+    With cache=True parsed documents are kept in an LRU cache keyed by (path,
+    mtime, size), so converting the same unchanged file again skips I/O and
+    parsing; the returned element is then shared between callers and must not
+    be modified. Only use it for files that are converted repeatedly (benchmarks,
+    scripts): the server converts per-job temp files once and deletes them.
+
+    Args:
+        xml_path: Path to .mxl or .musicxml file
+        backend: Parser backend name (see musicxml_backends.get_backend)
+        cache: Use the parse cache
+    """
+    if not cache:
+        return _parse_musicxml_uncached(xml_path, get_backend(backend).name)
+    stat = os.stat(xml_path)
+    return _parse_musicxml_cached(os.path.abspath(xml_path), stat.st_mtime_ns, stat.st_size,
+                                  get_backend(backend).name)
+
+
+def clear_parse_cache() -> None:
+    """Drop all cached parsed MusicXML documents."""
+    _parse_musicxml_cached.cache_clear()
 
 
 def extract_title(root: ET.Element, fallback_filename: str = "Untitled") -> str:
@@ -259,6 +390,21 @@ def calculate_measure_duration(time_sig: str) -> float:
     return beats / beat_type
 
 
+def calculate_measure_ticks(time_sig: str, ticks_per_whole: int) -> int:
+    """
+    Calculate expected measure length in ticks.
+
+    Args:
+        time_sig: Time signature string like "4/4" or "3/4"
+        ticks_per_whole: Tick resolution of a whole note
+
+    Returns:
+        Measure length in ticks (exact when ticks_per_whole is a multiple of beat_type)
+    """
+    beats, beat_type = parse_time_signature(time_sig)
+    return beats * ticks_per_whole // beat_type
+
+
 def get_measure_event_extent(measure: Dict) -> float:
     """
     Calculate the maximum time position covered by events in a measure.
@@ -280,17 +426,40 @@ def get_measure_event_extent(measure: Dict) -> float:
     return max_extent
 
 
-def convert_musicxml_to_tab(xml_path: str) -> Dict:
+def convert_musicxml_to_tab(xml_path: str, backend: Optional[str] = None) -> Dict:
     """
     Convert a MusicXML file to TabComposition JSON format.
 
     Args:
         xml_path: Path to .mxl or .musicxml file
+        backend: Optional parser backend name ("etree" or "lxml")
 
     Returns:
         Dictionary in TabComposition format
     """
-    root = parse_musicxml_file(xml_path)
+    return convert_musicxml_to_columns(xml_path, backend).to_dict()
+
+
+def convert_musicxml_to_columns(xml_path: str, backend: Optional[str] = None,
+                                cache: bool = False) -> TabComposition:
+    """
+    Convert a MusicXML file to an array-backed TabComposition.
+
+    Time is tracked as integer ticks (see compute_ticks_per_quarter); floats
+    only appear when the composition is serialized.
+
+    Args:
+        xml_path: Path to .mxl or .musicxml file
+        backend: Optional parser backend name ("etree" or "lxml"); defaults to
+                 lxml when installed
+        cache: Reuse the parse of an unchanged file (see parse_musicxml_file)
+
+    Returns:
+        TabComposition with one column entry per note
+    """
+    parser_backend = get_backend(backend)
+    read_note = parser_backend.read_note
+    root = parse_musicxml_file(xml_path, parser_backend.name, cache)
 
     # Extract metadata
     title = extract_title(root, xml_path)
@@ -303,19 +472,24 @@ def convert_musicxml_to_tab(xml_path: str) -> Dict:
 
     part = parts[0]  # Take first part only
 
+    # Common tick resolution for the whole part
+    ticks_per_quarter = compute_ticks_per_quarter(part)
+    ticks_per_whole = ticks_per_quarter * 4
+
     # Initialize composition
-    composition = {
-        "title": title,
-        "tempo": tempo,
-        "timeSignature": "4/4",
-        "measures": [],
-        "version": "1.0"
-    }
+    composition = TabComposition(title, tempo, "4/4", ticks_per_whole)
 
     # Track divisions (may change per measure)
     divisions = 1
     current_time_sig = "4/4"
 
+    def read_ticks(elem: ET.Element) -> Optional[int]:
+        """Read an element's <duration> child as ticks (None if missing)."""
+        duration_elem = elem.find('duration')
+        if duration_elem is not None and duration_elem.text:
+            return parse_musicxml_ticks(int(duration_elem.text), divisions, ticks_per_quarter)
+        return None
+
     # Process each measure
     for measure_elem in part.findall('measure'):
         # Check for new divisions
@@ -327,24 +501,22 @@ def convert_musicxml_to_tab(xml_path: str) -> Dict:
 
         # Check for time signature change
         time_sig = extract_time_signature(measure_elem, current_time_sig)
-        if composition["measures"] == []:
+        if composition.num_measures == 0:
             # Set initial time signature
-            composition["timeSignature"] = time_sig
+            composition.time_signature = time_sig
         current_time_sig = time_sig
 
-        # Create measure
-        measure = {
-            "timeSignature": time_sig,
-            "events": [],
-            "chords": []
-        }
+        # Events as (time, string, fret, duration) tuples, all in ticks
+        events = []
+        # Chord symbols as (time, name) tuples
+        chords = []
 
-        # Track time within measure (in whole notes)
-        current_time = 0.0
+        # Track time within measure (in ticks)
+        current_time = 0
 
         # Accumulator for chord notes (notes at the same time)
         pending_chord = []  # List of (midi_note, duration)
-        chord_time = 0.0
+        chord_time = 0
 
         def flush_chord():
             """Process accumulated chord notes and add to measure events."""
@@ -360,69 +532,44 @@ def convert_musicxml_to_tab(xml_path: str) -> Dict:
             positions = assign_chord_positions(midi_notes)
 
             for midi_note, string, fret in positions:
-                event = {
-                    "time": chord_time,
-                    "string": string,
-                    "fret": fret,
-                    "duration": duration,
-                    "leftFinger": None
-                }
-                measure["events"].append(event)
+                events.append((chord_time, string, fret, duration))
 
             pending_chord = []
 
         # Process notes and rests
         for elem in measure_elem:
             if elem.tag == 'note':
+                is_rest, is_chord, step, octave, alter, duration_text = read_note(elem)
+                duration = parse_musicxml_ticks(int(duration_text), divisions, ticks_per_quarter) \
+                    if duration_text else None
+
                 # Check if it's a rest
-                if elem.find('rest') is not None:
+                if is_rest:
                     # Flush any pending chord before processing rest
                     flush_chord()
                     # Process rest - just advance time
-                    duration_elem = elem.find('duration')
-                    if duration_elem is not None and duration_elem.text:
-                        duration = parse_musicxml_duration(
-                            int(duration_elem.text), divisions
-                        )
+                    if duration is not None:
                         current_time += duration
                     continue
 
-                # Check if it's a chord (simultaneous with previous note)
-                is_chord = elem.find('chord') is not None
-
-                # If not a chord note, flush any pending chord first
+                # If not a chord note (simultaneous with previous note), flush any pending chord first
                 if not is_chord:
                     flush_chord()
                     chord_time = current_time
 
-                # Get pitch
-                pitch_elem = elem.find('pitch')
-                if pitch_elem is None:
-                    # Unpitched note (percussion) - skip
-                    continue
-
-                step = pitch_elem.find('step')
-                octave = pitch_elem.find('octave')
-                alter = pitch_elem.find('alter')
-
+                # Get pitch (unpitched percussion notes have no step/octave - skip)
                 if step is None or octave is None:
                     continue
 
-                step_val = step.text
-                octave_val = int(octave.text)
-                alter_val = int(alter.text) if alter is not None and alter.text else 0
+                octave_val = int(octave)
+                alter_val = int(alter) if alter else 0
 
                 # Convert to MIDI
-                midi_note = pitch_to_midi(step_val, octave_val, alter_val)
+                midi_note = pitch_to_midi(step, octave_val, alter_val)
 
-                # Get duration
-                duration_elem = elem.find('duration')
-                if duration_elem is not None and duration_elem.text:
-                    duration = parse_musicxml_duration(
-                        int(duration_elem.text), divisions
-                    )
-                else:
-                    duration = 0.25  # Default to quarter note
+                # Default to quarter note if duration is missing
+                if duration is None:
+                    duration = ticks_per_quarter
 
                 # Add to pending chord
                 pending_chord.append((midi_note, duration))
@@ -460,54 +607,48 @@ def convert_musicxml_to_tab(xml_path: str) -> Dict:
                             chord_name += 'm7'
                         # Add more as needed
 
-                    measure["chords"].append({
-                        "time": current_time,
-                        "name": chord_name
-                    })
+                    chords.append((current_time, chord_name))
 
             elif elem.tag == 'forward':
                 # Forward moves time ahead
                 flush_chord()  # Flush before forward
-                duration_elem = elem.find('duration')
-                if duration_elem is not None and duration_elem.text:
-                    duration = parse_musicxml_duration(
-                        int(duration_elem.text), divisions
-                    )
+                duration = read_ticks(elem)
+                if duration is not None:
                     current_time += duration
 
             elif elem.tag == 'backup':
                 # Backup moves time back
                 flush_chord()  # Flush before backup
-                duration_elem = elem.find('duration')
-                if duration_elem is not None and duration_elem.text:
-                    duration = parse_musicxml_duration(
-                        int(duration_elem.text), divisions
-                    )
+                duration = read_ticks(elem)
+                if duration is not None:
                     current_time = max(0, current_time - duration)
 
         # Flush any remaining pending chord at end of measure
         flush_chord()
 
-        # Sort events by time
-        measure["events"].sort(key=lambda e: (e["time"], e["string"]))
+        # Sort events by time, then string (plain integer tuple comparison)
+        events.sort()
 
-        # Validate measure duration matches time signature
-        expected_duration = calculate_measure_duration(time_sig)
-        actual_extent = get_measure_event_extent(measure)
+        # Store the measure's columns
+        measure_idx = composition.add_measure(time_sig, chords)
+        for time, string, fret, duration in events:
+            composition.add_event(time, string, fret, duration)
+
+        # Validate measure duration matches time signature (exact, in ticks)
+        expected_ticks = calculate_measure_ticks(time_sig, ticks_per_whole)
+        actual_ticks = composition.measure_extent(measure_idx)
 
         # Check if measure has incorrect beat count
-        # Allow small tolerance for floating point errors (0.01 whole notes = 1/100 of a measure)
-        tolerance = 0.01
-        if actual_extent > 0 and abs(actual_extent - expected_duration) > tolerance:
+        if actual_ticks > 0 and actual_ticks != expected_ticks:
+            expected_duration = ticks_to_whole_notes(expected_ticks, ticks_per_whole)
+            actual_extent = ticks_to_whole_notes(actual_ticks, ticks_per_whole)
+
             # Calculate beats (for logging)
             beats_expected, beat_type = parse_time_signature(time_sig)
-            beats_actual = actual_extent * beat_type / 4.0
+            beats_actual = actual_ticks * beat_type / ticks_per_whole
 
             # Add warning metadata to measure
-            if "_warnings" not in measure:
-                measure["_warnings"] = []
-
-            measure["_warnings"].append({
+            composition.add_warning(measure_idx, {
                 "type": "incorrect_beat_count",
                 "message": f"Measure has {beats_actual:.2f} beats but time signature expects {beats_expected}",
                 "expected_duration": expected_duration,
@@ -517,36 +658,13 @@ def convert_musicxml_to_tab(xml_path: str) -> Dict:
 
             # Log warning for debugging
             import sys
-            measure_num = len(composition["measures"]) + 1
+            measure_num = measure_idx + 1
             print(f"Warning: Measure {measure_num} has {beats_actual:.2f} beats but time signature {time_sig} expects {beats_expected}",
                   file=sys.stderr)
 
-        composition["measures"].append(measure)
-
     # Ensure at least one measure
-    if not composition["measures"]:
-        composition["measures"].append({
-            "timeSignature": composition["timeSignature"],
-            "events": [],
-            "chords": []
-        })
-
-    # Add validation summary to composition metadata
-    validation_issues = []
-    for i, measure in enumerate(composition["measures"]):
-        if "_warnings" in measure:
-            for warning in measure["_warnings"]:
-                validation_issues.append({
-                    "measure_number": i + 1,
-                    **warning
-                })
-
-    if validation_issues:
-        composition["_validation"] = {
-            "has_issues": True,
-            "issue_count": len(validation_issues),
-            "issues": validation_issues
-        }
+    if composition.num_measures == 0:
+        composition.add_measure(composition.time_signature)
 
     return composition
 
@@ -571,19 +689,156 @@ def convert_file(input_path: str, output_path: str = None) -> Dict:
     return composition
 
 
-def merge_compositions(compositions: List[Dict]) -> Dict:
+def collect_batch_inputs(sources: List[str]) -> List[Tuple[str, str]]:
+    """
+    Expand batch CLI sources (files, directories or glob patterns) into inputs.
+
+    Args:
+        sources: Paths, directories (searched recursively) or glob patterns
+
+    Returns:
+        Sorted list of (input_path, relative_output_name) tuples. Files found
+        under a directory keep their path relative to it, so outputs don't collide.
+    """
+    inputs = {}
+
+    for source in sources:
+        if os.path.isdir(source):
+            for dirpath, _, filenames in os.walk(source):
+                for filename in filenames:
+                    if filename.lower().endswith(MUSICXML_EXTENSIONS):
+                        path = os.path.join(dirpath, filename)
+                        inputs[os.path.abspath(path)] = os.path.relpath(path, source)
+        elif any(char in source for char in '*?['):
+            for path in glob.glob(source, recursive=True):
+                if os.path.isfile(path):
+                    inputs[os.path.abspath(path)] = os.path.basename(path)
+        else:
+            inputs[os.path.abspath(source)] = os.path.basename(source)
+
+    return sorted(inputs.items())
+
+
+def write_json_atomic(composition: TabComposition, output_path: str) -> None:
+    """Write a composition to JSON via a temp file + rename, so readers never see partial output."""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=output_dir)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            composition.write_json(f)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def convert_batch_item(input_path: str, output_path: str, force: bool = False) -> Dict:
+    """
+    Convert one batch input (runs in a worker process).
+
+    Returns:
+        Result dictionary with status "converted", "skipped" or "failed"
+    """
+    result = {"input": input_path, "output": output_path}
+
+    if not force and os.path.exists(output_path) and \
+            os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+        result["status"] = "skipped"
+        return result
+
+    start = time.perf_counter()
+    try:
+        composition = convert_musicxml_to_columns(input_path)
+        write_json_atomic(composition, output_path)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        return result
+
+    result.update({
+        "status": "converted",
+        "measures": composition.num_measures,
+        "notes": len(composition),
+        "validation_issues": len(composition.validation_issues()),
+        "seconds": time.perf_counter() - start
+    })
+    return result
+
+
+def convert_batch(sources: List[str], output_dir: Optional[str] = None,
+                  workers: Optional[int] = None, force: bool = False) -> Dict:
     """
-    Merge multiple TabComposition dictionaries (from multiple pages).
+    Convert many MusicXML files in a process pool.
 
     Args:
-        compositions: List of TabComposition dictionaries
+        sources: Files, directories or glob patterns (see collect_batch_inputs)
+        output_dir: Directory for JSON outputs (default: next to each input)
+        workers: Number of worker processes (default: CPU count)
+        force: Convert even if the output is newer than the input
 
     Returns:
-        Single merged TabComposition
+        Summary dictionary with counts, throughput and failures
+    """
+    inputs = collect_batch_inputs(sources)
+
+    jobs = []
+    for input_path, relative_name in inputs:
+        if output_dir:
+            output_path = os.path.join(output_dir, os.path.splitext(relative_name)[0] + '.json')
+        else:
+            output_path = os.path.splitext(input_path)[0] + '.json'
+        jobs.append((input_path, output_path))
+
+    start = time.perf_counter()
+    results = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(convert_batch_item, input_path, output_path, force)
+                       for input_path, output_path in jobs]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    converted = [r for r in results if r["status"] == "converted"]
+    failed = [r for r in results if r["status"] == "failed"]
+    notes = sum(r["notes"] for r in converted)
+
+    return {
+        "files_total": len(results),
+        "converted": len(converted),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": len(failed),
+        "measures": sum(r["measures"] for r in converted),
+        "notes": notes,
+        "validation_issues": sum(r["validation_issues"] for r in converted),
+        "files_with_validation_issues": sum(1 for r in converted if r["validation_issues"]),
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(len(converted) / elapsed, 2) if elapsed > 0 else 0.0,
+        "notes_per_second": round(notes / elapsed, 1) if elapsed > 0 else 0.0,
+        "failures": [{"input": r["input"], "error": r["error"]} for r in failed]
+    }
+
+
+def merge_compositions(compositions: List) -> Dict:
+    """
+    Merge multiple TabCompositions (from multiple pages).
+
+    Not used by the server: OMR jobs stream pages to disk (StreamingCompositionWriter).
+
+    Args:
+        compositions: List of TabComposition objects or TabComposition dictionaries
+
+    Returns:
+        Single merged TabComposition (of the same kind as the inputs)
     """
     if not compositions:
         raise ValueError("No compositions to merge")
 
+    if all(isinstance(comp, TabComposition) for comp in compositions):
+        return TabComposition.concatenate(compositions)
+
     if len(compositions) == 1:
         return compositions[0]
 
@@ -610,15 +865,37 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Convert MusicXML to GuitarHub TabComposition format"
     )
-    parser.add_argument("input", help="Input MusicXML file (.mxl or .musicxml)")
-    parser.add_argument("-o", "--output", help="Output JSON file (optional)")
+    parser.add_argument("input", nargs='+',
+                        help="Input MusicXML file (.mxl or .musicxml); in batch mode, "
+                             "files, directories or glob patterns")
+    parser.add_argument("-o", "--output",
+                        help="Output JSON file (optional; single input only, see --out-dir)")
     parser.add_argument("-v", "--verbose", action="store_true",
                         help="Print composition summary")
+    parser.add_argument("--batch", action="store_true",
+                        help="Batch mode (implied by several inputs, a directory or a glob)")
+    parser.add_argument("--out-dir",
+                        help="Batch mode: directory for JSON outputs (default: next to inputs)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Batch mode: worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="Batch mode: convert even if the output is newer than the input")
 
     args = parser.parse_args()
 
+    batch_mode = args.batch or args.out_dir or len(args.input) > 1 or \
+        os.path.isdir(args.input[0]) or any(c in args.input[0] for c in '*?[')
+
+    if batch_mode and args.output:
+        parser.error("-o/--output takes a single input file; use --out-dir in batch mode")
+
+    if batch_mode:
+        summary = convert_batch(args.input, args.out_dir, args.jobs, args.force)
+        print(json.dumps(summary, indent=2))
+        exit(1 if summary["failed"] else 0)
+
     try:
-        composition = convert_file(args.input, args.output)
+        composition = convert_file(args.input[0], args.output)
 
         if args.verbose or not args.output:
             print(f"Title: {composition['title']}")
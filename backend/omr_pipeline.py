@@ -3,12 +3,14 @@
 OMR Pipeline - Orchestrates the full OMR processing flow.
 
 Pipeline steps:
-1. Validate input file (PDF or image)
-2. Convert PDF to images (if needed)
-3. Auto-downsample large images
-4. Run Audiveris OMR
+1. Validate input file (PDF, image or MusicXML)
+2. Convert PDF to images / split multi-frame images (if needed)
+3. Deskew/despeckle/crop pages (page_preprocess.py) and auto-downsample large images
+4. Run Audiveris OMR (failed pages retried with preprocessed variants)
 5. Convert MusicXML to TabComposition
 6. Return result with title extracted
+
+MusicXML uploads (.mxl/.musicxml/.xml) skip steps 2-4 and are converted directly.
 """
 
 import json
@@ -16,22 +18,33 @@ import os
 import re
 import shutil
 import subprocess
-import tempfile
 import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from threading import Thread
 
-from PIL import Image
+from PIL import Image, ImageOps
 
 # Import our converter
-from musicxml_to_tab import convert_musicxml_to_tab, merge_compositions, extract_title
+from musicxml_to_tab import convert_musicxml_to_columns, extract_title
+from page_preprocess import preprocess_page
+from scratch_storage import ScratchSpace
+from tab_composition import StreamingCompositionWriter
 
 # Constants
 MAX_PIXELS = 20_000_000  # Audiveris limit
 JOB_RETENTION_DAYS = 7  # Keep jobs for 7 days
+AUDIVERIS_TIMEOUT = 600  # Seconds per Audiveris run on an original page
+RETRY_ATTEMPT_TIMEOUT = 180  # Seconds per retry attempt on a failed page
+JOB_DEADLINE_SECONDS = 45 * 60  # Overall time budget for one job
+
+# Deskew/despeckle/crop pages before recognition (OMR_PREPROCESS=0 disables)
+PREPROCESS_PAGES = os.getenv('OMR_PREPROCESS', '1') != '0'
+
+# Audiveris errors a preprocessed retry cannot fix
+PERMANENT_ERRORS = {"Audiveris not installed"}
 
 # Platform-specific Audiveris path
 import platform
@@ -42,7 +55,11 @@ elif platform.system() == "Darwin":  # macOS
 else:
     AUDIVERIS_PATH = "audiveris"  # Assume it's in PATH
 SUPPORTED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif'}
-SUPPORTED_EXTENSIONS = SUPPORTED_IMAGE_EXTENSIONS | {'.pdf'}
+SUPPORTED_MUSICXML_EXTENSIONS = {'.mxl', '.musicxml', '.xml'}
+SUPPORTED_EXTENSIONS = SUPPORTED_IMAGE_EXTENSIONS | SUPPORTED_MUSICXML_EXTENSIONS | {'.pdf'}
+
+# MusicXML uploads up to this size are converted within the upload request
+SYNC_MUSICXML_MAX_BYTES = 2 * 1024 * 1024
 
 # Job storage (in-memory for simplicity, could be Redis/DB in production)
 _jobs: Dict[str, Dict] = {}
@@ -59,7 +76,7 @@ class OMRJob:
         self.progress = ""
         self.pages_total = 0
         self.pages_completed = 0
-        self.result = None
+        self.result = None  # CompositionHandle to the saved result once completed
         self.error = None
         self.created_at = time.time()
 
@@ -289,7 +306,40 @@ def validate_file(file_path: str) -> Tuple[bool, str]:
     return True, ""
 
 
-def convert_pdf_to_images(pdf_path: str, output_dir: str, dpi: int = 200) -> List[str]:
+def is_musicxml_file(file_path: str) -> bool:
+    """Check if a file is MusicXML (converted directly, without OMR)."""
+    return Path(file_path).suffix.lower() in SUPPORTED_MUSICXML_EXTENSIONS
+
+
+def image_bytes(image: Image.Image) -> int:
+    """Uncompressed size of an image; an upper bound for its PNG file."""
+    return image.width * image.height * len(image.getbands())
+
+
+def save_image(image: Image.Image, path: str, scratch: Optional[ScratchSpace] = None, **params) -> str:
+    """
+    Save an image, placing it in scratch space first if given (tmpfs or spill
+    directory, chosen before anything is written).
+
+    Returns:
+        Path the image was written to
+    """
+    if scratch is not None:
+        path = scratch.place(path, image_bytes(image))
+    image.save(path, **params)
+    return scratch.keep(path) if scratch is not None else path
+
+
+def discard(path: str, scratch: Optional[ScratchSpace] = None) -> None:
+    """Delete an intermediate file, returning its bytes to the scratch budget."""
+    if scratch is not None:
+        scratch.release(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def convert_pdf_to_images(pdf_path: str, output_dir: str, dpi: int = 200,
+                          scratch: Optional[ScratchSpace] = None) -> List[str]:
     """Convert PDF pages to images."""
     from pdf2image import convert_from_path
 
@@ -302,13 +352,36 @@ def convert_pdf_to_images(pdf_path: str, output_dir: str, dpi: int = 200) -> Lis
 
     for i, image in enumerate(images):
         image_path = os.path.join(output_dir, f"{pdf_name}_page_{i+1}.png")
-        image.save(image_path, "PNG")
-        image_paths.append(image_path)
+        image_paths.append(save_image(image, image_path, scratch, format="PNG"))
 
     return image_paths
 
 
-def downsample_if_needed(image_path: str, max_pixels: int = MAX_PIXELS) -> str:
+def count_image_frames(image_path: str) -> int:
+    """Number of frames (pages) in an image; multi-page TIFFs and animated GIFs have several."""
+    with Image.open(image_path) as img:
+        return getattr(img, "n_frames", 1)
+
+
+def iter_image_frames(image_path: str, output_dir: str,
+                      scratch: Optional[ScratchSpace] = None) -> Iterator[str]:
+    """
+    Split a multi-frame image into one PNG per frame.
+
+    Frames are decoded lazily with seek() as the caller advances, so only the
+    current frame is held in memory.
+    """
+    stem = Path(image_path).stem
+    with Image.open(image_path) as img:
+        for i in range(getattr(img, "n_frames", 1)):
+            img.seek(i)
+            frame = img if img.mode in ("1", "L", "P", "RGB", "RGBA") else img.convert("RGB")
+            frame_path = os.path.join(output_dir, f"{stem}_page_{i+1}.png")
+            yield save_image(frame, frame_path, scratch, format="PNG")
+
+
+def downsample_if_needed(image_path: str, max_pixels: int = MAX_PIXELS,
+                         scratch: Optional[ScratchSpace] = None) -> str:
     """Downsample image if it exceeds max_pixels."""
     with Image.open(image_path) as img:
         width, height = img.size
@@ -328,15 +401,19 @@ def downsample_if_needed(image_path: str, max_pixels: int = MAX_PIXELS) -> str:
         # Save to new file
         base, ext = os.path.splitext(image_path)
         new_path = f"{base}_downsampled{ext}"
-        downsampled.save(new_path, quality=95)
-
-        return new_path
+        return save_image(downsampled, new_path, scratch, quality=95)
 
 
-def run_audiveris(image_path: str, output_dir: str) -> Tuple[Optional[str], Optional[str]]:
+def run_audiveris(image_path: str, output_dir: str,
+                  timeout: float = AUDIVERIS_TIMEOUT) -> Tuple[Optional[str], Optional[str]]:
     """
     Run Audiveris on a single image.
 
+    Args:
+        image_path: Page image
+        output_dir: Directory for the MusicXML output
+        timeout: Seconds before the run is killed
+
     Returns:
         Tuple of (output_path, error_message)
     """
@@ -347,7 +424,7 @@ def run_audiveris(image_path: str, output_dir: str) -> Tuple[Optional[str], Opti
             cmd,
             capture_output=True,
             text=True,
-            timeout=600  # 10 minute timeout
+            timeout=timeout
         )
 
         if result.returncode != 0:
@@ -377,13 +454,159 @@ def run_audiveris(image_path: str, output_dir: str) -> Tuple[Optional[str], Opti
         return None, "No MusicXML output generated"
 
     except subprocess.TimeoutExpired:
-        return None, "Processing timeout (10 minutes)"
+        return None, f"Processing timeout ({timeout / 60:g} minutes)"
     except FileNotFoundError:
         return None, "Audiveris not installed"
     except Exception as e:
         return None, str(e)
 
 
+def enhance_contrast(image_path: str, scratch: Optional[ScratchSpace] = None) -> List[str]:
+    """Retry variant: grayscale with the histogram stretched (faint or grey scans)."""
+    base, _ = os.path.splitext(image_path)
+    path = f"{base}_contrast.png"
+    with Image.open(image_path) as img:
+        return [save_image(ImageOps.autocontrast(img.convert("L"), cutoff=1), path, scratch)]
+
+
+def upscale_page(image_path: str, factor: float = 2.0,
+                 scratch: Optional[ScratchSpace] = None) -> List[str]:
+    """Retry variant: enlarged page (low-resolution scans, small staff heights)."""
+    with Image.open(image_path) as img:
+        width, height = img.size
+        factor = min(factor, (MAX_PIXELS / (width * height)) ** 0.5)
+        if factor < 1.25:
+            return []  # Already near the Audiveris pixel limit
+
+        base, _ = os.path.splitext(image_path)
+        path = f"{base}_upscale.png"
+        upscaled = img.convert("L").resize((int(width * factor), int(height * factor)),
+                                           Image.Resampling.LANCZOS)
+        return [save_image(upscaled, path, scratch)]
+
+
+def split_into_bands(image_path: str, bands: int = 2,
+                     scratch: Optional[ScratchSpace] = None) -> List[str]:
+    """
+    Retry variant: horizontal bands recognized separately (dense pages where
+    Audiveris fails to find systems). Cuts are placed at the brightest row near
+    each even split, i.e. in the white space between systems.
+    """
+    base, _ = os.path.splitext(image_path)
+    paths = []
+    with Image.open(image_path) as img:
+        gray = img.convert("L")
+        width, height = gray.size
+        # Mean brightness of each row
+        rows = gray.resize((1, height), Image.Resampling.BOX).tobytes()
+
+        cuts = [0]
+        window = max(1, height // (bands * 4))
+        for k in range(1, bands):
+            target = height * k // bands
+            low = max(cuts[-1] + 1, target - window)
+            high = min(height - 1, target + window)
+            cuts.append(max(range(low, high + 1), key=lambda y: rows[y]))
+        cuts.append(height)
+
+        for n, (top, bottom) in enumerate(zip(cuts, cuts[1:])):
+            path = f"{base}_band_{n + 1}.png"
+            paths.append(save_image(gray.crop((0, top, width, bottom)), path, scratch))
+    return paths
+
+
+# Retry ladder for pages Audiveris could not read: (strategy name, variant
+# builder returning the images to recognize in page order), cheapest first
+RETRY_LADDER = [
+    ("contrast", enhance_contrast),
+    ("upscale", upscale_page),
+    ("bands", split_into_bands),
+]
+
+
+# Suffixes the pipeline adds to page image names (page number, retry variant,
+# downsampling); Audiveris titles its output after the image name
+PAGE_NAME_SUFFIX_RE = re.compile(r'(_page_\d+)?(_(contrast|upscale|band_\d+|downsampled))*$')
+
+
+def retry_failed_page(image_path: str, output_dir: str, deadline: float,
+                      scratch: Optional[ScratchSpace] = None) -> Tuple[List[str], Optional[str]]:
+    """
+    Run a failed page through RETRY_LADDER until one strategy yields MusicXML.
+
+    Each strategy gets at most RETRY_ATTEMPT_TIMEOUT seconds, shared by all its
+    images, and no strategy starts after the job deadline.
+
+    Returns:
+        Tuple of (MusicXML paths in page order, strategy name); ([], None) if
+        every strategy failed
+    """
+    for name, build_variants in RETRY_LADDER:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        attempt_deadline = time.time() + min(RETRY_ATTEMPT_TIMEOUT, remaining)
+
+        temp_files = []
+        mxl_paths = []
+        try:
+            variants = build_variants(image_path, scratch=scratch)
+            temp_files.extend(variants)
+            for variant in variants:
+                processing_path = downsample_if_needed(variant, scratch=scratch)
+                if processing_path != variant:
+                    temp_files.append(processing_path)
+
+                timeout = attempt_deadline - time.time()
+                mxl_path, error = run_audiveris(processing_path, output_dir, timeout=timeout) \
+                    if timeout > 0 else (None, "Retry attempt timed out")
+                if not mxl_path:
+                    mxl_paths = []
+                    print(f"Warning: Retry '{name}' failed for {image_path}: {error}")
+                    break
+                mxl_paths.append(mxl_path)
+        except Exception as e:
+            mxl_paths = []
+            print(f"Warning: Retry '{name}' failed for {image_path}: {e}")
+        finally:
+            for path in temp_files:
+                discard(path, scratch)
+
+        if mxl_paths:
+            return mxl_paths, name
+
+    return [], None
+
+
+def process_musicxml(job: OMRJob) -> None:
+    """
+    Convert an uploaded MusicXML file straight to a TabComposition.
+
+    No PDF rendering or Audiveris run is needed, so this takes milliseconds
+    instead of minutes. Conversion errors propagate to the caller.
+    """
+    job.pages_total = 1
+    job.progress = "Converting MusicXML..."
+
+    writer = StreamingCompositionWriter(os.path.join(job.output_dir, "composition.json"))
+    try:
+        writer.add_page(convert_musicxml_to_columns(job.input_path))
+        writer.metadata["_processing"] = {
+            "source": "musicxml",
+            "pages_total": 1,
+            "pages_processed": 1,
+            "failed_pages": []
+        }
+        job.result = writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+
+    job.pages_completed = 1
+    job.status = "completed"
+    job.progress = "Done"
+
+
 def process_omr(job: OMRJob) -> None:
     """
     Process OMR job in background thread.
@@ -393,6 +616,7 @@ def process_omr(job: OMRJob) -> None:
     try:
         job.status = "processing"
         job.progress = "Validating input..."
+        deadline = time.time() + JOB_DEADLINE_SECONDS
 
         # Validate input
         valid, error = validate_file(job.input_path)
@@ -401,8 +625,14 @@ def process_omr(job: OMRJob) -> None:
             job.error = error
             return
 
-        # Create temp directory for processing
-        temp_dir = tempfile.mkdtemp(prefix="omr_")
+        if is_musicxml_file(job.input_path):
+            process_musicxml(job)
+            return
+
+        # Scratch space for intermediates (disk or tmpfs, see scratch_storage.py)
+        scratch = ScratchSpace(job.job_id)
+        temp_dir = scratch.path
+        print(f"OMR job {job.job_id}: scratch mode {scratch.mode} at {scratch.path}")
         mxl_output_dir = os.path.join(job.output_dir, "mxl")
         os.makedirs(mxl_output_dir, exist_ok=True)
 
@@ -413,102 +643,163 @@ def process_omr(job: OMRJob) -> None:
 
             if ext == '.pdf':
                 job.progress = "Converting PDF to images..."
-                images_to_process = convert_pdf_to_images(
-                    job.input_path, temp_dir, dpi=200
-                )
+                images_to_process = convert_pdf_to_images(job.input_path, temp_dir, dpi=200,
+                                                          scratch=scratch)
+                job.pages_total = len(images_to_process)
             else:
-                # Copy image to temp dir
-                temp_image = os.path.join(temp_dir, os.path.basename(job.input_path))
-                shutil.copy2(job.input_path, temp_image)
-                images_to_process = [temp_image]
+                job.pages_total = count_image_frames(job.input_path)
+                if job.pages_total > 1:
+                    # Multi-page TIFF / animated GIF: one page per frame, split as we go
+                    images_to_process = iter_image_frames(job.input_path, temp_dir, scratch=scratch)
+                else:
+                    # Link (or copy) the image into scratch space
+                    images_to_process = [scratch.import_file(job.input_path)]
 
-            job.pages_total = len(images_to_process)
             job.progress = f"Processing {job.pages_total} page(s)..."
 
-            # Process each image
+            # Process each image, appending each page's measures to the result
+            # file as soon as the page is converted
+            result_path = os.path.join(job.output_dir, "composition.json")
+            writer = StreamingCompositionWriter(result_path)
             mxl_files = []
-            compositions = []
+            pages_processed = 0
             failed_pages = []
+            recovered_pages = []
+            deadline_exceeded = False
+            preprocess_stats = {"skew_degrees": [], "timings": {}}
 
-            for i, image_path in enumerate(images_to_process):
-                job.progress = f"Processing page {i+1} of {job.pages_total}..."
-
-                # Downsample if needed
-                processing_path = downsample_if_needed(image_path)
-
-                # Run Audiveris
-                mxl_path, error = run_audiveris(processing_path, mxl_output_dir)
-
-                # Clean up downsampled file
-                if processing_path != image_path and os.path.exists(processing_path):
-                    os.remove(processing_path)
-
-                if mxl_path:
-                    mxl_files.append(mxl_path)
-                    # Convert to TabComposition
-                    try:
-                        comp = convert_musicxml_to_tab(mxl_path)
-                        compositions.append(comp)
-                    except Exception as e:
-                        # Log but continue with other pages
-                        print(f"Warning: Failed to convert {mxl_path}: {e}")
+            try:
+                for i, image_path in enumerate(images_to_process):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        # Out of time: the rest of the pages count as failed
+                        deadline_exceeded = True
+                        failed_pages.extend(range(i + 1, job.pages_total + 1))
+                        print(f"Warning: Job deadline exceeded at page {i+1}")
+                        break
+
+                    job.progress = f"Processing page {i+1} of {job.pages_total}..."
+                    page_files = [image_path]
+
+                    # Deskew, despeckle and crop; the original page is used if this fails.
+                    # The cleaned page keeps the page's file stem (Audiveris names its
+                    # output after it)
+                    if PREPROCESS_PAGES:
+                        try:
+                            with Image.open(image_path) as page:
+                                cleaned_path = scratch.place(os.path.join(
+                                    scratch.subdir("preprocessed"), f"{Path(image_path).stem}.png"),
+                                    image_bytes(page))
+                            page_files.append(cleaned_path)
+                            image_path, stats = preprocess_page(image_path, cleaned_path)
+                            image_path = scratch.keep(image_path)
+                            preprocess_stats["skew_degrees"].append(stats["skew_degrees"])
+                            for step, seconds in stats["timings"].items():
+                                timings = preprocess_stats["timings"]
+                                timings[step] = round(timings.get(step, 0) + seconds, 4)
+                        except Exception as e:
+                            print(f"Warning: Preprocessing failed for page {i+1}: {e}")
+
+                    # Downsample if needed
+                    processing_path = downsample_if_needed(image_path, scratch=scratch)
+
+                    # Run Audiveris
+                    mxl_path, error = run_audiveris(processing_path, mxl_output_dir,
+                                                    timeout=min(AUDIVERIS_TIMEOUT, remaining))
+
+                    # Clean up downsampled file
+                    if processing_path != image_path:
+                        scratch.release(processing_path)
+
+                    page_mxl_paths = [mxl_path] if mxl_path else []
+                    if not mxl_path and error not in PERMANENT_ERRORS:
+                        # Retry just this page with preprocessed variants
+                        print(f"Warning: Audiveris failed for page {i+1}: {error}, retrying")
+                        job.progress = f"Retrying page {i+1} of {job.pages_total}..."
+                        page_mxl_paths, strategy = retry_failed_page(
+                            image_path, mxl_output_dir, deadline, scratch=scratch)
+                        if strategy:
+                            recovered_pages.append({"page": i + 1, "strategy": strategy})
+
+                    if page_mxl_paths:
+                        mxl_files.extend(page_mxl_paths)
+                        # Convert to TabComposition and append to the result
+                        try:
+                            pages = [convert_musicxml_to_columns(path) for path in page_mxl_paths]
+                            for comp in pages:
+                                writer.add_page(comp)
+                            pages_processed += 1
+                        except Exception as e:
+                            # Log but continue with other pages
+                            print(f"Warning: Failed to convert {page_mxl_paths}: {e}")
+                            failed_pages.append(i + 1)
+                    else:
+                        # Audiveris failed for this page
                         failed_pages.append(i + 1)
-                else:
-                    # Audiveris failed for this page
-                    failed_pages.append(i + 1)
-                    print(f"Warning: Audiveris failed for page {i+1}: {error}")
-
-                job.pages_completed = i + 1
-
-            # Check if we got any results
-            if not compositions:
-                job.status = "failed"
-                job.error = "No music notation could be recognized in the uploaded file"
-                return
-
-            # Merge compositions from all pages
-            job.progress = "Merging pages..."
-            merged = merge_compositions(compositions)
-
-            # Use original filename as title (remove any _page_N suffix)
-            original_name = Path(job.input_path).stem
-            # Remove _page_N suffix pattern if present
-            clean_title = re.sub(r'_page_\d+$', '', merged["title"])
-            if clean_title == "Untitled" or clean_title != merged["title"]:
-                merged["title"] = original_name
-
-            # Add processing stats
-            merged["_processing"] = {
-                "pages_total": job.pages_total,
-                "pages_processed": len(compositions),
-                "failed_pages": failed_pages
-            }
-
-            # Save result
-            result_path = os.path.join(job.output_dir, "composition.json")
-            with open(result_path, 'w') as f:
-                json.dump(merged, f, indent=2)
-
-            job.result = merged
-            job.status = "completed"
-            job.progress = "Done"
+                        print(f"Warning: Audiveris failed for page {i+1}: {error}")
+
+                    job.pages_completed = i + 1
+                    # The page's images are no longer needed; free their scratch bytes
+                    for path in page_files:
+                        scratch.release(path)
+
+                # Check if we got any results
+                if not pages_processed:
+                    writer.abort()
+                    job.status = "failed"
+                    job.error = "Processing deadline exceeded" if deadline_exceeded else \
+                        "No music notation could be recognized in the uploaded file"
+                    return
+
+                job.progress = "Merging pages..."
+
+                # Use original filename as title when the recognized title is just
+                # the page image's name (_page_N and any retry variant suffix)
+                original_name = Path(job.input_path).stem
+                clean_title = PAGE_NAME_SUFFIX_RE.sub('', writer.title, count=1)
+                if clean_title == "Untitled" or clean_title != writer.title:
+                    writer.title = original_name
+
+                # Add processing stats
+                writer.metadata["_processing"] = {
+                    "pages_total": job.pages_total,
+                    "pages_processed": pages_processed,
+                    "failed_pages": failed_pages,
+                    "recovered_pages": recovered_pages,
+                    "deadline_exceeded": deadline_exceeded
+                }
+                if PREPROCESS_PAGES:
+                    writer.metadata["_processing"]["preprocess"] = preprocess_stats
+                writer.metadata["_processing"]["scratch"] = scratch.describe()
+
+                # Finish the result file; the job only keeps a handle to it
+                job.result = writer.close()
+                job.status = "completed"
+                job.progress = "Done"
+
+            except BaseException:
+                writer.abort()
+                raise
 
         finally:
-            # Clean up temp directory
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            # Clean up scratch space
+            print(f"OMR job {job.job_id}: scratch usage {scratch.describe()}")
+            scratch.cleanup()
 
     except Exception as e:
         job.status = "failed"
         job.error = str(e)
 
 
-def start_omr_job(input_path: str, output_dir: str) -> OMRJob:
+def start_omr_job(input_path: str, output_dir: str, background: bool = True) -> OMRJob:
     """
     Start an OMR processing job in background.
 
     Args:
-        input_path: Path to input PDF or image
+        input_path: Path to input PDF, image or MusicXML file
         output_dir: Directory to store output
+        background: If False, process in the calling thread and return the
+                    finished job (used for small MusicXML uploads)
 
     Returns:
         OMRJob object for tracking progress
@@ -517,6 +808,10 @@ def start_omr_job(input_path: str, output_dir: str) -> OMRJob:
 
     job = create_job(input_path, output_dir)
 
+    if not background:
+        process_omr(job)
+        return job
+
     # Start processing in background thread
     thread = Thread(target=process_omr, args=(job,))
     thread.daemon = True
@@ -544,7 +839,7 @@ def process_omr_sync(input_path: str, output_dir: str) -> Dict:
     if job.status == "failed":
         raise Exception(job.error)
 
-    return job.result
+    return job.result.load()
 
 
 # CLI interface
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Token budgeting for LLM prompts.
+
+The assistant sends a long system prompt plus conversation history. Instead of
+a fixed number of turns, build_history() keeps the most recent turns that fit a
+token budget. Turns that no longer fit are folded into a rolling summary that
+is sent as one short system message.
+
+- Token counts come from tiktoken when it is installed (the encoder is loaded
+  once per process); otherwise they are estimated at ~4 characters per token.
+- Summaries are produced by a caller-supplied function (an LLM call in
+  server.py) through a caller-supplied submit function (the server's LLM
+  executor), so they never add latency to a request and count against the
+  same in-flight limit. When it reports busy the summary is skipped and
+  retried on a later request. They are cached by a hash chain over the dropped turns: when more turns
+  drop out later, the newest cached summary of a prefix is extended with only
+  the new turns ("rolling" summary).
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    tiktoken = None
+    HAS_TIKTOKEN = False
+
+# Encoding used when tiktoken does not know the model name
+DEFAULT_ENCODING = "o200k_base"
+
+# Chat format overhead: tokens per message and for priming the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Estimate used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Dropped turns summarized per background call, at most (oldest are summarized first)
+SUMMARY_MAX_NEW_MESSAGES = 12
+
+# Characters of each message passed to the summarizer
+SUMMARY_MESSAGE_CHARS = 1200
+
+# Summaries kept in memory
+SUMMARY_CACHE_SIZE = 512
+
+Message = Dict[str, str]
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model: str = "gpt-4o"):
+    """
+    Load the tiktoken encoder for a model once per process.
+
+    Returns:
+        The encoder, or None when tiktoken is missing or cannot load its data
+        (token counts are then estimated)
+    """
+    if not HAS_TIKTOKEN:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        print(f"Warning: Could not load tiktoken encoding for {model}, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Number of tokens in text (estimated when tiktoken is unavailable)."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Message], model: str = "gpt-4o") -> int:
+    """Prompt tokens for a chat message list, including per-message overhead."""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(str(message.get("content", "")), model)
+    return total
+
+
+def _chain_hashes(messages: List[Message]) -> List[str]:
+    """hashes[i] identifies messages[:i + 1]; extending the list keeps earlier hashes."""
+    hashes = []
+    digest = ""
+    for message in messages:
+        payload = json.dumps([digest, message.get("role"), message.get("content")], ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        hashes.append(digest)
+    return hashes
+
+
+class RollingSummarizer:
+    """Cached, incrementally extended summaries of dropped conversation turns."""
+
+    def __init__(self, summarize: Callable[[Optional[str], List[Message]], str],
+                 max_entries: int = SUMMARY_CACHE_SIZE, submit: Optional[Callable] = None):
+        """
+        Args:
+            summarize: fn(previous_summary or None, new_messages) -> summary text
+            max_entries: Summaries kept (LRU)
+            submit: fn(job) that starts job off the request path without waiting,
+                    e.g. LLMExecutor.try_submit; it raises when busy and the
+                    summary is skipped. None runs the job inline (tests/CLI).
+        """
+        self.summarize = summarize
+        self.max_entries = max_entries
+        self.submit = submit
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, messages: List[Message]) -> Tuple[Optional[str], int]:
+        """
+        Best available summary of the oldest messages.
+
+        Returns:
+            (summary or None, number of leading messages it covers)
+        """
+        hashes = _chain_hashes(messages)
+        with self._lock:
+            for covered in range(len(hashes), 0, -1):
+                summary = self._summaries.get(hashes[covered - 1])
+                if summary is not None:
+                    self._summaries.move_to_end(hashes[covered - 1])
+                    return summary, covered
+        return None, 0
+
+    def refresh(self, dropped: List[Message], summary: Optional[str], covered: int) -> None:
+        """Extend the summary with dropped turns it does not cover yet."""
+        if covered >= len(dropped):
+            return
+        target = min(len(dropped), covered + SUMMARY_MAX_NEW_MESSAGES)
+        key = _chain_hashes(dropped[:target])[-1]
+        with self._lock:
+            if key in self._pending or key in self._summaries:
+                return
+            self._pending.add(key)
+
+        new_messages = [{"role": m.get("role", "user"),
+                         "content": str(m.get("content", ""))[:SUMMARY_MESSAGE_CHARS]}
+                        for m in dropped[covered:target]]
+
+        def run():
+            try:
+                text = self.summarize(summary, new_messages)
+                with self._lock:
+                    self._summaries[key] = text
+                    while len(self._summaries) > self.max_entries:
+                        self._summaries.popitem(last=False)
+            except Exception as e:
+                print(f"Warning: Conversation summary failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        if self.submit is None:
+            run()
+            return
+        try:
+            self.submit(run)
+        except Exception as e:
+            print(f"Warning: Conversation summary skipped: {e}")
+            with self._lock:
+                self._pending.discard(key)
+
+
+def build_history(history: List[Message], budget: int, summarizer: Optional[RollingSummarizer] = None,
+                  model: str = "gpt-4o") -> Tuple[List[Message], Dict]:
+    """
+    Fit conversation history into a token budget.
+
+    Args:
+        history: Previous messages, oldest first
+        budget: Tokens available for history (and its summary)
+        summarizer: Optional RollingSummarizer for turns that do not fit
+        model: Model whose tokenizer to use
+
+    Returns:
+        (messages, stats) - messages to insert between the system prompt and
+        the user message (a summary system message first, if any), and token
+        statistics for logging
+    """
+    history = [m for m in history if isinstance(m, dict) and m.get("content")]
+
+    summary, covered = None, 0
+    summary_tokens = 0
+    remaining = budget
+    kept: List[Message] = []
+    for index in range(len(history) - 1, -1, -1):
+        cost = TOKENS_PER_MESSAGE + count_tokens(str(history[index]["content"]), model)
+        if cost > remaining:
+            break
+        kept.append(history[index])
+        remaining -= cost
+    kept.reverse()
+    dropped = history[:len(history) - len(kept)]
+
+    messages: List[Message] = []
+    if dropped and summarizer:
+        # A summary may already cover turns that would fit (ones it displaced
+        # on an earlier request); those are not sent twice
+        summary, covered = summarizer.lookup(history)
+        while kept and len(history) - len(kept) < covered:
+            oldest = kept.pop(0)
+            remaining += TOKENS_PER_MESSAGE + count_tokens(str(oldest["content"]), model)
+        if summary:
+            summary_message = {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+            summary_tokens = TOKENS_PER_MESSAGE + count_tokens(summary_message["content"], model)
+            # The summary takes the place of the oldest kept turns if needed
+            while kept and summary_tokens > remaining:
+                oldest = kept.pop(0)
+                remaining += TOKENS_PER_MESSAGE + count_tokens(str(oldest["content"]), model)
+            if summary_tokens <= remaining:
+                messages.append(summary_message)
+                remaining -= summary_tokens
+            else:
+                summary_tokens = 0
+        # Turns displaced by the summary are summarized too, so none is lost
+        summarizer.refresh(history[:len(history) - len(kept)], summary, covered)
+
+    messages.extend(kept)
+    stats = {
+        "history_messages": len(history),
+        "kept_messages": len(kept),
+        "dropped_messages": len(history) - len(kept),
+        "summarized_messages": covered if summary_tokens else 0,
+        "history_tokens": budget - remaining - summary_tokens,
+        "summary_tokens": summary_tokens,
+        "budget": budget,
+        "exact": get_encoder(model) is not None
+    }
+    return messages, stats
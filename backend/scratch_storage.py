@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Scratch storage for OMR intermediates (rasterized pages, frames, cleaned pages).
+
+Modes (OMR_SCRATCH_MODE):
+- disk (default): a temp directory under OMR_SCRATCH_DIR or the system temp dir
+- tmpfs: a directory on a RAM-backed filesystem (OMR_SCRATCH_DIR, default
+  /dev/shm). Intermediates count against a per-job budget
+  (OMR_SCRATCH_BUDGET_MB). Writers reserve a file's estimated size with
+  place() before writing; once the budget is used up the file goes to a disk
+  temp directory instead. Deleting a file with release() frees its bytes.
+
+Audiveris and pdf2image need real file paths, so anonymous memfd files are not
+usable here; tmpfs gives the same in-memory I/O with named paths. If the tmpfs
+directory does not exist the job falls back to disk mode.
+
+Uploaded files are brought into scratch space with a hardlink when source and
+scratch share a filesystem, else a reflink (copy-on-write clone), and only
+then a full copy.
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+SCRATCH_MODES = ("disk", "tmpfs")
+DEFAULT_TMPFS_DIR = "/dev/shm"
+DEFAULT_BUDGET_MB = 512
+
+# Linux ioctl request for reflink clones (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def link_or_copy(src: str, dest: str) -> str:
+    """
+    Make dest a cheap duplicate of src.
+
+    Returns:
+        "hardlink", "reflink" or "copy" - the method that worked
+    """
+    try:
+        os.link(src, dest)
+        return "hardlink"
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+        with open(src, 'rb') as src_file, open(dest, 'wb') as dest_file:
+            fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dest)
+        return "reflink"
+    except (OSError, ImportError):
+        if os.path.exists(dest):
+            os.remove(dest)
+
+    shutil.copy2(src, dest)
+    return "copy"
+
+
+class ScratchSpace:
+    """Per-job scratch directory with an optional in-memory budget."""
+
+    def __init__(self, job_id: str, mode: Optional[str] = None, base_dir: Optional[str] = None,
+                 budget_mb: Optional[float] = None):
+        """
+        Args:
+            job_id: Job the space belongs to (used in directory names and logs)
+            mode: "disk" or "tmpfs"; defaults to $OMR_SCRATCH_MODE, then "disk"
+            base_dir: Parent directory; defaults to $OMR_SCRATCH_DIR, then
+                      /dev/shm (tmpfs) or the system temp dir (disk)
+            budget_mb: tmpfs budget; defaults to $OMR_SCRATCH_BUDGET_MB, then 512
+        """
+        mode = mode or os.getenv('OMR_SCRATCH_MODE') or "disk"
+        if mode not in SCRATCH_MODES:
+            raise ValueError(f"Unknown scratch mode: {mode} (expected one of {SCRATCH_MODES})")
+        base_dir = base_dir or os.getenv('OMR_SCRATCH_DIR') or \
+            (DEFAULT_TMPFS_DIR if mode == "tmpfs" else None)
+        if budget_mb is None:
+            budget_mb = float(os.getenv('OMR_SCRATCH_BUDGET_MB') or DEFAULT_BUDGET_MB)
+
+        self.job_id = job_id
+        self.requested_mode = mode
+        if mode == "tmpfs" and not os.path.isdir(base_dir):
+            print(f"Warning: Scratch dir {base_dir} not found, job {job_id} uses disk")
+            mode, base_dir = "disk", None
+
+        self.mode = mode
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.path = tempfile.mkdtemp(prefix=f"omr_{job_id}_", dir=base_dir)
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self.spilled_files = 0
+        self._sizes: Dict[str, int] = {}  # tmpfs path -> bytes counted against the budget
+        self.import_method: Optional[str] = None
+        self._spill_dir: Optional[str] = None
+
+    @property
+    def budgeted(self) -> bool:
+        return self.mode == "tmpfs"
+
+    def _relpath(self, path: str) -> Optional[str]:
+        """Path relative to the scratch or spill directory, None if in neither."""
+        for root in (self.path, self._spill_dir):
+            if root and os.path.commonpath([root, os.path.abspath(path)]) == root:
+                return os.path.relpath(path, root)
+        return None
+
+    def _spill_path(self, relpath: str) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix=f"omr_{self.job_id}_spill_")
+            print(f"OMR job {self.job_id}: scratch budget "
+                  f"{self.budget_bytes / 1024 / 1024:.0f} MB exceeded, spilling to {self._spill_dir}")
+        self.spilled_files += 1
+        path = os.path.join(self._spill_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _account(self, path: str, size: int) -> None:
+        self.used_bytes += size - self._sizes.get(path, 0)
+        self._sizes[path] = size
+        self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+
+    def place(self, path: str, size: int) -> str:
+        """
+        Choose where a file about to be written goes.
+
+        In tmpfs mode `size` (an estimate) is reserved against the budget and
+        path returned if it fits; otherwise the same relative path in a disk
+        temp directory. Call keep() once the file is written.
+
+        Args:
+            path: Intended path inside the scratch (or spill) directory
+            size: Expected size in bytes; an overestimate keeps the budget a bound
+        """
+        relpath = self._relpath(path) if self.budgeted else None
+        if relpath is None:
+            return path
+        if self.used_bytes + size > self.budget_bytes:
+            return self._spill_path(relpath)
+
+        path = os.path.join(self.path, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._account(path, size)
+        return path
+
+    def keep(self, path: str) -> str:
+        """
+        Account for a file written into scratch space.
+
+        A reservation made by place() is replaced by the real size. A file
+        written without one is moved to the disk temp directory (same relative
+        path) if it does not fit the budget, and the new path returned.
+        """
+        if not self.budgeted or os.path.commonpath([self.path, os.path.abspath(path)]) != self.path:
+            return path  # Disk mode, or already in the spill directory
+
+        size = os.path.getsize(path)
+        if path in self._sizes or self.used_bytes + size <= self.budget_bytes:
+            self._account(path, size)
+            return path
+
+        spilled = self._spill_path(os.path.relpath(path, self.path))
+        shutil.move(path, spilled)
+        return spilled
+
+    def release(self, path: str) -> None:
+        """Delete a scratch file and return its bytes to the budget."""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        self.used_bytes -= self._sizes.pop(path, 0)
+
+    def import_file(self, src: str) -> str:
+        """Bring an input file into scratch space (hardlink/reflink/copy)."""
+        dest = os.path.join(self.path, os.path.basename(src))
+        self.import_method = link_or_copy(src, dest)
+        if self.import_method == "hardlink":
+            return dest  # Shares the source's blocks; uses no scratch space
+        return self.keep(dest)
+
+    def subdir(self, name: str) -> str:
+        """Create and return a subdirectory of the scratch space."""
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def describe(self) -> Dict:
+        """Settings and usage, for logs and job metadata."""
+        info = {"mode": self.mode, "path": self.path}
+        if self.requested_mode != self.mode:
+            info["requested_mode"] = self.requested_mode
+        if self.budgeted:
+            info["budget_mb"] = round(self.budget_bytes / 1024 / 1024, 1)
+            info["used_mb"] = round(self.used_bytes / 1024 / 1024, 2)
+            info["peak_mb"] = round(self.peak_bytes / 1024 / 1024, 2)
+            info["spilled_files"] = self.spilled_files
+        if self.import_method:
+            info["import"] = self.import_method
+        return info
+
+    def cleanup(self) -> None:
+        """Remove the scratch directory and any spill directory."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
@@ -4,20 +4,39 @@ GuitarHub Backend API Server
 Provides secure proxy to OpenAI API for the Guitar Assistant feature.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
 import json
 import secrets
+import shutil
 import hashlib
 import uuid
+import time
 from datetime import datetime, timedelta
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # Import OMR pipeline
-from omr_pipeline import start_omr_job, get_job, process_omr_sync, cleanup_old_jobs, cleanup_temp_output_dirs
+from omr_pipeline import (
+    start_omr_job, get_job, process_omr_sync, cleanup_old_jobs, cleanup_temp_output_dirs,
+    is_musicxml_file, SYNC_MUSICXML_MAX_BYTES
+)
+from midi_to_tab import convert_midi_with_tracks, parse_index_list, MIDI_EXTENSIONS
+from tab_wire import encode_compact, wants_compact, COMPACT_FORMAT, COMPACT_MIME_TYPE
+from llm_stream import stream_structured_events, format_sse
+from llm_cache import cache_from_env, make_cache_key, prompt_version, bypass_requested
+from theory_engine import answer_locally
+from tab_generators import suggest_locally
+from prompt_budget import RollingSummarizer, build_history, count_tokens, count_message_tokens
+from llm_prompts import (
+    ASSISTANT_SYSTEM_PROMPT, COMPOSER_SYSTEM_PROMPT, build_assistant_messages, build_composer_messages,
+    format_composition_for_gpt, prompt_cache_params
+)
+from llm_usage import UsageTracker
+from llm_executor import LLMBusyError, executor_from_env
+from llm_singleflight import SingleFlight
+from llm_client import CircuitOpenError, client_from_env, is_retryable
 
 # Load environment variables
 load_dotenv()
@@ -35,11 +54,87 @@ if not OPENAI_API_KEY:
     print("Please set it in your .env file or environment")
     exit(1)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# One pooled client per process: bounded connections, per-call timeouts, retries
+# with backoff on 429/5xx and a circuit breaker (LLM_* settings, see llm_client.py)
+llm = client_from_env(OPENAI_API_KEY)
 
-# Load enhanced system prompt from file
-with open(os.path.join(os.path.dirname(__file__), 'system_prompt.txt'), 'r') as f:
-    SYSTEM_PROMPT = f.read()
+# Static instructions (system_prompt.txt, composer_prompt.txt) lead every prompt
+# so the provider can reuse its cached prefix; per-request data goes last
+SYSTEM_PROMPT = ASSISTANT_SYSTEM_PROMPT
+
+SYSTEM_PROMPT_VERSION = prompt_version(SYSTEM_PROMPT)
+COMPOSER_PROMPT_VERSION = prompt_version(COMPOSER_SYSTEM_PROMPT)
+
+# prompt_cache_key is only sent with prompts long enough to be cached (1024+ tokens)
+SYSTEM_PROMPT_CACHE_PARAMS = prompt_cache_params('assistant', SYSTEM_PROMPT)
+COMPOSER_PROMPT_CACHE_PARAMS = prompt_cache_params('composer', COMPOSER_SYSTEM_PROMPT)
+
+SYSTEM_PROMPT_TOKENS = count_tokens(SYSTEM_PROMPT)
+
+# Tokens of conversation history sent per assistant request; older turns are
+# replaced by a rolling summary (HISTORY_SUMMARY=0 just drops them)
+HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', 3000))
+SUMMARY_MODEL = os.getenv('SUMMARY_MODEL', 'gpt-4o-mini')
+
+# Tokens of composition (compact tab) sent per composer request, newest measures first
+COMPOSITION_TOKEN_BUDGET = int(os.getenv('COMPOSITION_TOKEN_BUDGET', 1200))
+
+
+def summarize_turns(previous_summary, new_messages):
+    """Fold older conversation turns into a short summary (runs off the request path)."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in new_messages)
+    prompt = (
+        "Summarize this guitar lesson conversation in under 120 words for the tutor's memory. "
+        "Keep keys, chords, scales, tempos, the student's level and goals; leave out tabs and JSON."
+    )
+    if previous_summary:
+        transcript = f"Summary so far: {previous_summary}\n\nNewer turns:\n{transcript}"
+
+    start = time.perf_counter()
+    response = llm.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": transcript}
+        ],
+        temperature=0.2,
+        max_tokens=200
+    )
+    log_llm_latency('summary', start, response.usage, model=SUMMARY_MODEL)
+    return response.choices[0].message.content.strip()
+
+
+# Token usage, prompt-cache hits and latency per endpoint (GET /api/llm/usage)
+llm_usage = UsageTracker()
+
+# OpenAI calls run on a bounded I/O pool so chats can't take every request thread
+# (LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUED, LLM_QUEUE_TIMEOUT); a request gives up after
+# LLM_CALL_TIMEOUT seconds (per streamed chunk when streaming)
+llm_executor = executor_from_env()
+LLM_CALL_TIMEOUT = float(os.getenv('LLM_CALL_TIMEOUT', 120))
+
+# Summaries share the in-flight limit and are skipped when no slot is free
+history_summarizer = RollingSummarizer(summarize_turns, submit=llm_executor.try_submit) \
+    if os.getenv('HISTORY_SUMMARY', '1') != '0' else None
+
+# Shown when OpenAI is failing (circuit open or retries exhausted)
+LLM_UNAVAILABLE_MESSAGE = "The assistant can't reach the AI service right now. Please try again in a minute."
+
+# Identical assistant requests arriving while one is being answered wait for it
+# and share its answer instead of making their own call (LLM_COALESCE=0 disables);
+# at most LLM_MAX_COALESCED of them wait at once, each holding a request thread
+LLM_COALESCE_ENABLED = os.getenv('LLM_COALESCE', '1') != '0'
+assistant_flights = SingleFlight(max_waiting=int(os.getenv('LLM_MAX_COALESCED', 8)))
+
+# Answer scale/chord/arpeggio/progression lookups locally (THEORY_ENGINE=0 disables it)
+THEORY_ENGINE_ENABLED = os.getenv('THEORY_ENGINE', '1') != '0'
+
+# Generate composer bass lines/arpeggios/Travis patterns from the chord annotations
+# locally (TAB_GENERATORS=0 disables it)
+TAB_GENERATORS_ENABLED = os.getenv('TAB_GENERATORS', '1') != '0'
+
+# LLM response cache (memory LRU + disk tier; LLM_CACHE=0 disables it)
+llm_cache = cache_from_env(os.path.join(os.path.dirname(__file__), 'llm_cache'))
 
 # Share storage configuration
 SHARES_DIR = os.path.join(os.path.dirname(__file__), 'shares')
@@ -48,7 +143,7 @@ SHARE_TTL_DAYS = 90  # Shares expire after 90 days
 # OMR configuration
 UPLOADS_DIR = os.path.join(os.path.dirname(__file__), 'uploads')
 OMR_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'omr_jobs')
-ALLOWED_OMR_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'tif'}
+ALLOWED_OMR_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'tif', 'mxl', 'musicxml', 'xml'}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB max upload
 
 # Ensure directories exist
@@ -107,6 +202,28 @@ def load_share(share_id):
     return share_data
 
 
+def composition_response(payload, composition, status=200):
+    """
+    Build a JSON response containing a composition.
+
+    Clients opt into the compact wire format (see tab_wire.py) with
+    `Accept: application/vnd.guitarhub.compact+json` or `?format=compact`.
+    """
+    compact = wants_compact(request.headers.get('Accept'), request.args.get('format'))
+
+    if compact:
+        payload['composition'] = encode_compact(composition)
+        payload['compositionFormat'] = COMPACT_FORMAT
+    else:
+        payload['composition'] = composition
+
+    response = jsonify(payload)
+    if compact:
+        response.mimetype = COMPACT_MIME_TYPE
+    response.headers['Vary'] = 'Accept'
+    return response, status
+
+
 def verify_edit_token(share_data, edit_token):
     """Verify if the provided edit token matches the stored hash."""
     if not edit_token:
@@ -125,8 +242,14 @@ def assistant():
     {
         "message": "Show me a 2-5-1 in C Major",
         "conversation_history": [...],
-        "context": {"bpm": 80, "fretboard_range": [0, 15]}
+        "context": {"bpm": 80, "fretboard_range": [0, 15]},
+        "stream": false  // Optional; or send Accept: text/event-stream
     }
+
+    In streaming mode the response is Server-Sent Events: "chat_response"
+    events carry text deltas as they are generated, "field" events carry
+    fretboard_sequence/tab_display/... as soon as each value is complete, and
+    a final "done" event carries the whole response object ("error" on failure).
     """
     try:
         data = request.get_json()
@@ -138,50 +261,209 @@ def assistant():
         conversation_history = data.get('conversation_history', [])
         context = data.get('context', {})
 
-        # Build messages for OpenAI
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT}
-        ]
-
-        # Add conversation history
-        for msg in conversation_history[-10:]:  # Last 10 messages to keep context manageable
-            messages.append(msg)
-
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
-
-        # Call OpenAI API
-        print(f"Calling OpenAI API for message: {user_message[:50]}...")
-
-        response = client.chat.completions.create(
-            model="gpt-4o",  # or "gpt-4o-mini" for cheaper option
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000,
-            response_format={"type": "json_object"}  # Ensure JSON response
-        )
-
-        # Parse the response
-        response_text = response.choices[0].message.content
-        print(f"Received response: {response_text[:100]}...")
-
-        response_json = json.loads(response_text)
+        streaming = data.get('stream') or 'text/event-stream' in request.headers.get('Accept', '')
+
+        # Plain lookups (scales, chords, progressions) are computed, not generated
+        local_answer = answer_locally(user_message) if THEORY_ENGINE_ENABLED else None
+        if local_answer is not None:
+            print(f"Answered locally: {user_message[:50]}")
+            if streaming:
+                response = Response(stream_structured_events([json.dumps(local_answer)]),
+                                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+            else:
+                response = jsonify(local_answer)
+            response.headers['X-Answer-Source'] = 'theory-engine'
+            return response, 200
+
+        # Keyed by the raw history, so hits never trim or summarize it
+        raw_history = [m for m in conversation_history if isinstance(m, dict) and m.get('content')]
+        request_key = make_cache_key("gpt-4o", SYSTEM_PROMPT_VERSION, raw_history, user_message,
+                                     {"temperature": 0.7, "max_tokens": 2000,
+                                      "history_budget": HISTORY_TOKEN_BUDGET})
+        cache_key = request_key if llm_cache else None
+        cached = None
+        if cache_key and not bypass_requested(request.headers):
+            cached = llm_cache.get(cache_key)
+
+        if cached is not None:
+            if streaming:
+                return stream_assistant_response(None, cache_key, cached)
+            response = jsonify(cached)
+            response.headers['X-Cache'] = 'HIT'
+            return response, 200
+
+        # Build messages for OpenAI: system prompt, as much recent history as fits
+        # the token budget (older turns are summarized), then the user message
+        history_messages, history_stats = build_history(conversation_history, HISTORY_TOKEN_BUDGET,
+                                                        history_summarizer)
+        messages = build_assistant_messages(history_messages, user_message, SYSTEM_PROMPT)
+        log_prompt_tokens(messages, history_stats)
+
+        if streaming:
+            return stream_assistant_response(messages, cache_key)
+
+        def call_assistant():
+            # Call OpenAI API
+            print(f"Calling OpenAI API for message: {user_message[:50]}...")
+
+            start = time.perf_counter()
+            response = llm_executor.run(
+                llm.create,
+                timeout=LLM_CALL_TIMEOUT,
+                model="gpt-4o",  # or "gpt-4o-mini" for cheaper option
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2000,
+                response_format={"type": "json_object"},  # Ensure JSON response
+                **SYSTEM_PROMPT_CACHE_PARAMS
+            )
+            log_llm_latency('assistant', start, response.usage)
+
+            # Parse the response
+            response_text = response.choices[0].message.content
+            print(f"Received response: {response_text[:100]}...")
+
+            response_json = json.loads(response_text)
+            if cache_key and 'chat_response' in response_json:
+                llm_cache.put(cache_key, response_json)
+            return response_json
+
+        shared = False
+        if LLM_COALESCE_ENABLED:
+            # Duplicates wait for the call in flight: its queue wait plus the call itself
+            response_json, shared = assistant_flights.do(
+                request_key, call_assistant, timeout=llm_executor.queue_timeout + LLM_CALL_TIMEOUT)
+        else:
+            response_json = call_assistant()
 
         # Validate required fields
         if 'chat_response' not in response_json:
             return jsonify({'error': 'Invalid response from AI - missing chat_response'}), 500
 
         # Return the structured response
-        return jsonify(response_json), 200
-
+        response = jsonify(response_json)
+        response.headers['X-Cache'] = 'COALESCED' if shared else ('MISS' if cache_key else 'OFF')
+        return response, 200
+
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    except TimeoutError:
+        return llm_timeout_response()
+    except CircuitOpenError as e:
+        return llm_unavailable_response(e)
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
         return jsonify({'error': f'Invalid JSON from AI: {str(e)}'}), 500
     except Exception as e:
+        if is_retryable(e):
+            return llm_unavailable_response(e)
         print(f"Error processing request: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def llm_busy_response(error):
+    """503 for a request turned away by the LLM in-flight limit."""
+    print(f"LLM busy: {error}")
+    response = jsonify({'error': 'The assistant is busy right now. Please try again in a few seconds.'})
+    response.headers['Retry-After'] = str(max(1, int(llm_executor.queue_timeout)))
+    return response, 503
+
+
+def llm_unavailable_response(error):
+    """503 while the circuit breaker is open, 502 when OpenAI kept failing through the retries."""
+    print(f"LLM upstream unavailable: {error}")
+    response = jsonify({'error': LLM_UNAVAILABLE_MESSAGE})
+    if isinstance(error, CircuitOpenError):
+        response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+        return response, 503
+    return response, 502
+
+
+def llm_timeout_response():
+    print(f"LLM call exceeded {LLM_CALL_TIMEOUT:.0f} s")
+    return jsonify({'error': 'The assistant took too long to answer. Please try again.'}), 504
+
+
+def log_prompt_tokens(messages, history_stats):
+    """Log where the prompt's tokens go, for tuning HISTORY_TOKEN_BUDGET."""
+    total = count_message_tokens(messages)
+    estimate = '' if history_stats['exact'] else ' (estimated)'
+    print(f"Prompt tokens{estimate}: {total} total - system {SYSTEM_PROMPT_TOKENS}, "
+          f"history {history_stats['history_tokens']}/{history_stats['budget']} "
+          f"({history_stats['kept_messages']}/{history_stats['history_messages']} messages kept), "
+          f"summary {history_stats['summary_tokens']} "
+          f"({history_stats['summarized_messages']} messages summarized)")
+
+
+def log_llm_latency(endpoint, start, usage=None, first_token=None, model="gpt-4o"):
+    """Log and record OpenAI call latency and reported token usage."""
+    elapsed = time.perf_counter() - start
+    line = f"OpenAI call ({endpoint}): {elapsed * 1000:.0f} ms"
+    if first_token is not None:
+        line += f" (first token {(first_token - start) * 1000:.0f} ms)"
+    if usage:
+        counts = llm_usage.record(endpoint, model, usage, elapsed)
+        line += (f", usage: {counts['prompt_tokens']} prompt ({counts['cached_tokens']} cached) + "
+                 f"{counts['completion_tokens']} completion tokens, ~${counts['cost_usd']:.4f}")
+    print(line)
+
+
+def stream_assistant_response(messages, cache_key=None, cached=None):
+    """Stream an assistant completion to the client as Server-Sent Events."""
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+    if cached is not None:
+        headers['X-Cache'] = 'HIT'
+        return Response(stream_structured_events([json.dumps(cached)]),
+                        mimetype='text/event-stream', headers=headers)
+
+    print(f"Streaming OpenAI API response for message: {messages[-1]['content'][:50]}...")
+
+    def store(response_json):
+        if cache_key:
+            llm_cache.put(cache_key, response_json)
+
+    # Take an LLM slot before responding, so a busy server or an open circuit
+    # answers 503 instead of an error event
+    llm.breaker.check()
+    start = time.perf_counter()
+    stream = llm_executor.iterate(
+        llm.create,
+        timeout=LLM_CALL_TIMEOUT,
+        model="gpt-4o",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=2000,
+        response_format={"type": "json_object"},
+        stream=True,
+        stream_options={"include_usage": True},
+        **SYSTEM_PROMPT_CACHE_PARAMS
+    )
+
+    def generate():
+        try:
+            def text_chunks():
+                first_token = None
+                usage = None
+                for chunk in stream:
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token is None:
+                            first_token = time.perf_counter()
+                        yield chunk.choices[0].delta.content
+                log_llm_latency('assistant', start, usage, first_token=first_token)
+
+            yield from stream_structured_events(text_chunks(), on_complete=store)
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            message = LLM_UNAVAILABLE_MESSAGE if isinstance(e, CircuitOpenError) or is_retryable(e) else str(e)
+            yield format_sse('error', {'error': message})
+
+    headers['X-Cache'] = 'MISS' if cache_key else 'OFF'
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+
+
 @app.route('/api/composer/suggest', methods=['POST'])
 def composer_suggest():
     """
@@ -206,119 +488,70 @@ def composer_suggest():
         selected_region = data.get('selected_region')
         context = data.get('context', {})
 
-        # Format composition as text for GPT
-        tab_context = format_composition_for_gpt(composition, selected_region)
-
-        # Build GPT prompt with structured response requirement
-        composer_prompt = f"""You are a guitar composition assistant. The user is working on a guitar tablature composition.
-
-Current composition:
-{tab_context}
-
-User request: {user_message}
-
-You MUST respond with valid JSON in this format:
-
-{{
-  "chat_response": "Your explanation and teaching (required)",
-  "tab_additions": [
-    {{
-      "string": 1,
-      "fret": 0,
-      "duration": 0.25,
-      "measure_offset": 0
-    }}
-  ] or null
-}}
-
-- chat_response: Explain your suggestion conversationally
-- tab_additions: Array of notes to add to the composition (optional)
-  - string: 1-6 (1=high e, 6=low E)
-  - fret: 0-15
-  - duration: 0.0625, 0.125, 0.25, 0.5, 0.75, 1
-  - measure_offset: which measure to add to (0=current, 1=next, etc.)
-
-If the user asks for TAB/patterns/arpeggios/bass lines, include tab_additions.
-If just explaining theory, set tab_additions to null.
-
-Provide helpful, musical suggestions!"""
-
-        # Call OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": composer_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=1500,
-            response_format={"type": "json_object"}
-        )
-
-        result = json.loads(response.choices[0].message.content)
-
-        return jsonify({
+        # Format composition as compact tab for GPT, as many measures as fit the budget
+        tab_context = format_composition_for_gpt(composition, selected_region, COMPOSITION_TOKEN_BUDGET)
+
+        # Accompaniment over the annotated chords is generated, not asked for
+        generated = suggest_locally(user_message, composition, selected_region) if TAB_GENERATORS_ENABLED else None
+        if generated is not None:
+            print(f"Generated locally: {user_message[:50]}")
+            response = jsonify({**generated, 'tab_context_used': tab_context})
+            response.headers['X-Answer-Source'] = 'tab-generator'
+            return response, 200
+
+        # Static instructions first, then the composition and request
+        messages = build_composer_messages(tab_context, user_message)
+
+        # The request text embeds the composition, so the key covers the TAB context
+        cache_key = None
+        result = None
+        if llm_cache:
+            cache_key = make_cache_key("gpt-4o", COMPOSER_PROMPT_VERSION, [], messages[-1]['content'],
+                                       {"temperature": 0.7, "max_tokens": 1500})
+            if not bypass_requested(request.headers):
+                result = llm_cache.get(cache_key)
+        cache_status = 'HIT' if result is not None else ('MISS' if cache_key else 'OFF')
+
+        if result is None:
+            # Call OpenAI
+            start = time.perf_counter()
+            response = llm_executor.run(
+                llm.create,
+                timeout=LLM_CALL_TIMEOUT,
+                model="gpt-4o",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1500,
+                response_format={"type": "json_object"},
+                **COMPOSER_PROMPT_CACHE_PARAMS
+            )
+            log_llm_latency('composer', start, response.usage)
+
+            result = json.loads(response.choices[0].message.content)
+            if cache_key:
+                llm_cache.put(cache_key, result)
+
+        response = jsonify({
             'chat_response': result.get('chat_response', ''),
             'tab_additions': result.get('tab_additions'),
             'tab_context_used': tab_context
-        }), 200
-
+        })
+        response.headers['X-Cache'] = cache_status
+        return response, 200
+
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    except TimeoutError:
+        return llm_timeout_response()
+    except CircuitOpenError as e:
+        return llm_unavailable_response(e)
     except Exception as e:
+        if is_retryable(e):
+            return llm_unavailable_response(e)
         print(f"Error in composer suggest: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-def format_composition_for_gpt(composition, selected_region=None):
-    """Format composition data as readable text for GPT context."""
-    if not composition or 'measures' not in composition:
-        return "No composition data available."
-
-    output = []
-    measures = composition['measures']
-
-    # Determine which measures to include
-    if selected_region:
-        start = selected_region.get('start_measure', 0)
-        end = selected_region.get('end_measure', len(measures))
-        measures_to_format = measures[start:end+1]
-        output.append(f"Selected region: Measures {start+1} to {end+1}")
-    else:
-        measures_to_format = measures[-8:] if len(measures) > 8 else measures
-        if len(measures) > 8:
-            output.append(f"Showing last 8 measures (total: {len(measures)} measures)")
-
-    output.append(f"Time Signature: {composition.get('timeSignature', '4/4')}")
-    output.append(f"Tempo: {composition.get('tempo', 120)} BPM\n")
-
-    # Format each measure
-    for idx, measure in enumerate(measures_to_format):
-        measure_num = idx + 1 if not selected_region else selected_region.get('start_measure', 0) + idx + 1
-        output.append(f"Measure {measure_num}:")
-
-        # Show chord annotations
-        if measure.get('chords'):
-            chords_str = ", ".join([f"{c['name']} at beat {c['time']+1}" for c in measure['chords']])
-            output.append(f"  Chords: {chords_str}")
-
-        # Show events (notes)
-        events = measure.get('events', [])
-        if events:
-            # Group by time
-            events_by_time = {}
-            for event in events:
-                t = event['time']
-                if t not in events_by_time:
-                    events_by_time[t] = []
-                events_by_time[t].append(f"String {event['string']} Fret {event['fret']}")
-
-            for time in sorted(events_by_time.keys()):
-                output.append(f"  Beat {time+1}: {', '.join(events_by_time[time])}")
-
-        output.append("")
-
-    return "\n".join(output)
-
-
 @app.route('/api/share', methods=['POST'])
 def create_or_update_share():
     """
@@ -397,6 +630,7 @@ def get_share(share_id):
 
     Query params:
     - editToken: Optional, proves you're the author
+    - format: Optional, "compact" for the compact composition encoding
 
     Response:
     {
@@ -416,13 +650,12 @@ def get_share(share_id):
 
         is_author = verify_edit_token(share_data, edit_token)
 
-        return jsonify({
-            'composition': share_data['composition'],
+        return composition_response({
             'isAuthor': is_author,
             'createdAt': share_data['created_at'],
             'updatedAt': share_data['updated_at'],
             'expiresAt': share_data['expires_at']
-        }), 200
+        }, share_data['composition'])
 
     except Exception as e:
         print(f"Error loading share: {e}")
@@ -442,16 +675,20 @@ def allowed_omr_file(filename):
 @app.route('/api/omr/upload', methods=['POST'])
 def omr_upload():
     """
-    Upload a PDF or image file for OMR processing.
+    Upload a PDF or image file for OMR processing, or a MusicXML file
+    (.mxl/.musicxml/.xml) for direct conversion.
 
     Expects multipart/form-data with 'file' field.
 
-    Response:
+    Response (202, processing in background):
     {
         "job_id": "abc123def456",
         "status": "pending",
         "message": "File uploaded, processing started"
     }
+
+    MusicXML files up to SYNC_MUSICXML_MAX_BYTES are converted immediately
+    and answered with 200 and the same body as /api/omr/result.
     """
     try:
         # Check if file is present
@@ -480,6 +717,22 @@ def omr_upload():
         input_path = os.path.join(job_upload_dir, filename)
         file.save(input_path)
 
+        # Small MusicXML files need no OMR; convert them within this request
+        if is_musicxml_file(input_path) and os.path.getsize(input_path) <= SYNC_MUSICXML_MAX_BYTES:
+            job = start_omr_job(input_path, job_output_dir, background=False)
+
+            if job.status == "failed":
+                return jsonify({
+                    'job_id': job.job_id,
+                    'status': 'failed',
+                    'error': job.error
+                }), 400
+
+            return composition_response({
+                'job_id': job.job_id,
+                'status': 'completed'
+            }, job.result.load())
+
         # Start OMR processing in background
         job = start_omr_job(input_path, job_output_dir)
 
@@ -526,6 +779,9 @@ def omr_result(job_id):
     """
     Get the result of a completed OMR job.
 
+    Query params:
+    - format: Optional, "compact" for the compact composition encoding
+
     Response (on success):
     {
         "job_id": "abc123def456",
@@ -560,11 +816,10 @@ def omr_result(job_id):
             }), 400
 
         # Job completed successfully
-        return jsonify({
+        return composition_response({
             'job_id': job_id,
-            'status': 'completed',
-            'composition': job.result
-        }), 200
+            'status': 'completed'
+        }, job.result.load())
 
     except Exception as e:
         print(f"Error getting OMR result: {e}")
@@ -644,6 +899,87 @@ def omr_cleanup():
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================================
+# MIDI Import Endpoint
+# ============================================================
+
+@app.route('/api/midi/import', methods=['POST'])
+def midi_import():
+    """
+    Convert a Standard MIDI File (.mid/.midi) to a composition synchronously.
+
+    Expects multipart/form-data with 'file' field and optional fields:
+    - tracks: Comma-separated track indices to import (default: all)
+    - channels: Comma-separated 0-based MIDI channels (default: all but drums)
+
+    Response:
+    {
+        "status": "completed",
+        "tracks": [{"index": 1, "name": "Melody", "notes": 120, "channels": [0]}],
+        "composition": {...}
+    }
+    """
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+
+        file = request.files['file']
+
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        if not file.filename.lower().endswith(MIDI_EXTENSIONS):
+            return jsonify({
+                'error': f'Invalid file type. Allowed: {", ".join(MIDI_EXTENSIONS)}'
+            }), 400
+
+        try:
+            tracks = parse_index_list(request.form.get('tracks'))
+            channels = parse_index_list(request.form.get('channels'))
+        except ValueError:
+            return jsonify({'error': 'tracks and channels must be comma-separated numbers'}), 400
+
+        upload_dir = os.path.join(UPLOADS_DIR, f"midi_{uuid.uuid4().hex[:12]}")
+        os.makedirs(upload_dir, exist_ok=True)
+        try:
+            input_path = os.path.join(upload_dir, secure_filename(file.filename))
+            file.save(input_path)
+
+            try:
+                # One pass over the file: the composition and every track's summary
+                columns, track_info = convert_midi_with_tracks(input_path, tracks, channels)
+                composition = columns.to_dict()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+        return composition_response({
+            'status': 'completed',
+            'tracks': track_info
+        }, composition)
+
+    except Exception as e:
+        print(f"Error in MIDI import: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """LLM response cache counters (hits, misses, sizes)."""
+    if not llm_cache:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **llm_cache.stats()}), 200
+
+
+@app.route('/api/llm/usage', methods=['GET'])
+def llm_usage_stats():
+    """Token usage, cost and latency per endpoint, LLM pool load, coalescing, retries and circuit state."""
+    return jsonify({'endpoints': llm_usage.stats(), 'executor': llm_executor.stats(),
+                    'coalescing': {'enabled': LLM_COALESCE_ENABLED, **assistant_flights.stats()},
+                    'upstream': llm.stats()}), 200
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Synthetic MusicXML Generator
+
+Generates deterministic MusicXML scores for converter tests and benchmarks.
+Knobs: number of measures, voices (polyphony written with <backup>), chord
+size, divisions per quarter note, time signature and random seed.
+
+Usage:
+    python synthetic_musicxml.py out.musicxml --measures 200 --voices 2 --chord-size 3
+    python synthetic_musicxml.py corpus/ --corpus
+"""
+
+import os
+import random
+import xml.etree.ElementTree as ET
+from typing import Dict, List
+
+# Pitches within standard guitar range (step, alter, octave) - octaves follow
+# the converter's Audiveris convention (see pitch_to_midi)
+STEPS = ['C', 'D', 'E', 'F', 'G', 'A', 'B']
+
+# Default corpus written by --corpus: name -> generate_musicxml kwargs
+CORPUS_SIZES: Dict[str, Dict] = {
+    "small_melody": {"measures": 32, "voices": 1, "chord_size": 1, "divisions": 2},
+    "medium_two_voice": {"measures": 200, "voices": 2, "chord_size": 1, "divisions": 4},
+    "medium_chords": {"measures": 200, "voices": 1, "chord_size": 4, "divisions": 4},
+    "large_fingerstyle": {"measures": 1000, "voices": 2, "chord_size": 3, "divisions": 12},
+    "book_triplets": {"measures": 4000, "voices": 2, "chord_size": 2, "divisions": 24,
+                      "time_signature": "6/8"},
+}
+
+
+def _rhythm(measure_ticks: int, divisions: int, rng: random.Random) -> List[int]:
+    """Split a measure into note durations (in divisions) that sum exactly to it."""
+    choices = [divisions * 2, divisions, divisions // 2, divisions // 4]
+    if divisions % 3 == 0:
+        choices.append(divisions // 3)  # Triplet eighths
+    choices = [c for c in choices if c > 0]
+
+    durations = []
+    remaining = measure_ticks
+    while remaining > 0:
+        fitting = [c for c in choices if c <= remaining]
+        duration = rng.choice(fitting) if fitting else remaining
+        durations.append(duration)
+        remaining -= duration
+    return durations
+
+
+def _add_note(measure: ET.Element, step: str, octave: int, alter: int,
+              duration: int, voice: int, is_chord: bool) -> None:
+    note = ET.SubElement(measure, 'note')
+    if is_chord:
+        ET.SubElement(note, 'chord')
+    pitch = ET.SubElement(note, 'pitch')
+    ET.SubElement(pitch, 'step').text = step
+    if alter:
+        ET.SubElement(pitch, 'alter').text = str(alter)
+    ET.SubElement(pitch, 'octave').text = str(octave)
+    ET.SubElement(note, 'duration').text = str(duration)
+    ET.SubElement(note, 'voice').text = str(voice)
+
+
+def generate_musicxml(measures: int = 16, voices: int = 1, chord_size: int = 1,
+                      divisions: int = 4, time_signature: str = "4/4",
+                      rest_probability: float = 0.05, seed: int = 0,
+                      title: str = "Synthetic Score") -> str:
+    """
+    Generate a MusicXML document.
+
+    Args:
+        measures: Number of measures
+        voices: Voices per measure; voices after the first are written after a <backup>
+        chord_size: Notes per chord in the first voice (1 = single notes)
+        divisions: Divisions per quarter note
+        time_signature: Time signature string, e.g. "4/4" or "6/8"
+        rest_probability: Chance that a first-voice note is a rest
+        seed: Random seed (output is deterministic per seed)
+        title: Work title
+
+    Returns:
+        MusicXML document as a string
+    """
+    rng = random.Random(seed)
+    beats, beat_type = (int(x) for x in time_signature.split('/'))
+    measure_ticks = beats * divisions * 4 // beat_type
+
+    root = ET.Element('score-partwise', version="3.1")
+    work = ET.SubElement(root, 'work')
+    ET.SubElement(work, 'work-title').text = title
+    part_list = ET.SubElement(root, 'part-list')
+    score_part = ET.SubElement(part_list, 'score-part', id="P1")
+    ET.SubElement(score_part, 'part-name').text = "Guitar"
+    part = ET.SubElement(root, 'part', id="P1")
+
+    for number in range(1, measures + 1):
+        measure = ET.SubElement(part, 'measure', number=str(number))
+
+        if number == 1:
+            attributes = ET.SubElement(measure, 'attributes')
+            ET.SubElement(attributes, 'divisions').text = str(divisions)
+            time_elem = ET.SubElement(attributes, 'time')
+            ET.SubElement(time_elem, 'beats').text = str(beats)
+            ET.SubElement(time_elem, 'beat-type').text = str(beat_type)
+            direction = ET.SubElement(measure, 'direction')
+            ET.SubElement(direction, 'sound', tempo="96")
+
+        if number % 4 == 1:
+            harmony = ET.SubElement(measure, 'harmony')
+            root_elem = ET.SubElement(harmony, 'root')
+            ET.SubElement(root_elem, 'root-step').text = rng.choice(STEPS)
+            ET.SubElement(harmony, 'kind').text = rng.choice(['major', 'minor', 'dominant'])
+
+        for voice in range(1, voices + 1):
+            if voice > 1:
+                backup = ET.SubElement(measure, 'backup')
+                ET.SubElement(backup, 'duration').text = str(measure_ticks)
+
+            for duration in _rhythm(measure_ticks, divisions, rng):
+                if voice == 1 and rng.random() < rest_probability:
+                    note = ET.SubElement(measure, 'note')
+                    ET.SubElement(note, 'rest')
+                    ET.SubElement(note, 'duration').text = str(duration)
+                    continue
+
+                # Lower voices sit in the bass register, the top voice in the treble
+                octave = 3 if voice > 1 else 4
+                notes = chord_size if voice == 1 else 1
+                for i in range(notes):
+                    step_index = rng.randrange(len(STEPS))
+                    _add_note(measure, STEPS[step_index], octave + (1 if i >= 2 else 0),
+                              1 if rng.random() < 0.1 else 0, duration, voice, is_chord=i > 0)
+
+    ET.indent(root)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='unicode')
+
+
+def write_synthetic_score(path: str, **kwargs) -> str:
+    """Generate a score and write it to path. Returns the path."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_musicxml(**kwargs))
+    return path
+
+
+def write_corpus(output_dir: str) -> List[str]:
+    """Write the CORPUS_SIZES scores into output_dir. Returns the written paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        write_synthetic_score(os.path.join(output_dir, f"{name}.musicxml"), title=name, **params)
+        for name, params in CORPUS_SIZES.items()
+    ]
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic MusicXML scores")
+    parser.add_argument("output", help="Output .musicxml file (or directory with --corpus)")
+    parser.add_argument("--corpus", action="store_true",
+                        help="Write the standard benchmark corpus into the output directory")
+    parser.add_argument("--measures", type=int, default=16)
+    parser.add_argument("--voices", type=int, default=1)
+    parser.add_argument("--chord-size", type=int, default=1)
+    parser.add_argument("--divisions", type=int, default=4)
+    parser.add_argument("--time-signature", default="4/4")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.corpus:
+        for path in write_corpus(args.output):
+            print(f"Wrote {path}")
+    else:
+        write_synthetic_score(args.output, measures=args.measures, voices=args.voices,
+                              chord_size=args.chord_size, divisions=args.divisions,
+                              time_signature=args.time_signature, seed=args.seed)
+        print(f"Wrote {args.output}")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Array-backed TabComposition
+
+Columnar in-memory representation of a TabComposition. Instead of one dict per
+note, events are stored in parallel `array` columns (time, string, fret,
+duration, measure index) with times and durations in integer ticks. Conversion
+to the TabComposition JSON shape (list of measures with event dicts) is lazy:
+measures are materialized one at a time by `iter_measure_dicts()` and
+`write_json()`, or all at once by `to_dict()`.
+
+StreamingCompositionWriter appends pages to a JSON file as they finish, for
+multi-page OMR jobs, and returns a CompositionHandle instead of the data.
+"""
+
+import json
+import math
+import os
+from array import array
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+class TabComposition:
+    """Columnar TabComposition with integer tick times."""
+
+    def __init__(self, title: str = "Untitled", tempo: int = 120,
+                 time_signature: str = "4/4", ticks_per_whole: int = 4):
+        self.title = title
+        self.tempo = tempo
+        self.time_signature = time_signature
+        self.ticks_per_whole = ticks_per_whole
+        self.version = "1.0"
+
+        # Event columns (one entry per note, ordered by measure)
+        self.times = array('i')          # Ticks from the start of the measure
+        self.strings = array('b')
+        self.frets = array('b')
+        self.durations = array('i')      # Ticks
+        self.measure_index = array('i')
+
+        # Per-measure columns
+        self.measure_starts = array('i')  # Index of the measure's first event
+        self.measure_time_signatures: List[str] = []
+        self.measure_chords: List[List[Tuple[int, str]]] = []
+        self.measure_warnings: Dict[int, List[Dict]] = {}
+
+        # Extra top-level keys (e.g. "_processing") copied into the JSON output
+        self.metadata: Dict = {}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add_measure(self, time_signature: str,
+                    chords: Optional[List[Tuple[int, str]]] = None) -> int:
+        """Start a new measure and return its index. Following events go into it."""
+        self.measure_starts.append(len(self.times))
+        self.measure_time_signatures.append(time_signature)
+        self.measure_chords.append(list(chords) if chords else [])
+        return len(self.measure_time_signatures) - 1
+
+    def add_event(self, time: int, string: int, fret: int, duration: int) -> None:
+        """Append an event (times in ticks) to the last measure."""
+        if not self.measure_time_signatures:
+            raise ValueError("add_measure() must be called before add_event()")
+        self.times.append(time)
+        self.strings.append(string)
+        self.frets.append(fret)
+        self.durations.append(duration)
+        self.measure_index.append(len(self.measure_time_signatures) - 1)
+
+    def add_warning(self, measure: int, warning: Dict) -> None:
+        """Attach a validation warning to a measure."""
+        self.measure_warnings.setdefault(measure, []).append(warning)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Number of events."""
+        return len(self.times)
+
+    @property
+    def num_measures(self) -> int:
+        return len(self.measure_time_signatures)
+
+    def measure_range(self, measure: int) -> Tuple[int, int]:
+        """Return the [start, end) event index range of a measure."""
+        start = self.measure_starts[measure]
+        if measure + 1 < self.num_measures:
+            end = self.measure_starts[measure + 1]
+        else:
+            end = len(self.times)
+        return start, end
+
+    def measure_events(self, measure: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Yield (time, string, fret, duration) tick tuples for a measure."""
+        start, end = self.measure_range(measure)
+        for i in range(start, end):
+            yield self.times[i], self.strings[i], self.frets[i], self.durations[i]
+
+    def measure_extent(self, measure: int) -> int:
+        """Maximum time + duration covered by a measure's events, in ticks."""
+        start, end = self.measure_range(measure)
+        times, durations = self.times, self.durations
+        return max((times[i] + durations[i] for i in range(start, end)), default=0)
+
+    def validation_issues(self) -> List[Dict]:
+        """Flatten measure warnings into the `_validation.issues` list shape."""
+        issues = []
+        for measure in sorted(self.measure_warnings):
+            for warning in self.measure_warnings[measure]:
+                issues.append({"measure_number": measure + 1, **warning})
+        return issues
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the event columns, in bytes."""
+        columns = (self.times, self.strings, self.frets, self.durations,
+                   self.measure_index, self.measure_starts)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    # ------------------------------------------------------------------
+    # Conversion to the TabComposition JSON shape
+    # ------------------------------------------------------------------
+
+    def _to_whole(self, ticks: int) -> float:
+        return ticks / self.ticks_per_whole
+
+    def measure_dict(self, measure: int) -> Dict:
+        """Materialize one measure as a TabComposition measure dict."""
+        to_whole = self._to_whole
+        result = {
+            "timeSignature": self.measure_time_signatures[measure],
+            "events": [
+                {
+                    "time": to_whole(time),
+                    "string": string,
+                    "fret": fret,
+                    "duration": to_whole(duration),
+                    "leftFinger": None
+                }
+                for time, string, fret, duration in self.measure_events(measure)
+            ],
+            "chords": [
+                {"time": to_whole(time), "name": name}
+                for time, name in self.measure_chords[measure]
+            ]
+        }
+        if measure in self.measure_warnings:
+            result["_warnings"] = list(self.measure_warnings[measure])
+        return result
+
+    def iter_measure_dicts(self) -> Iterator[Dict]:
+        """Lazily yield measure dicts in order."""
+        for measure in range(self.num_measures):
+            yield self.measure_dict(measure)
+
+    def header_dict(self) -> Dict:
+        """Top-level TabComposition keys other than "measures"."""
+        header = {
+            "title": self.title,
+            "tempo": self.tempo,
+            "timeSignature": self.time_signature,
+            "version": self.version
+        }
+        issues = self.validation_issues()
+        if issues:
+            header["_validation"] = {
+                "has_issues": True,
+                "issue_count": len(issues),
+                "issues": issues
+            }
+        header.update(self.metadata)
+        return header
+
+    def to_dict(self) -> Dict:
+        """Materialize the full TabComposition dict."""
+        header = self.header_dict()
+        composition = {
+            "title": header.pop("title"),
+            "tempo": header.pop("tempo"),
+            "timeSignature": header.pop("timeSignature"),
+            "measures": list(self.iter_measure_dicts()),
+            "version": header.pop("version")
+        }
+        composition.update(header)
+        return composition
+
+    def write_json(self, fp: IO[str]) -> None:
+        """
+        Write the TabComposition JSON to a text file, one measure at a time.
+
+        Produces the same document as json.dump(self.to_dict(), fp) without
+        materializing every measure dict at once.
+        """
+        header = self.header_dict()
+        fp.write('{')
+        for key in ("title", "tempo", "timeSignature"):
+            fp.write(f'{json.dumps(key)}: {json.dumps(header.pop(key))}, ')
+        fp.write('"measures": [')
+        for i, measure in enumerate(self.iter_measure_dicts()):
+            if i:
+                fp.write(', ')
+            fp.write(json.dumps(measure))
+        fp.write(']')
+        for key, value in header.items():
+            fp.write(f', {json.dumps(key)}: {json.dumps(value)}')
+        fp.write('}')
+
+    # ------------------------------------------------------------------
+    # Merging
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def concatenate(cls, compositions: List["TabComposition"]) -> "TabComposition":
+        """
+        Concatenate compositions (e.g. OMR pages) into a new composition.
+
+        Title, tempo and time signature come from the first composition. Measure
+        warnings are carried over with renumbered measure indices.
+
+        The OMR pipeline streams pages with StreamingCompositionWriter instead;
+        this in-memory merge backs merge_compositions() for the converter
+        benchmark and scripts.
+        """
+        if not compositions:
+            raise ValueError("No compositions to merge")
+
+        first = compositions[0]
+        ticks_per_whole = 1
+        for comp in compositions:
+            ticks_per_whole = math.lcm(ticks_per_whole, comp.ticks_per_whole)
+
+        merged = cls(first.title, first.tempo, first.time_signature, ticks_per_whole)
+
+        for comp in compositions:
+            factor = ticks_per_whole // comp.ticks_per_whole
+            measure_offset = merged.num_measures
+            event_offset = len(merged.times)
+
+            if factor == 1:
+                merged.times.extend(comp.times)
+                merged.durations.extend(comp.durations)
+            else:
+                merged.times.extend(t * factor for t in comp.times)
+                merged.durations.extend(d * factor for d in comp.durations)
+            merged.strings.extend(comp.strings)
+            merged.frets.extend(comp.frets)
+            merged.measure_index.extend(m + measure_offset for m in comp.measure_index)
+            merged.measure_starts.extend(s + event_offset for s in comp.measure_starts)
+            merged.measure_time_signatures.extend(comp.measure_time_signatures)
+            merged.measure_chords.extend([(t * factor, name) for t, name in chords]
+                                         for chords in comp.measure_chords)
+            for measure, warnings in comp.measure_warnings.items():
+                merged.measure_warnings[measure + measure_offset] = list(warnings)
+
+        return merged
+
+
+class CompositionHandle:
+    """Reference to a TabComposition JSON file on disk, with summary counts."""
+
+    def __init__(self, path: str, title: str, measures: int, notes: int):
+        self.path = path
+        self.title = title
+        self.measures = measures
+        self.notes = notes
+
+    def load(self) -> Dict:
+        """Read the full TabComposition dict from disk."""
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+
+class StreamingCompositionWriter:
+    """
+    Incrementally write a multi-page TabComposition to a JSON file.
+
+    Pages are appended as they finish; only their measures' JSON passes through
+    memory, one measure at a time. Measure validation warnings are collected
+    with measure numbers renumbered to their position in the merged composition.
+    The file is written to a temp path and renamed into place on close(), so
+    readers never see a partial document.
+
+    Usage:
+        writer = StreamingCompositionWriter(path)
+        for page in pages:
+            writer.add_page(page)
+        handle = writer.close()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._temp_path = f"{path}.partial"
+        self._file = open(self._temp_path, 'w')
+        self._file.write('{"measures": [')
+
+        self.title: Optional[str] = None
+        self.tempo: Optional[int] = None
+        self.time_signature: Optional[str] = None
+        self.metadata: Dict = {}
+
+        self.measures = 0
+        self.notes = 0
+        self.issues: List[Dict] = []
+
+    def add_page(self, page: TabComposition) -> None:
+        """Append a page's measures. The first page sets title, tempo and time signature."""
+        if self.title is None:
+            self.title = page.title
+            self.tempo = page.tempo
+            self.time_signature = page.time_signature
+
+        for issue in page.validation_issues():
+            self.issues.append({**issue, "measure_number": issue["measure_number"] + self.measures})
+
+        for measure in page.iter_measure_dicts():
+            if self.measures:
+                self._file.write(', ')
+            self._file.write(json.dumps(measure))
+            self.measures += 1
+
+        self.notes += len(page)
+
+    def close(self) -> CompositionHandle:
+        """Finish the document, move it into place and return a handle to it."""
+        trailer = {
+            "title": self.title if self.title is not None else "Untitled",
+            "tempo": self.tempo if self.tempo is not None else 120,
+            "timeSignature": self.time_signature or "4/4",
+            "version": "1.0"
+        }
+        if self.issues:
+            trailer["_validation"] = {
+                "has_issues": True,
+                "issue_count": len(self.issues),
+                "issues": self.issues
+            }
+        trailer.update(self.metadata)
+
+        self._file.write(']')
+        for key, value in trailer.items():
+            self._file.write(f', {json.dumps(key)}: {json.dumps(value)}')
+        self._file.write('}')
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+        return CompositionHandle(self.path, trailer["title"], self.measures, self.notes)
+
+    def abort(self) -> None:
+        """Discard the partial document."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
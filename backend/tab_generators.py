@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Local generators for composer tab_additions.
+
+Builds accompaniment from the chord annotations already in a composition
+(each measure's "chords": [{"name": "Am", "time": 0}, ...]) so common composer
+requests are answered without the LLM:
+
+- arpeggio: the notes of a chord grip, up, down or up and back down
+- root_fifth_bass: root on the beat, the fifth in between
+- travis: alternating thumb bass on the beats, treble notes on the off-beats
+- walking_bass: quarter notes through the chord tones with a chromatic
+  approach into the next chord
+
+Notes use only the durations the composer accepts, strings 1-6 and frets
+0-15. Besides string/fret/duration/measure_offset each note carries "time",
+its offset in whole notes from the start of the first generated measure; the
+composer orders notes by it and groups notes with the same time into chords.
+"""
+
+import re
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+
+from theory_engine import (
+    CHORD_PATTERN, GRIPS_BY_CHORD, NOTE_PATTERN, QUALITY_SYMBOLS, closest_grip, parse_note
+)
+from voicings import GUITAR_TUNING, QUALITY_INTERVALS
+
+# Note durations the composer accepts (fraction of a whole note), longest first
+DURATIONS = (Fraction(1), Fraction(3, 4), Fraction(1, 2), Fraction(1, 4), Fraction(1, 8), Fraction(1, 16))
+
+EIGHTH = Fraction(1, 8)
+QUARTER = Fraction(1, 4)
+
+# Measures covered when no region is selected: up to this many, ending at the
+# last measure with a chord annotation
+MAX_GENERATED_MEASURES = 8
+
+# Bass register: strings and highest fret used for bass notes
+BASS_STRINGS = (6, 5, 4)
+BASS_MAX_FRET = 7
+
+# Travis picking: treble string on each off-beat eighth, cycling per beat
+TRAVIS_TREBLE = (2, 3, 2, 3)
+
+CHORD_NAME_RE = re.compile(CHORD_PATTERN + r"(?:/(?P<bass>" + NOTE_PATTERN + r"))?")
+
+# Requests for explanation, a style or melodic material go to the LLM
+DEFER_RE = re.compile(
+    r"\b(why|explain|how|what|which|style|like|feel|groove|solo|melody|melodic|improv\w*|"
+    r"variation|fill|riff|lick|syncopat\w*|funk\w*|reggae|latin|slap)\b", re.I)
+
+# Negated requests and edits of existing parts go to the LLM
+EDIT_RE = re.compile(
+    r"\b(don['’]?t|do not|not|no|without|instead|remove|delete|replace|change|edit|fix|improve|"
+    r"more|less|simpler|interesting)\b", re.I)
+
+# Modifiers no generator honours: register or a specific measure
+MODIFIER_RE = re.compile(r"\b(octaves?|higher|lower|register|(?:measures?|bars?)\s*\d+)\b", re.I)
+
+# Note values and rhythm; only the arpeggio takes a step (ARPEGGIO_STEPS), the
+# other generators have a fixed rhythm
+RHYTHM_RE = re.compile(
+    r"\b(eighths?|8ths?|sixteenths?|16ths?|quarters?|half|halves|whole|triplets?|dotted|"
+    r"swing\w*|rhythm\w*|straight|shuffle)\b", re.I)
+ARPEGGIO_STEPS = [(re.compile(r"^(sixteenths?|16ths?)$", re.I), Fraction(1, 16)),
+                  (re.compile(r"^quarters?$", re.I), QUARTER)]
+
+# Generator per request, checked in order
+GENERATOR_PATTERNS = [
+    ("walking_bass", re.compile(r"\bwalk(?:ing)?\b.*\bbass\b|\bbass\b.*\bwalk(?:ing)?\b", re.I)),
+    ("travis", re.compile(r"\btravis\b|\balternating[- ]bass\b|\bthumb[- ]picking\b", re.I)),
+    ("root_fifth_bass", re.compile(
+        r"\broot[- ](?:and[- ])?fifths?\b|"
+        r"\b(?:add|generate|give|write|create|make|put)\b(?:\s+\w+){0,2}?\s+bass\b", re.I)),
+    ("arpeggio", re.compile(r"\barpeggi\w*", re.I)),
+]
+
+GENERATOR_DESCRIPTIONS = {
+    "arpeggio": "an arpeggio",
+    "root_fifth_bass": "a root-fifth bass line",
+    "travis": "a Travis picking pattern",
+    "walking_bass": "a walking bass line",
+}
+
+
+# ----------------------------------------------------------------------
+# Chords and time
+# ----------------------------------------------------------------------
+
+def parse_chord_name(name: str) -> Optional[Tuple[int, str, int]]:
+    """
+    Parse a chord annotation like "Am", "G7", "F#m7" or "C/G".
+
+    Returns:
+        (root pc, quality, bass pc) or None if unknown or without grips
+    """
+    match = CHORD_NAME_RE.fullmatch(name.strip())
+    if not match:
+        return None
+    if match.group("word"):
+        quality = QUALITY_SYMBOLS[" ".join(match.group("word").lower().split())]
+    else:
+        quality = QUALITY_SYMBOLS[match.group("sym") or ""]
+    root = parse_note(match.group("root"))
+    if not GRIPS_BY_CHORD.get((root, quality)):
+        return None
+    bass = parse_note(match.group("bass")) if match.group("bass") else root
+    return root, quality, bass
+
+
+def measure_length(time_signature: str) -> Fraction:
+    """Measure length in whole notes ("3/4" -> 3/4)."""
+    try:
+        beats, beat_unit = (int(part) for part in time_signature.split('/'))
+        return Fraction(beats, beat_unit)
+    except (ValueError, ZeroDivisionError):
+        return Fraction(1)
+
+
+def chord_segments(composition: Dict, selected_region: Optional[Dict] = None,
+                   max_measures: int = MAX_GENERATED_MEASURES) -> Optional[List[Dict]]:
+    """
+    Split measures into spans with one chord each.
+
+    A chord lasts until the next annotation; measures without annotations keep
+    the chord in effect. With a region ({"start_measure", "end_measure"}) those
+    measures are used, otherwise up to max_measures ending at the last
+    annotated measure.
+
+    Returns:
+        Segments {"name", "root", "quality", "bass", "measure_offset",
+        "measure_start", "start", "end"} (times in whole notes; start/end are
+        within the measure, measure_start is the measure's offset from the
+        first generated measure), or None if there are no usable chords
+    """
+    measures = composition.get('measures') or []
+    time_signature = composition.get('timeSignature', '4/4')
+
+    if selected_region and 'start_measure' in selected_region:
+        first = max(0, selected_region['start_measure'])
+        last = min(selected_region.get('end_measure', len(measures) - 1), len(measures) - 1)
+    else:
+        annotated = [i for i, measure in enumerate(measures) if measure.get('chords')]
+        if not annotated:
+            return None
+        last = annotated[-1]
+        first = max(annotated[0], last - max_measures + 1)
+
+    def changes(measure):
+        return sorted((Fraction(c.get('time', 0)).limit_denominator(64), c.get('name', ''))
+                      for c in measure.get('chords') or [])
+
+    # Chord carried into the first measure
+    current = None
+    for measure in reversed(measures[:first]):
+        if measure.get('chords'):
+            current = changes(measure)[-1][1]
+            break
+
+    if current is None:
+        # Start at the first annotated measure of the region
+        first = next((i for i in range(first, last + 1) if measures[i].get('chords')), None)
+        if first is None:
+            return None
+
+    segments = []
+    measure_start = Fraction(0)
+    for offset, index in enumerate(range(first, last + 1)):
+        measure = measures[index]
+        length = measure_length(measure.get('timeSignature') or time_signature)
+        points = [(time, name) for time, name in changes(measure) if time < length]
+        if current is not None and (not points or points[0][0] > 0):
+            points.insert(0, (Fraction(0), current))
+        elif points:
+            points[0] = (Fraction(0), points[0][1])
+
+        for i, (start, name) in enumerate(points):
+            end = points[i + 1][0] if i + 1 < len(points) else length
+            if end <= start:
+                continue
+            chord = parse_chord_name(name)
+            if chord is None:
+                return None
+            root, quality, bass = chord
+            segments.append({
+                "name": name.strip(), "root": root, "quality": quality, "bass": bass,
+                "measure_offset": offset, "measure_start": measure_start, "start": start, "end": end
+            })
+            current = name
+        measure_start += length
+
+    return segments or None
+
+
+def split_duration(length: Fraction) -> List[Fraction]:
+    """Split a length into accepted note durations, longest first."""
+    parts = []
+    for duration in DURATIONS:
+        while length >= duration:
+            parts.append(duration)
+            length -= duration
+    return parts
+
+
+def steps(start: Fraction, end: Fraction, step: Fraction) -> List[Tuple[Fraction, Fraction, int]]:
+    """
+    Notes of `step` whole notes filling [start, end); a step that does not fit
+    a single accepted duration is split.
+
+    Returns:
+        (onset, duration, step index) per note
+    """
+    result = []
+    onset, index = start, 0
+    while onset < end:
+        parts = split_duration(min(step, end - onset))
+        if not parts:
+            break
+        for duration in parts:
+            result.append((onset, duration, index))
+            onset += duration
+        index += 1
+    return result
+
+
+# ----------------------------------------------------------------------
+# Positions
+# ----------------------------------------------------------------------
+
+# Bass notes by MIDI number: [(string, fret), ...]
+BASS_POSITIONS: Dict[int, List[Tuple[int, int]]] = {}
+for _string in BASS_STRINGS:
+    for _fret in range(BASS_MAX_FRET + 1):
+        BASS_POSITIONS.setdefault(GUITAR_TUNING[_string] + _fret, []).append((_string, _fret))
+
+
+def bass_note(pc: int, near: Optional[Tuple[int, int, int]] = None) -> Tuple[int, int, int]:
+    """
+    A bass note of this pitch class as (midi, string, fret): the lowest one,
+    or the one nearest `near` (a previous (midi, string, fret)).
+    """
+    candidates = [(midi, string, fret) for midi, positions in BASS_POSITIONS.items() if midi % 12 == pc % 12
+                  for string, fret in positions]
+    if near is None:
+        return min(candidates, key=lambda c: (c[0], c[2]))
+    return min(candidates, key=lambda c: (abs(c[0] - near[0]), abs(c[2] - near[2]), c[2]))
+
+
+def bass_position(midi: int, near_fret: int) -> Tuple[int, int]:
+    return min(BASS_POSITIONS[midi], key=lambda position: (abs(position[1] - near_fret), position[1]))
+
+
+# ----------------------------------------------------------------------
+# Generators: segments -> [(time, duration, string, fret, measure_offset)]
+# ----------------------------------------------------------------------
+
+def generate_arpeggio(segments: List[Dict], direction: str = "updown", step: Fraction = EIGHTH):
+    notes = []
+    grip = None
+    for segment in segments:
+        grip = closest_grip(GRIPS_BY_CHORD[(segment["root"], segment["quality"])], grip)
+        frets = dict(grip)
+        low_to_high = sorted(frets, reverse=True)
+        if direction == "up":
+            cycle = low_to_high
+        elif direction == "down":
+            cycle = low_to_high[::-1]
+        else:
+            cycle = low_to_high + low_to_high[-2:0:-1]
+        for onset, duration, index in steps(segment["start"], segment["end"], step):
+            string = cycle[index % len(cycle)]
+            notes.append((segment["measure_start"] + onset, duration, string, frets[string],
+                          segment["measure_offset"]))
+    return notes
+
+
+def generate_root_fifth_bass(segments: List[Dict]):
+    notes = []
+    for segment in segments:
+        root = bass_note(segment["bass"])
+        fifth = bass_note(segment["root"] + 7, near=root)
+        for onset, duration, index in steps(segment["start"], segment["end"], QUARTER):
+            _, string, fret = root if index % 2 == 0 else fifth
+            notes.append((segment["measure_start"] + onset, duration, string, fret, segment["measure_offset"]))
+    return notes
+
+
+def generate_travis(segments: List[Dict]):
+    notes = []
+    grip = None
+    for segment in segments:
+        grip = closest_grip(GRIPS_BY_CHORD[(segment["root"], segment["quality"])], grip)
+        frets = dict(grip)
+        treble = sorted(string for string in frets if string <= 3)
+        if not treble:
+            return None
+        root_string = max(frets)
+        alternate = root_string - 2 if root_string == 6 else root_string - 1
+        bass_strings = [root_string] + [s for s in range(alternate, 3, -1) if s in frets][:1]
+
+        for onset, duration, index in steps(segment["start"], segment["end"], EIGHTH):
+            time = segment["measure_start"] + onset
+            eighth = int(onset / EIGHTH)
+            if eighth % 2 == 0:
+                # Thumb on the beat, alternating root and the next bass string
+                string = bass_strings[(index // 2) % len(bass_strings)]
+                notes.append((time, duration, string, frets[string], segment["measure_offset"]))
+                if onset == 0 or index == 0:
+                    notes.append((time, duration, treble[0], frets[treble[0]], segment["measure_offset"]))
+            else:
+                wanted = TRAVIS_TREBLE[(eighth // 2) % len(TRAVIS_TREBLE)]
+                string = min(treble, key=lambda s: (abs(s - wanted), s))
+                notes.append((time, duration, string, frets[string], segment["measure_offset"]))
+    return notes
+
+
+def generate_walking_bass(segments: List[Dict]):
+    notes = []
+    previous = None
+    for i, segment in enumerate(segments):
+        next_segment = segments[(i + 1) % len(segments)]
+        intervals = QUALITY_INTERVALS[segment["quality"]]
+        tones = list(intervals[1:]) + [12]
+        pieces = steps(segment["start"], segment["end"], QUARTER)
+        count = pieces[-1][2] + 1 if pieces else 0
+
+        current = None
+        for onset, duration, index in pieces:
+            if index == 0:
+                pitch = bass_note(segment["bass"], near=previous)[0]
+            elif index == count - 1:
+                # Chromatic approach into the next chord's root
+                target = bass_note(next_segment["bass"], near=current)[0]
+                below = target - 1 in BASS_POSITIONS and (current is None or target - 1 != current[0])
+                pitch = target - 1 if below else target + 1
+            else:
+                pitch = bass_note(segment["root"] + tones[(index - 1) % len(tones)], near=current)[0]
+            if current is None or pitch != current[0]:
+                string, fret = bass_position(pitch, current[2] if current else 0)
+                current = (pitch, string, fret)
+            notes.append((segment["measure_start"] + onset, duration, current[1], current[2],
+                          segment["measure_offset"]))
+        previous = current
+    return notes
+
+
+GENERATORS = {
+    "arpeggio": generate_arpeggio,
+    "root_fifth_bass": generate_root_fifth_bass,
+    "travis": generate_travis,
+    "walking_bass": generate_walking_bass,
+}
+
+
+def to_tab_additions(notes) -> List[Dict]:
+    """Generator notes -> composer tab_additions, ordered by time (low strings first)."""
+    return [
+        {"string": string, "fret": fret, "duration": float(duration),
+         "measure_offset": measure_offset, "time": float(time)}
+        for time, duration, string, fret, measure_offset in sorted(notes, key=lambda n: (n[0], -n[2]))
+    ]
+
+
+def is_valid_addition(note: Dict) -> bool:
+    """Whether a tab_additions note fits the composer's grid."""
+    return (note.get("string") in range(1, 7) and note.get("fret") in range(0, 16)
+            and Fraction(note.get("duration", 0)) in DURATIONS)
+
+
+# ----------------------------------------------------------------------
+# Routing
+# ----------------------------------------------------------------------
+
+def route_request(message: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Recognize a request one of the generators can answer.
+
+    Returns:
+        (generator name, options) or None
+    """
+    text = " ".join(message.split())
+    if not text or len(text) > 160 or DEFER_RE.search(text) or EDIT_RE.search(text) or \
+            MODIFIER_RE.search(text):
+        return None
+    rhythm = RHYTHM_RE.findall(text)
+
+    for name, pattern in GENERATOR_PATTERNS:
+        if pattern.search(text):
+            options = {}
+            if name != "arpeggio":
+                return (name, options) if not rhythm else None
+            if re.search(r"\b(descending|down(?:ward)?)\b", text, re.I):
+                options["direction"] = "down"
+            elif re.search(r"\b(ascending|up(?:ward)?)\b", text, re.I):
+                options["direction"] = "up"
+            for word in rhythm:
+                step = next((step for word_re, step in ARPEGGIO_STEPS if word_re.match(word)), None)
+                if step is None or options.get("step", step) != step:
+                    return None
+                options["step"] = step
+            return name, options
+    return None
+
+
+def progression_text(segments: List[Dict]) -> str:
+    names = []
+    for segment in segments:
+        if not names or names[-1] != segment["name"]:
+            names.append(segment["name"])
+    return " - ".join(names)
+
+
+def suggest_locally(message: str, composition: Dict, selected_region: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Answer a composer request with a generator.
+
+    Args:
+        message: User message
+        composition: Composition with chord annotations
+        selected_region: Optional {"start_measure", "end_measure"}
+
+    Returns:
+        {"chat_response", "tab_additions"}, or None if the request or chords
+        are not supported (the caller should ask the LLM)
+    """
+    route = route_request(message)
+    if not route or not composition:
+        return None
+    name, options = route
+
+    segments = chord_segments(composition, selected_region)
+    if not segments:
+        return None
+    notes = GENERATORS[name](segments, **options)
+    if not notes:
+        return None
+    additions = to_tab_additions(notes)
+    if not all(is_valid_addition(note) for note in additions):
+        return None
+
+    measures = segments[-1]["measure_offset"] + 1
+    return {
+        "chat_response": f"Here's {GENERATOR_DESCRIPTIONS[name]} over {progression_text(segments)} "
+                         f"({measures} measure{'s' if measures != 1 else ''}, {len(additions)} notes), "
+                         f"following the chords in your composition.",
+        "tab_additions": additions
+    }
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Generate composer tab_additions from chord names")
+    parser.add_argument("message", help='e.g. "Add a walking bass line"')
+    parser.add_argument("chords", nargs="+", help="One chord per 4/4 measure, e.g. C Am F G")
+
+    args = parser.parse_args()
+
+    composition = {"timeSignature": "4/4", "measures": [
+        {"chords": [{"name": chord, "time": 0}], "events": []} for chord in args.chords
+    ]}
+    answer = suggest_locally(args.message, composition)
+    if answer is None:
+        print("Not recognized (would go to the LLM)")
+    else:
+        print(answer["chat_response"])
+        for note in answer["tab_additions"]:
+            print(json.dumps(note))
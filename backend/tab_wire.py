@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Compact wire format for TabComposition responses
+
+The regular TabComposition JSON repeats "time", "string", "fret", "duration"
+and "leftFinger" for every note. The compact format stores each measure as
+columns instead:
+
+{
+  "format": "guitarhub-compact/1",
+  "title": "...", "tempo": 120, "timeSignature": "4/4", "version": "1.0",
+  "ticksPerWhole": 48,
+  "durations": [0.25, 0.125],            // interned duration table
+  "measures": [
+    {
+      "timeSignature": "4/4",
+      "t": [0, 12, 12, 0],               // time deltas in ticks (or "ta": absolute floats)
+      "s": [1, 2, 3, 6],                 // strings (null for rests)
+      "f": [0, 1, 0, 3],                 // frets (null for rests)
+      "d": [0, 0, 1, 0],                 // indices into "durations"
+      "lf": [null, 1, null, 3],          // leftFinger, only if any is set
+      "x": {"3": {"isRest": true}},      // extra event keys by event index
+      "chords": [...]                    // and any other measure keys, verbatim
+    }
+  ]
+}
+
+Other top-level keys (e.g. "_validation", "_processing") are copied verbatim.
+decode_compact() is the reference decoder: it returns the regular format,
+with every event carrying the five standard keys.
+"""
+
+import math
+from fractions import Fraction
+from typing import Dict, List, Optional
+
+COMPACT_FORMAT = "guitarhub-compact/1"
+COMPACT_MIME_TYPE = "application/vnd.guitarhub.compact+json"
+
+# Largest tick resolution tried when converting float times to integer ticks
+MAX_TICKS_PER_WHOLE = 3840
+
+EVENT_KEYS = ("time", "string", "fret", "duration", "leftFinger")
+
+
+def wants_compact(accept_header: Optional[str], format_param: Optional[str]) -> bool:
+    """Return True if the client opted into the compact encoding."""
+    if format_param and format_param.lower() == "compact":
+        return True
+    return bool(accept_header) and COMPACT_MIME_TYPE in accept_header
+
+
+def _ticks_per_whole(measures: List[Dict]) -> int:
+    """Find a tick resolution that represents every event time exactly."""
+    ticks_per_whole = 1
+    for measure in measures:
+        for event in measure.get("events", []):
+            time = event.get("time")
+            if isinstance(time, (int, float)):
+                denominator = Fraction(time).limit_denominator(MAX_TICKS_PER_WHOLE).denominator
+                ticks_per_whole = math.lcm(ticks_per_whole, denominator)
+    return ticks_per_whole
+
+
+def _exact_ticks(times: List, ticks_per_whole: int) -> Optional[List[int]]:
+    """Convert float times to ticks, or None if any time doesn't round-trip exactly."""
+    ticks = []
+    for time in times:
+        if not isinstance(time, (int, float)):
+            return None
+        tick = round(time * ticks_per_whole)
+        if tick / ticks_per_whole != time:
+            return None
+        ticks.append(tick)
+    return ticks
+
+
+def encode_compact(composition: Dict) -> Dict:
+    """Encode a TabComposition dict into the compact wire format."""
+    measures = composition.get("measures", [])
+    ticks_per_whole = _ticks_per_whole(measures)
+
+    durations: List = []
+    duration_index: Dict = {}
+
+    encoded = {"format": COMPACT_FORMAT}
+    for key, value in composition.items():
+        if key != "measures":
+            encoded[key] = value
+    encoded["ticksPerWhole"] = ticks_per_whole
+    encoded["durations"] = durations
+
+    encoded_measures = []
+    for measure in measures:
+        events = measure.get("events", [])
+        entry = {key: value for key, value in measure.items() if key != "events"}
+
+        times = [event.get("time") for event in events]
+        ticks = _exact_ticks(times, ticks_per_whole)
+        if ticks is not None:
+            previous = 0
+            deltas = []
+            for tick in ticks:
+                deltas.append(tick - previous)
+                previous = tick
+            entry["t"] = deltas
+        else:
+            entry["ta"] = times
+
+        entry["s"] = [event.get("string") for event in events]
+        entry["f"] = [event.get("fret") for event in events]
+
+        indices = []
+        for event in events:
+            duration = event.get("duration")
+            index = duration_index.get(duration)
+            if index is None:
+                index = len(durations)
+                duration_index[duration] = index
+                durations.append(duration)
+            indices.append(index)
+        entry["d"] = indices
+
+        left_fingers = [event.get("leftFinger") for event in events]
+        if any(finger is not None for finger in left_fingers):
+            entry["lf"] = left_fingers
+
+        extras = {}
+        for i, event in enumerate(events):
+            extra = {key: value for key, value in event.items() if key not in EVENT_KEYS}
+            if extra:
+                extras[str(i)] = extra
+        if extras:
+            entry["x"] = extras
+
+        encoded_measures.append(entry)
+
+    encoded["measures"] = encoded_measures
+    return encoded
+
+
+def decode_compact(encoded: Dict) -> Dict:
+    """Reference decoder: turn the compact wire format back into a TabComposition dict."""
+    if encoded.get("format") != COMPACT_FORMAT:
+        raise ValueError(f"Unsupported compact format: {encoded.get('format')}")
+
+    ticks_per_whole = encoded["ticksPerWhole"]
+    durations = encoded["durations"]
+
+    composition = {}
+    for key, value in encoded.items():
+        if key not in ("format", "ticksPerWhole", "durations", "measures"):
+            composition[key] = value
+
+    measures = []
+    for entry in encoded["measures"]:
+        strings = entry["s"]
+
+        if "t" in entry:
+            times = []
+            tick = 0
+            for delta in entry["t"]:
+                tick += delta
+                times.append(tick / ticks_per_whole)
+        else:
+            times = entry["ta"]
+
+        left_fingers = entry.get("lf") or [None] * len(strings)
+        extras = entry.get("x", {})
+
+        events = []
+        for i in range(len(strings)):
+            event = {
+                "time": times[i],
+                "string": strings[i],
+                "fret": entry["f"][i],
+                "duration": durations[entry["d"][i]],
+                "leftFinger": left_fingers[i]
+            }
+            if str(i) in extras:
+                event.update(extras[str(i)])
+            events.append(event)
+
+        measure = {}
+        for key, value in entry.items():
+            if key in ("t", "ta", "s", "f", "d", "lf", "x"):
+                continue
+            measure[key] = value
+        measure["events"] = events
+        measures.append(measure)
+
+    composition["measures"] = measures
+    return composition
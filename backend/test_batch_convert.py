@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test suite for batch MusicXML conversion.
+
+Run with: pytest test_batch_convert.py -v
+Or: python test_batch_convert.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from musicxml_to_tab import convert_batch, collect_batch_inputs
+
+
+SIMPLE_MUSICXML = """<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="3.1">
+  <work><work-title>{title}</work-title></work>
+  <part-list><score-part id="P1"><part-name>Guitar</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes>
+        <divisions>1</divisions>
+        <time><beats>4</beats><beat-type>4</beat-type></time>
+      </attributes>
+      <note><pitch><step>E</step><octave>4</octave></pitch><duration>{first}</duration></note>
+      <note><pitch><step>A</step><octave>3</octave></pitch><duration>2</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def make_library(base_dir: str) -> str:
+    """Create a small library: two valid files (one short measure) and one broken file."""
+    library = os.path.join(base_dir, "library")
+    os.makedirs(os.path.join(library, "book_a"))
+    os.makedirs(os.path.join(library, "book_b"))
+
+    with open(os.path.join(library, "book_a", "song.musicxml"), "w") as f:
+        f.write(SIMPLE_MUSICXML.format(title="Song A", first=2))
+    with open(os.path.join(library, "book_b", "song.musicxml"), "w") as f:
+        f.write(SIMPLE_MUSICXML.format(title="Song B", first=1))
+    with open(os.path.join(library, "book_b", "broken.xml"), "w") as f:
+        f.write("<score-partwise><part-list/></score-partwise>")
+    with open(os.path.join(library, "notes.txt"), "w") as f:
+        f.write("not music")
+
+    return library
+
+
+def test_collect_batch_inputs():
+    """Test directory and glob expansion."""
+    base_dir = tempfile.mkdtemp(prefix="test_batch_")
+    try:
+        library = make_library(base_dir)
+
+        from_dir = collect_batch_inputs([library])
+        assert sorted(name for _, name in from_dir) == [
+            os.path.join("book_a", "song.musicxml"),
+            os.path.join("book_b", "broken.xml"),
+            os.path.join("book_b", "song.musicxml"),
+        ]
+
+        from_glob = collect_batch_inputs([os.path.join(library, "**", "*.musicxml")])
+        assert len(from_glob) == 2
+        print("✓ Input collection test passed")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def test_convert_batch_summary_and_skip():
+    """Test conversion summary, failures and skipping up-to-date outputs."""
+    base_dir = tempfile.mkdtemp(prefix="test_batch_")
+    try:
+        library = make_library(base_dir)
+        out_dir = os.path.join(base_dir, "out")
+
+        summary = convert_batch([library], out_dir, workers=2)
+
+        assert summary["files_total"] == 3
+        assert summary["converted"] == 2
+        assert summary["failed"] == 1
+        assert summary["failures"][0]["input"].endswith("broken.xml")
+        assert summary["notes"] == 4
+        assert summary["validation_issues"] == 1  # Song B measure has only 3 beats
+        assert summary["files_with_validation_issues"] == 1
+
+        with open(os.path.join(out_dir, "book_a", "song.json")) as f:
+            composition = json.load(f)
+        assert composition["title"] == "Song A"
+        assert not [name for name in os.listdir(os.path.join(out_dir, "book_a"))
+                    if name.startswith(".tmp_")]
+
+        # Second run: outputs are newer than inputs
+        summary = convert_batch([library], out_dir, workers=2)
+        assert summary["skipped"] == 2
+        assert summary["converted"] == 0
+
+        # Touching an input makes it stale again
+        future = time.time() + 10
+        os.utime(os.path.join(library, "book_a", "song.musicxml"), (future, future))
+        summary = convert_batch([library], out_dir, workers=2)
+        assert summary["converted"] == 1 and summary["skipped"] == 1
+
+        print("✓ Batch summary test passed")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running Batch Conversion Tests...")
+    print("=" * 60)
+
+    try:
+        test_collect_batch_inputs()
+        test_convert_batch_summary_and_skip()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test suite for the LLM response cache.
+
+Run with: pytest test_llm_cache.py -v
+Or: python test_llm_cache.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import llm_cache
+from llm_cache import ResponseCache, bypass_requested, make_cache_key, prompt_version
+
+
+def test_cache_key_normalization():
+    """Test that keys ignore case/whitespace but not model, prompt, history or params."""
+    version = prompt_version("You are a guitar assistant.")
+    key = make_cache_key("gpt-4o", version, [], "Show me a 2-5-1 in C Major")
+
+    assert make_cache_key("gpt-4o", version, [], "  Show me a 2-5-1   in C Major\n") == key
+    # Case is part of the key: CM7 (major 7th) and Cm7 (minor 7th) are different chords
+    assert make_cache_key("gpt-4o", version, [], "Show me CM7 chord") != \
+        make_cache_key("gpt-4o", version, [], "show me Cm7 chord")
+    assert make_cache_key("gpt-4o", version, [{"role": "user", "content": "M1 CM7@1"}], "More") != \
+        make_cache_key("gpt-4o", version, [{"role": "user", "content": "M1 Cm7@1"}], "More")
+    assert make_cache_key("gpt-4o-mini", version, [], "Show me a 2-5-1 in C Major") != key
+    assert make_cache_key("gpt-4o", prompt_version("Edited prompt"), [], "Show me a 2-5-1 in C Major") != key
+    assert make_cache_key("gpt-4o", version, [{"role": "user", "content": "hi"}],
+                          "Show me a 2-5-1 in C Major") != key
+    assert make_cache_key("gpt-4o", version, [], "Show me a 2-5-1 in C Major",
+                          {"temperature": 0.2}) != key
+    assert make_cache_key("gpt-4o", version, [], "Show me a 2-5-1 in D Major") != key
+
+    assert bypass_requested({"X-LLM-Cache": "bypass"})
+    assert bypass_requested({"Cache-Control": "no-cache"})
+    assert not bypass_requested({})
+    print("✓ Cache key normalization test passed")
+
+
+def test_lru_and_ttl():
+    """Test LRU eviction, TTL expiry and counters in the memory tier."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", {"chat_response": "A"})
+    cache.put("b", {"chat_response": "B"})
+    assert cache.get("a") == {"chat_response": "A"}  # a is now most recent
+    cache.put("c", {"chat_response": "C"})            # evicts b
+    assert cache.get("b") is None
+    assert cache.get("c") == {"chat_response": "C"}
+
+    original_time = llm_cache.time.time
+    try:
+        now = original_time()
+        llm_cache.time.time = lambda: now + 61
+        assert cache.get("a") is None
+    finally:
+        llm_cache.time.time = original_time
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+    assert stats["expired"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["disk_entries"] is None
+    print("✓ LRU and TTL test passed")
+
+
+def test_disk_tier_survives_restart():
+    """Test that a new cache instance serves entries written by an earlier one."""
+    cache_dir = tempfile.mkdtemp(prefix="test_llm_cache_")
+    try:
+        first = ResponseCache(max_entries=8, ttl_seconds=60, cache_dir=cache_dir)
+        first.put("key1", {"chat_response": "Am pentatonic: A C D E G", "fretboard_sequence": []})
+
+        restarted = ResponseCache(max_entries=8, ttl_seconds=60, cache_dir=cache_dir)
+        assert restarted.stats()["disk_entries"] == 1
+        assert restarted.get("key1")["chat_response"] == "Am pentatonic: A C D E G"
+        assert restarted.get("key1") is not None
+        stats = restarted.stats()
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+        # Expired disk entries are deleted on lookup
+        short = ResponseCache(max_entries=0, ttl_seconds=-1, cache_dir=cache_dir)
+        short.put("key2", {"chat_response": "stale"})
+        assert short.get("key2") is None
+        assert not os.path.exists(os.path.join(cache_dir, "key2.json"))
+
+        # Pruning keeps the disk tier bounded, newest entries first
+        oldest = time.time() - 50
+        os.utime(os.path.join(cache_dir, "key1.json"), (oldest, oldest))
+        bounded = ResponseCache(max_entries=0, ttl_seconds=60, cache_dir=cache_dir, max_disk_entries=10)
+        for i in range(15):
+            bounded.put(f"k{i}", {"chat_response": str(i)})
+            written = time.time() - 30 + i
+            os.utime(os.path.join(cache_dir, f"k{i}.json"), (written, written))
+        remaining = [name for name in os.listdir(cache_dir) if name.endswith(".json")]
+        assert len(remaining) <= 10
+        assert "k14.json" in remaining and "key1.json" not in remaining
+        print("✓ Disk tier test passed")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_disk_io_outside_lock():
+    """Test that disk writes, reads and pruning never hold the lock memory hits need."""
+    cache_dir = tempfile.mkdtemp(prefix="test_llm_cache_")
+    original_replace, original_listdir = os.replace, os.listdir
+    try:
+        cache = ResponseCache(max_entries=8, ttl_seconds=60, cache_dir=cache_dir, max_disk_entries=2)
+        cache.put("warm", {"chat_response": "in memory"})
+        locked_during_io = []
+        hits = []
+
+        def replace(src, dst):
+            locked_during_io.append(cache._lock.locked())
+            if not cache._lock.locked():
+                hits.append(cache.get("warm"))  # A memory hit while the entry is written
+            original_replace(src, dst)
+
+        def listdir(path):
+            locked_during_io.append(cache._lock.locked())
+            return original_listdir(path)
+
+        os.replace, os.listdir = replace, listdir
+        for i in range(4):  # The third and fourth entries prune the disk tier
+            cache.put(f"k{i}", {"chat_response": str(i)})
+        os.replace, os.listdir = original_replace, original_listdir
+
+        assert len(locked_during_io) > 4 and not any(locked_during_io)
+        assert len(hits) == 4 and all(hit == {"chat_response": "in memory"} for hit in hits)
+        assert cache.stats()["disk_entries"] <= 2
+
+        # Disk lookups also happen outside the lock
+        restarted = ResponseCache(max_entries=8, ttl_seconds=60, cache_dir=cache_dir)
+        original_open = open
+        opened_locked = []
+
+        def checking_open(*args, **kwargs):
+            opened_locked.append(restarted._lock.locked())
+            return original_open(*args, **kwargs)
+
+        llm_cache.open = checking_open
+        try:
+            assert restarted.get("k3") == {"chat_response": "3"}
+        finally:
+            del llm_cache.open
+        assert opened_locked == [False]
+        print("✓ Disk I/O outside lock test passed")
+    finally:
+        os.replace, os.listdir = original_replace, original_listdir
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running LLM Cache Tests...")
+    print("=" * 60)
+
+    try:
+        test_cache_key_normalization()
+        test_lru_and_ttl()
+        test_disk_tier_survives_restart()
+        test_disk_io_outside_lock()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
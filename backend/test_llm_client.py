@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test suite for the OpenAI client wrapper (retries, backoff, circuit breaker),
+run against the fault-injecting stub LLM server.
+
+Run with: pytest test_llm_client.py -v
+Or: python test_llm_client.py
+"""
+
+import random
+import sys
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import openai
+from openai import OpenAI
+
+from llm_client import (CircuitBreaker, CircuitOpenError, LLMClient, make_http_client,
+                        retry_after_seconds)
+from llm_stub_server import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "Show me a G major scale"}]
+
+
+def make_stub():
+    return StubLLMServer(base_latency=0, prefill_seconds_per_token=0, cached_seconds_per_token=0,
+                         output_seconds_per_token=0, completion_tokens=20).start()
+
+
+def make_client(stub, read_timeout=5.0, breaker=None, **kwargs):
+    """LLMClient on the stub; sleeps are recorded, not slept."""
+    http_client = make_http_client(max_connections=4, max_keepalive=2, read_timeout=read_timeout)
+    client = OpenAI(base_url=stub.base_url, api_key="stub", http_client=http_client, max_retries=0)
+    delays = []
+    llm = LLMClient(client, breaker=breaker or CircuitBreaker(failure_threshold=100),
+                    sleep=delays.append, rng=random.Random(7), **kwargs)
+    return llm, delays
+
+
+def test_retries_transient_errors():
+    """Test that 5xx, 429 and dropped connections are retried with jittered backoff."""
+    stub = make_stub()
+    try:
+        llm, delays = make_client(stub, max_retries=3, base_delay=0.5, max_delay=8)
+        stub.inject_faults({"status": 503}, {"status": 500}, {"drop": True})
+        response = llm.create(model="gpt-4o", messages=MESSAGES)
+        assert response.choices[0].message.content.startswith('{"chat_response"')
+        assert stub.requests == 4 and stub.faults_served == 3
+
+        # Full jitter: retry n waits between 0 and base * 2^n
+        assert len(delays) == 3
+        for attempt, delay in enumerate(delays):
+            assert 0 <= delay <= 0.5 * 2 ** attempt
+
+        # Out of retries: the last error is raised
+        stub.inject_faults({"status": 502}, {"status": 502}, {"status": 502}, {"status": 502})
+        try:
+            llm.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected InternalServerError"
+        except openai.InternalServerError as e:
+            assert e.status_code == 502
+
+        stats = llm.stats()
+        assert stats["calls"] == 2 and stats["succeeded"] == 1 and stats["failed"] == 1
+        assert stats["retries"] == 6
+    finally:
+        stub.stop()
+
+    print("✓ Retry test passed")
+
+
+def test_retry_after_and_client_errors():
+    """Test Retry-After handling and that client errors are not retried."""
+    stub = make_stub()
+    try:
+        llm, delays = make_client(stub, max_retry_after=5)
+        stub.inject_faults({"status": 429, "retry_after": 2})
+        llm.create(model="gpt-4o", messages=MESSAGES)
+        assert delays == [2.0]
+        assert llm.stats()["retry_after_honored"] == 1
+
+        # A Retry-After beyond max_retry_after is not waited out
+        stub.inject_faults({"status": 429, "retry_after": 60})
+        try:
+            llm.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected RateLimitError"
+        except openai.RateLimitError:
+            pass
+        assert delays == [2.0]
+
+        requests = stub.requests
+        stub.inject_faults({"status": 400})
+        try:
+            llm.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected BadRequestError"
+        except openai.BadRequestError:
+            pass
+        assert stub.requests == requests + 1
+    finally:
+        stub.stop()
+
+    class Response:
+        def __init__(self, headers):
+            self.headers = headers
+
+    class Error(Exception):
+        def __init__(self, headers):
+            self.response = Response(headers)
+
+    assert retry_after_seconds(Error({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(Error({"retry-after": "3"})) == 3.0
+    assert 8 < retry_after_seconds(Error({"retry-after": formatdate(time.time() + 10, usegmt=True)})) <= 10
+    assert retry_after_seconds(Error({"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+    print("✓ Retry-After and client error test passed")
+
+
+def test_read_timeout_is_retried():
+    """Test that a slow upstream hits the per-call read timeout and is retried."""
+    stub = make_stub()
+    try:
+        llm, delays = make_client(stub, read_timeout=0.2, max_retries=1)
+        stub.inject_faults({"delay": 1.0})
+        start = time.perf_counter()
+        llm.create(model="gpt-4o", messages=MESSAGES)
+        assert time.perf_counter() - start < 0.9
+        assert len(delays) == 1 and stub.requests == 2
+    finally:
+        stub.stop()
+
+    print("✓ Read timeout test passed")
+
+
+def test_circuit_breaker():
+    """Test that repeated failures open the circuit, and a trial call closes it."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+    stub = make_stub()
+    try:
+        llm, _ = make_client(stub, breaker=breaker, max_retries=0)
+        stub.inject_faults({"status": 503}, {"status": 503})
+        for _ in range(2):
+            try:
+                llm.create(model="gpt-4o", messages=MESSAGES)
+                assert False, "Expected InternalServerError"
+            except openai.InternalServerError:
+                pass
+        assert breaker.state == "open"
+
+        # Open: fail fast without calling the upstream
+        requests = stub.requests
+        now[0] = 10
+        try:
+            llm.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected CircuitOpenError"
+        except CircuitOpenError as e:
+            assert e.retry_after == 20
+        try:
+            breaker.check()
+            assert False, "Expected CircuitOpenError"
+        except CircuitOpenError:
+            pass
+        assert stub.requests == requests
+
+        # After reset_timeout one trial call goes through; a failure reopens the circuit
+        now[0] = 31
+        assert breaker.state == "half_open"
+        stub.inject_faults({"status": 500})
+        try:
+            llm.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected InternalServerError"
+        except openai.InternalServerError:
+            pass
+        assert breaker.state == "open"
+
+        # ...and a success closes it
+        now[0] = 62
+        llm.create(model="gpt-4o", messages=MESSAGES)
+        assert breaker.state == "closed"
+
+        stats = llm.stats()["circuit"]
+        assert stats["opened"] == 2 and stats["short_circuited"] == 2 and stats["consecutive_failures"] == 0
+    finally:
+        stub.stop()
+
+    # Half-open admits a single trial call at a time
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 2
+    breaker.before_call()
+    try:
+        breaker.before_call()
+        assert False, "Expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    breaker.release()
+    breaker.before_call()
+
+    # A trial interrupted by a non-Exception (KeyboardInterrupt, ...) is released
+    def interrupted(**kwargs):
+        raise KeyboardInterrupt
+
+    now[0] = 4
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 6
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=interrupted)))
+    try:
+        LLMClient(client, breaker=breaker).create(model="gpt-4o", messages=MESSAGES)
+        assert False, "Expected KeyboardInterrupt"
+    except KeyboardInterrupt:
+        pass
+    breaker.before_call()  # Not short-circuited by a stuck trial
+
+    print("✓ Circuit breaker test passed")
+
+
+def test_stub_random_faults():
+    """Test the stub's random failure mode."""
+    stub = StubLLMServer(base_latency=0, output_seconds_per_token=0, completion_tokens=20,
+                         fail_rate=1.0, fail_status=429, retry_after=1).start()
+    try:
+        client = OpenAI(base_url=stub.base_url, api_key="stub", max_retries=0)
+        try:
+            client.chat.completions.create(model="gpt-4o", messages=MESSAGES)
+            assert False, "Expected RateLimitError"
+        except openai.RateLimitError as e:
+            assert e.response.headers["retry-after"] == "1"
+        assert stub.faults_served == 1
+    finally:
+        stub.stop()
+
+    print("✓ Stub random faults test passed")
+
+
+if __name__ == "__main__":
+    print("Running LLM Client Tests...")
+    print("=" * 60)
+
+    try:
+        test_retries_transient_errors()
+        test_retry_after_and_client_errors()
+        test_read_timeout_is_retried()
+        test_circuit_breaker()
+        test_stub_random_faults()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test suite for the bounded LLM call pool.
+
+Run with: pytest test_llm_executor.py -v
+Or: python test_llm_executor.py
+"""
+
+import sys
+import threading
+import time
+
+from llm_executor import LLMBusyError, LLMExecutor
+
+
+def blocking_call(release, result="ok"):
+    release.wait(5)
+    return result
+
+
+def test_run_and_limit():
+    """Test results, the in-flight limit and immediate rejection beyond the queue."""
+    executor = LLMExecutor(max_in_flight=2, max_queued=0, queue_timeout=1)
+    assert executor.run(lambda a, b=0: a + b, 2, b=3) == 5
+
+    release = threading.Event()
+    futures = [executor.submit(blocking_call, release) for _ in range(2)]
+    start = time.perf_counter()
+    try:
+        executor.submit(blocking_call, release)
+        assert False, "Expected LLMBusyError"
+    except LLMBusyError:
+        pass
+    assert time.perf_counter() - start < 0.5  # No queue: rejected at once
+
+    stats = executor.stats()
+    assert stats["in_flight"] == 2 and stats["rejected"] == 1
+
+    # try_submit never queues, even with room in the queue
+    executor.max_queued = 4
+    try:
+        executor.try_submit(blocking_call, release)
+        assert False, "Expected LLMBusyError"
+    except LLMBusyError:
+        pass
+    executor.max_queued = 0
+    assert executor.stats()["rejected"] == 2
+
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == ["ok", "ok"]
+    time.sleep(0.05)
+    stats = executor.stats()
+    assert stats["in_flight"] == 0
+    assert stats["completed"] == 3 and stats["peak_in_flight"] == 2
+    executor.shutdown()
+
+    print("✓ Run and limit test passed")
+
+
+def test_queue_wait_and_timeout():
+    """Test that queued calls take a freed slot, and give up after queue_timeout."""
+    executor = LLMExecutor(max_in_flight=1, max_queued=1, queue_timeout=0.2)
+    release = threading.Event()
+    executor.submit(blocking_call, release)
+
+    start = time.perf_counter()
+    try:
+        executor.run(lambda: "late")
+        assert False, "Expected LLMBusyError"
+    except LLMBusyError:
+        pass
+    assert 0.15 < time.perf_counter() - start < 1.0
+
+    # A slot freed while waiting is taken
+    threading.Timer(0.05, release.set).start()
+    assert executor.run(lambda: "queued") == "queued"
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1 and stats["peak_waiting"] == 1 and stats["waiting"] == 0
+    assert stats["mean_wait_ms"] > 0
+    executor.shutdown()
+
+    print("✓ Queue wait and timeout test passed")
+
+
+def test_errors_and_call_timeout():
+    """Test that exceptions reach the caller and slow calls time out."""
+    executor = LLMExecutor(max_in_flight=1, max_queued=0)
+
+    def fail():
+        raise ValueError("bad request")
+
+    try:
+        executor.run(fail)
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        assert str(e) == "bad request"
+
+    release = threading.Event()
+    try:
+        executor.run(blocking_call, release, timeout=0.05)
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    # The timed out call keeps its slot until it finishes
+    assert executor.stats()["in_flight"] == 1
+    release.set()
+    time.sleep(0.05)
+
+    stats = executor.stats()
+    assert stats["failed"] == 1 and stats["completed"] == 1 and stats["in_flight"] == 0
+    executor.shutdown()
+
+    print("✓ Errors and call timeout test passed")
+
+
+def test_iterate_streams():
+    """Test streamed results, producer errors and consumers stopping early."""
+    executor = LLMExecutor(max_in_flight=1, max_queued=0)
+
+    assert list(executor.iterate(lambda n: iter(range(n)), 4)) == [0, 1, 2, 3]
+
+    def broken_stream():
+        yield "partial"
+        raise ConnectionError("stream dropped")
+
+    received = []
+    try:
+        for item in executor.iterate(broken_stream):
+            received.append(item)
+        assert False, "Expected ConnectionError"
+    except ConnectionError:
+        pass
+    assert received == ["partial"]
+
+    # The slot is taken before iteration starts
+    closed = threading.Event()
+
+    class Stream:
+        def __iter__(self):
+            for i in range(1000):
+                time.sleep(0.005)
+                yield i
+
+        def close(self):
+            closed.set()
+
+    stream = executor.iterate(Stream)
+    try:
+        executor.iterate(Stream)
+        assert False, "Expected LLMBusyError"
+    except LLMBusyError:
+        pass
+
+    # Stopping early (client disconnect) closes the stream and frees the slot
+    assert next(stream) == 0
+    stream.close()
+    assert closed.wait(2)
+    time.sleep(0.05)
+    assert executor.stats()["in_flight"] == 0
+
+    release = threading.Event()
+    try:
+        list(executor.iterate(blocking_call, release, timeout=0.05))
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    release.set()
+    executor.shutdown()
+
+    print("✓ Iterate test passed")
+
+
+if __name__ == "__main__":
+    print("Running LLM Executor Tests...")
+    print("=" * 60)
+
+    try:
+        test_run_and_limit()
+        test_queue_wait_and_timeout()
+        test_errors_and_call_timeout()
+        test_iterate_streams()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
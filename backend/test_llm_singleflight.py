@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test suite for coalescing identical in-flight LLM requests.
+
+Run with: pytest test_llm_singleflight.py -v
+Or: python test_llm_singleflight.py
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import make_cache_key
+from llm_singleflight import SingleFlight
+
+
+def slow_call(calls, release, result):
+    def call():
+        calls.append(result)
+        release.wait(5)
+        return result
+    return call
+
+
+def run_concurrently(flights, keys, fn_for_key, timeout=5):
+    """Start do() for each key, wait until all have joined, then return the futures."""
+    pool = ThreadPoolExecutor(max_workers=len(keys))
+    futures = [pool.submit(flights.do, key, fn_for_key(key), timeout) for key in keys]
+    deadline = time.time() + 2
+    while time.time() < deadline:
+        stats = flights.stats()
+        if stats["in_flight_keys"] + stats["waiting"] >= len(keys):
+            break
+        time.sleep(0.01)
+    return pool, futures
+
+
+def test_duplicates_share_one_call():
+    """Test that concurrent identical requests make one call and share its result."""
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+    pool, futures = run_concurrently(flights, ["same"] * 10, lambda key: slow_call(calls, release, {"a": 1}))
+    release.set()
+    results = [f.result(timeout=5) for f in futures]
+    pool.shutdown()
+
+    assert len(calls) == 1
+    assert all(result == {"a": 1} for result, _ in results)
+    assert sum(1 for _, shared in results if shared) == 9
+
+    stats = flights.stats()
+    assert stats["calls"] == 1 and stats["coalesced"] == 9 and stats["peak_followers"] == 9
+    assert stats["in_flight_keys"] == 0 and stats["coalesced_rate"] == 0.9
+
+    # Once finished, the key is released and the next request calls again
+    assert flights.do("same", lambda: "fresh") == ("fresh", False)
+
+    print("✓ Duplicates share one call test passed")
+
+
+def test_different_keys_run_separately():
+    """Test that only identical keys are coalesced."""
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+    keys = ["a", "b", "a", "b", "c"]
+    pool, futures = run_concurrently(flights, keys, lambda key: slow_call(calls, release, key))
+    release.set()
+    results = [f.result(timeout=5) for f in futures]
+    pool.shutdown()
+
+    assert sorted(calls) == ["a", "b", "c"]
+    assert [result for result, _ in results] == keys
+    assert flights.stats()["coalesced"] == 2
+
+    # Request keys: normalized duplicates match, other history does not
+    key = make_cache_key("gpt-4o", "v1", [], "Show me a C major scale", {"temperature": 0.7})
+    assert key == make_cache_key("gpt-4o", "v1", [], "  Show me a  C major scale ", {"temperature": 0.7})
+    assert key != make_cache_key("gpt-4o", "v1", [{"role": "user", "content": "hi"}],
+                                 "Show me a C major scale", {"temperature": 0.7})
+
+    print("✓ Different keys test passed")
+
+
+def test_errors_and_timeouts():
+    """Test that the call's exception reaches every waiter and waiters can time out."""
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def failing_call(key):
+        def call():
+            release.wait(5)
+            raise ConnectionError("upstream down")
+        return call
+
+    pool, futures = run_concurrently(flights, ["k"] * 4, failing_call)
+    release.set()
+    errors = 0
+    for future in futures:
+        try:
+            future.result(timeout=5)
+        except ConnectionError:
+            errors += 1
+    pool.shutdown()
+    assert errors == 4
+    stats = flights.stats()
+    assert stats["shared_errors"] == 3 and stats["coalesced"] == 0 and stats["in_flight_keys"] == 0
+
+    # A duplicate gives up after its timeout; the call itself carries on
+    release = threading.Event()
+    leader = threading.Thread(target=flights.do, args=("slow", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+    try:
+        flights.do("slow", lambda: "unused", timeout=0.05)
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    release.set()
+    leader.join()
+    assert flights.stats()["follower_timeouts"] == 1
+    assert flights.stats()["waiting"] == 0
+
+    print("✓ Errors and timeouts test passed")
+
+
+def test_waiting_limit():
+    """Test that duplicates beyond max_waiting make their own call instead of waiting."""
+    flights = SingleFlight(max_waiting=2)
+    calls = []
+    release = threading.Event()
+    pool, futures = run_concurrently(flights, ["same"] * 3, lambda key: slow_call(calls, release, "shared"))
+    assert flights.stats()["waiting"] == 2
+
+    # The slot is full: this duplicate calls on its own and does not wait for release
+    assert flights.do("same", lambda: "own call", timeout=5) == ("own call", False)
+    release.set()
+    assert [f.result(timeout=5)[0] for f in futures] == ["shared"] * 3
+    pool.shutdown()
+
+    stats = flights.stats()
+    assert len(calls) == 1 and stats["coalesced"] == 2 and stats["overflow"] == 1 and stats["waiting"] == 0
+
+    print("✓ Waiting limit test passed")
+
+
+if __name__ == "__main__":
+    print("Running Singleflight Tests...")
+    print("=" * 60)
+
+    try:
+        test_duplicates_share_one_call()
+        test_different_keys_run_separately()
+        test_errors_and_timeouts()
+        test_waiting_limit()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
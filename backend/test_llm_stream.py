@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test suite for streaming structured LLM responses.
+
+Run with: pytest test_llm_stream.py -v
+Or: python test_llm_stream.py
+"""
+
+import json
+import sys
+
+from llm_stream import StreamingJSONParser, stream_structured_events
+
+RESPONSE = {
+    "chat_response": "Here's a C major \"cowboy\" chord:\nstrum down ☀ 🎸",
+    "fretboard_sequence": [
+        {"step": 1, "notes": [{"string": 5, "fret": 3, "finger": 3}], "label": "C {open}"}
+    ],
+    "tab_display": "e|--0--|\nB|--1--|",
+    "additional_notes": None,
+    "bpm": 80,
+    "loop": True
+}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_any_chunking():
+    """Test that deltas and values are correct however the text is split."""
+    text = json.dumps(RESPONSE, indent=2)  # \\u escapes, including a surrogate pair
+    for size in (1, 2, 3, 5, 7, 64, len(text)):
+        parser = StreamingJSONParser()
+        events = []
+        for chunk in chunked(text, size):
+            events.extend(parser.feed(chunk))
+
+        deltas = [value for kind, _, value in events if kind == "delta"]
+        assert "".join(deltas) == RESPONSE["chat_response"], size
+        values = {key: value for kind, key, value in events if kind == "value"}
+        assert values == RESPONSE, size
+        assert parser.done
+        assert parser.result() == RESPONSE
+
+    print("✓ Parser chunking test passed")
+
+
+def test_values_arrive_when_closed():
+    """Test that chat_response streams before the object ends and fields arrive on close."""
+    parser = StreamingJSONParser()
+    events = parser.feed('{"chat_response": "Play this')
+    assert events == [("delta", "chat_response", "Play this")]
+
+    events = parser.feed(' riff", "fretboard_sequence": [{"step": 1')
+    assert events == [("delta", "chat_response", " riff"), ("value", "chat_response", "Play this riff")]
+
+    assert parser.feed('}, {"step": 2}]') == [
+        ("value", "fretboard_sequence", [{"step": 1}, {"step": 2}])
+    ]
+    assert not parser.done
+    assert parser.feed('}') == []
+    assert parser.done
+    print("✓ Values on close test passed")
+
+
+def test_sse_events():
+    """Test the SSE stream for valid, incomplete and invalid model output."""
+    text = json.dumps(RESPONSE)
+    messages = list(stream_structured_events(chunked(text, 4)))
+    parsed = []
+    for message in messages:
+        event_line, data_line, blank = message.split("\n", 2)
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        assert blank == "\n"
+        parsed.append((event_line[7:], json.loads(data_line[6:])))
+
+    assert "".join(data["delta"] for event, data in parsed if event == "chat_response") == \
+        RESPONSE["chat_response"]
+    fields = [data["key"] for event, data in parsed if event == "field"]
+    assert fields == ["fretboard_sequence", "tab_display", "additional_notes", "bpm", "loop"]
+    assert parsed[-1] == ("done", RESPONSE)
+
+    missing = list(stream_structured_events(['{"tab_display": "x"}']))
+    assert missing[-1].startswith("event: error")
+
+    broken = list(stream_structured_events(['{"chat_response": "cut off']))
+    assert broken[0].startswith("event: chat_response")
+    assert broken[-1].startswith("event: error")
+
+    not_object = list(stream_structured_events(['Sure! Here is']))
+    assert len(not_object) == 1 and not_object[0].startswith("event: error")
+    print("✓ SSE events test passed")
+
+
+if __name__ == "__main__":
+    print("Running LLM Stream Tests...")
+    print("=" * 60)
+
+    try:
+        test_parser_any_chunking()
+        test_values_arrive_when_closed()
+        test_sse_events()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -6,14 +6,47 @@ This test validates that the musicxml_to_tab converter properly detects
 measures with incorrect beat counts.
 """
 
+import os
 import sys
+import tempfile
+import xml.etree.ElementTree as ET
 from musicxml_to_tab import (
     parse_time_signature,
     calculate_measure_duration,
+    calculate_measure_ticks,
+    compute_ticks_per_quarter,
+    convert_musicxml_to_tab,
     get_measure_event_extent
 )
 
 
+TRIPLET_MUSICXML = """<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="3.1">
+  <part-list><score-part id="P1"><part-name>Guitar</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes>
+        <divisions>3</divisions>
+        <time><beats>4</beats><beat-type>4</beat-type></time>
+      </attributes>
+      {triplets}
+      <note><pitch><step>E</step><octave>5</octave></pitch><duration>3</duration></note>
+      <backup><duration>12</duration></backup>
+      <note><pitch><step>E</step><octave>3</octave></pitch><duration>12</duration></note>
+    </measure>
+    <measure number="2">
+      <attributes>
+        <divisions>2</divisions>
+        <time><beats>6</beats><beat-type>8</beat-type></time>
+      </attributes>
+      <note><pitch><step>A</step><octave>4</octave></pitch><duration>3</duration></note>
+      <note><pitch><step>A</step><octave>4</octave></pitch><duration>3</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
 def test_parse_time_signature():
     """Test time signature parsing."""
     print("Testing parse_time_signature...")
@@ -163,6 +196,60 @@ def test_validation_scenarios():
     print("  All tests passed!\n")
 
 
+def test_tick_time_model():
+    """Test that triplets and divisions changes validate exactly."""
+    print("Testing integer tick time model...")
+
+    # 9 triplet eighths (1 division each at divisions=3) + a quarter = 4 beats
+    triplet = '<note><pitch><step>G</step><octave>4</octave></pitch><duration>1</duration></note>'
+    xml = TRIPLET_MUSICXML.format(triplets="\n".join([triplet] * 9))
+
+    part = ET.fromstring(xml).find('part')
+    ticks_per_quarter = compute_ticks_per_quarter(part)
+    # LCM of divisions 3 and 2, scaled so 6/8 measures are integral
+    assert ticks_per_quarter == 6, f"Expected 6 ticks per quarter, got {ticks_per_quarter}"
+    assert calculate_measure_ticks("6/8", ticks_per_quarter * 4) == 18
+    print(f"  ✓ ticks_per_quarter = {ticks_per_quarter}")
+
+    fd, path = tempfile.mkstemp(suffix=".musicxml")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(xml)
+        composition = convert_musicxml_to_tab(path)
+    finally:
+        os.remove(path)
+
+    # Both measures are full - no float tolerance needed to accept them
+    assert "_validation" not in composition, f"Unexpected issues: {composition.get('_validation')}"
+    print("  ✓ Triplet measure and 6/8 measure validate exactly")
+
+    first = composition["measures"][0]["events"]
+    times = [e["time"] for e in first]
+    assert times == sorted(times), "Events should be sorted by time"
+    # Backup rewinds to the start of the measure for the bass voice
+    bass = [e for e in first if e["duration"] == 1.0]
+    assert len(bass) == 1 and bass[0]["time"] == 0.0
+    assert abs(first[-1]["time"] - 0.75) < 1e-12
+    print("  ✓ Backup/forward arithmetic is exact")
+
+    # Drop one triplet: 8/3 eighths short of a full measure must be flagged
+    xml = TRIPLET_MUSICXML.format(triplets="\n".join([triplet] * 8)).replace(
+        '<duration>12</duration></note>', '<duration>11</duration></note>')
+    fd, path = tempfile.mkstemp(suffix=".musicxml")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(xml)
+        composition = convert_musicxml_to_tab(path)
+    finally:
+        os.remove(path)
+
+    assert composition["_validation"]["issue_count"] == 1
+    assert composition["_validation"]["issues"][0]["measure_number"] == 1
+    print("  ✓ Short triplet measure is flagged")
+
+    print("  All tests passed!\n")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Measure Beat Count Validation Tests")
@@ -174,6 +261,7 @@ if __name__ == "__main__":
         test_calculate_measure_duration()
         test_get_measure_event_extent()
         test_validation_scenarios()
+        test_tick_time_model()
 
         print("=" * 60)
         print("All tests passed! ✓")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Test suite for Standard MIDI File import.
+
+Run with: pytest test_midi_import.py -v
+Or: python test_midi_import.py
+"""
+
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+
+from midi_to_tab import (
+    convert_midi_to_columns,
+    convert_midi_to_tab,
+    convert_midi_with_tracks,
+    list_midi_tracks,
+    snap_duration
+)
+
+PPQ = 480
+
+
+def varlen(value):
+    """Encode a MIDI variable-length quantity."""
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def track_chunk(events):
+    """Build an MTrk chunk from (absolute tick, event bytes) pairs."""
+    data = b""
+    tick = 0
+    for at, event in sorted(events, key=lambda e: e[0]):
+        data += varlen(at - tick) + event
+        tick = at
+    data += varlen(0) + b"\xff\x2f\x00"
+    return b"MTrk" + struct.pack(">I", len(data)) + data
+
+
+def note(channel, pitch, start, length):
+    """Note-on/note-off event pair."""
+    return [(start, bytes([0x90 | channel, pitch, 100])),
+            (start + length, bytes([0x80 | channel, pitch, 0]))]
+
+
+def write_midi(path, tracks):
+    with open(path, "wb") as f:
+        f.write(b"MThd" + struct.pack(">IHHH", 6, 1, len(tracks), PPQ))
+        for events in tracks:
+            f.write(track_chunk(events))
+    return path
+
+
+def make_song(path):
+    """Conductor track, melody (channel 0), drums (channel 9), chords (channel 1)."""
+    conductor = [
+        (0, b"\xff\x03" + varlen(12) + b"Student Song"),
+        (0, b"\xff\x51\x03" + (600000).to_bytes(3, "big")),  # 100 BPM
+        (0, b"\xff\x58\x04\x03\x02\x18\x08"),                 # 3/4
+    ]
+    # Slightly human timing: onsets and lengths off the grid by a few ticks
+    melody = [(0, b"\xff\x03\x06Melody")]
+    melody += note(0, 64, 7, 470)            # E4 quarter, late
+    melody += note(0, 67, 478, 230)          # G4 eighth, early
+    melody += note(0, 69, 720, 250)          # A4 eighth
+    melody += note(0, 72, 955, 1430)         # C5 ~dotted half, crosses the barline
+    drums = note(9, 36, 0, 100) + note(9, 38, 480, 100)
+    # Open C major chord, second measure, written with running status note-offs
+    chords = [(1440, bytes([0x91, 48, 90])), (1440, bytes([52, 90])), (1440, bytes([55, 90])),
+              (1440, bytes([60, 90])), (1440, bytes([64, 90])),
+              (2880, bytes([0x81, 48, 0])), (2880, bytes([52, 0])), (2880, bytes([55, 0])),
+              (2880, bytes([60, 0])), (2880, bytes([64, 0]))]
+    return write_midi(path, [conductor, melody, drums, chords])
+
+
+def test_parse_and_quantize():
+    """Test meta events, quantization to the composer grid and drum exclusion."""
+    test_dir = tempfile.mkdtemp(prefix="test_midi_")
+    try:
+        path = make_song(os.path.join(test_dir, "song.mid"))
+
+        tracks = list_midi_tracks(path)
+        assert [t["name"] for t in tracks] == ["Student Song", "Melody", None, None]
+        assert [t["channels"] for t in tracks] == [[], [0], [9], [1]]
+        # The converter summarizes every track, not only the imported ones
+        columns, summaries = convert_midi_with_tracks(path, tracks=[1])
+        assert summaries == tracks
+        assert columns.to_dict() == convert_midi_to_tab(path, tracks=[1])
+
+        composition = convert_midi_to_tab(path, tracks=[1])
+        assert composition["title"] == "Student Song"
+        assert composition["tempo"] == 100
+        assert composition["timeSignature"] == "3/4"
+        assert len(composition["measures"]) == 1
+
+        first = composition["measures"][0]["events"]
+        assert [(e["time"], e["duration"]) for e in first] == [
+            (0.0, 0.25), (0.25, 0.125), (0.375, 0.125), (0.5, 0.25)
+        ]
+        # Every measure stays within its 3/4 length (the long C5 is cut at the barline)
+        assert not composition.get("_validation")
+
+        # Default channels skip drums but keep every pitched track
+        full = convert_midi_to_columns(path)
+        assert len(full) == 4 + 5
+        print("✓ Parse and quantize test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_channel_selection_and_fingering():
+    """Test channel selection and that chords use the shared position assignment."""
+    test_dir = tempfile.mkdtemp(prefix="test_midi_")
+    try:
+        path = make_song(os.path.join(test_dir, "song.mid"))
+
+        composition = convert_midi_to_tab(path, channels=[1])
+        events = composition["measures"][1]["events"]
+        # Open C grip from the voicing index: x32010
+        assert sorted((e["string"], e["fret"]) for e in events) == [
+            (1, 0), (2, 1), (3, 0), (4, 2), (5, 3)
+        ]
+        assert all(e["duration"] == 0.75 for e in events)
+        assert composition["measures"][0]["events"] == []
+
+        drums = convert_midi_to_columns(path, channels=[9])
+        assert len(drums) == 2
+
+        assert snap_duration(13.2, 16) == 12
+        assert snap_duration(13.2, 16, limit=8) == 8
+        print("✓ Channel selection and fingering test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_invalid_file():
+    """Test that non-MIDI, truncated, garbage and nonsensical files are rejected with ValueError."""
+    test_dir = tempfile.mkdtemp(prefix="test_midi_")
+    try:
+        path = os.path.join(test_dir, "bad.mid")
+        with open(path, "wb") as f:
+            f.write(b"RIFF\x00\x00\x00\x00WAVE")
+        try:
+            convert_midi_to_tab(path)
+            assert False, "Expected ValueError"
+        except ValueError as e:
+            assert "Standard MIDI" in str(e)
+
+        # Truncated and garbage input: ValueError (a 400 from the endpoint), never IndexError
+        song = make_song(os.path.join(test_dir, "song.mid"))
+        with open(song, "rb") as f:
+            data = f.read()
+        note_on = track_chunk(note(0, 64, 0, 480))[8:]
+        cases = {
+            "short header": data[:10],
+            "tiny file": b"MTh",
+            "chunk cut short": data[:len(data) - 5],
+            "chunk header cut": data[:14 + 4],
+            "event past end": data[:14] + b"MTrk" + struct.pack(">I", 3) + note_on[:3],
+            "meta past end": data[:14] + b"MTrk" + struct.pack(">I", 4) + b"\x00\xff\x03\x20",
+            "time signature x/2^40": data[:14] + track_chunk([(0, b"\xff\x58\x04\x04\x28\x18\x08")]),
+            "time signature 0/4": data[:14] + track_chunk([(0, b"\xff\x58\x04\x00\x02\x18\x08")]),
+        }
+        for name, content in cases.items():
+            with open(path, "wb") as f:
+                f.write(content)
+            for convert in (convert_midi_to_tab, list_midi_tracks):
+                try:
+                    convert(path)
+                    assert False, f"Expected ValueError for {name}"
+                except ValueError:
+                    pass
+
+        # A corrupt delta time far past the end is not expanded into empty measures
+        with open(path, "wb") as f:
+            f.write(data[:14] + track_chunk(note(0, 64, PPQ * 4 * 100_000, 480)))
+        try:
+            convert_midi_to_tab(path)
+            assert False, "Expected ValueError for a note 100000 measures in"
+        except ValueError as e:
+            assert "measures" in str(e)
+
+        # Random track bytes either parse or raise ValueError
+        rng = random.Random(7)
+        for _ in range(200):
+            body = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 40)))
+            with open(path, "wb") as f:
+                f.write(b"MThd" + struct.pack(">IHHH", 6, 1, 1, PPQ) +
+                        b"MTrk" + struct.pack(">I", len(body)) + body)
+            try:
+                convert_midi_to_tab(path)
+            except ValueError:
+                pass
+        print("✓ Invalid file test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running MIDI Import Tests...")
+    print("=" * 60)
+
+    try:
+        test_parse_and_quantize()
+        test_channel_selection_and_fingering()
+        test_invalid_file()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
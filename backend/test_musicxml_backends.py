@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test suite for the MusicXML parser backends.
+
+Run with: pytest test_musicxml_backends.py -v
+Or: python test_musicxml_backends.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from musicxml_backends import HAS_LXML, get_backend
+from musicxml_to_tab import clear_parse_cache, convert_musicxml_to_tab
+from synthetic_musicxml import generate_musicxml
+
+
+def test_backends_produce_identical_compositions():
+    """Test that etree and lxml produce the same compositions."""
+    if not HAS_LXML:
+        print("  (lxml not installed - skipped)")
+        return
+
+    test_dir = tempfile.mkdtemp(prefix="test_backends_")
+    try:
+        cases = [
+            {"measures": 40, "voices": 1, "chord_size": 1, "divisions": 2, "rest_probability": 0.2},
+            {"measures": 40, "voices": 3, "chord_size": 4, "divisions": 12},
+            {"measures": 40, "voices": 2, "chord_size": 2, "divisions": 24, "time_signature": "6/8"},
+        ]
+        for i, params in enumerate(cases):
+            document = generate_musicxml(seed=i, **params)
+            path = os.path.join(test_dir, f"case_{i}.musicxml")
+            with open(path, "w") as f:
+                f.write(document)
+
+            mxl_path = os.path.join(test_dir, f"case_{i}.mxl")
+            with zipfile.ZipFile(mxl_path, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("score.xml", document)
+
+            for source in (path, mxl_path):
+                clear_parse_cache()
+                etree_result = convert_musicxml_to_tab(source, "etree")
+                lxml_result = convert_musicxml_to_tab(source, "lxml")
+                assert etree_result == lxml_result, f"Backends differ on {source}"
+        print("✓ Backend equivalence test passed")
+    finally:
+        clear_parse_cache()
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_get_backend_selection():
+    """Test default and explicit backend selection."""
+    assert get_backend("etree").name == "etree"
+
+    saved = os.environ.pop("MUSICXML_PARSER", None)
+    try:
+        assert get_backend().name == ("lxml" if HAS_LXML else "etree")
+        os.environ["MUSICXML_PARSER"] = "etree"
+        assert get_backend().name == "etree"
+    finally:
+        os.environ.pop("MUSICXML_PARSER", None)
+        if saved is not None:
+            os.environ["MUSICXML_PARSER"] = saved
+
+    try:
+        get_backend("expat")
+        assert False, "Unknown backend should raise"
+    except ValueError:
+        pass
+    print("✓ Backend selection test passed")
+
+
+if __name__ == "__main__":
+    print("Running MusicXML Backend Tests...")
+    print("=" * 60)
+
+    try:
+        test_backends_produce_identical_compositions()
+        test_get_backend_selection()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test suite for .mxl container handling and the parse cache.
+
+Run with: pytest test_mxl_container.py -v
+Or: python test_mxl_container.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from musicxml_to_tab import (
+    _parse_musicxml_cached,
+    clear_parse_cache,
+    convert_musicxml_to_tab,
+    parse_musicxml_file
+)
+
+
+SCORE_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="3.1">
+  <work><work-title>{title}</work-title></work>
+  <part-list><score-part id="P1"><part-name>Guitar</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes><divisions>1</divisions></attributes>
+      <note><pitch><step>E</step><octave>4</octave></pitch><duration>4</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+CONTAINER = """<?xml version="1.0" encoding="UTF-8"?>
+<container>
+  <rootfiles>
+    <rootfile full-path="scores/main.musicxml" media-type="application/vnd.recordare.musicxml+xml"/>
+    <rootfile full-path="scores/main.pdf" media-type="application/pdf"/>
+  </rootfiles>
+</container>
+"""
+
+
+def write_mxl(path: str, with_container: bool = True) -> None:
+    """Write a .mxl whose first XML member is NOT the score named in the container."""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("aaa_parts/part1.xml", SCORE_TEMPLATE.format(title="Decoy Part"))
+        zf.writestr("scores/main.musicxml", SCORE_TEMPLATE.format(title="Real Score"))
+        if with_container:
+            zf.writestr("META-INF/container.xml", CONTAINER)
+
+
+def test_rootfile_from_container():
+    """Test that the container manifest decides the rootfile."""
+    test_dir = tempfile.mkdtemp(prefix="test_mxl_")
+    try:
+        path = os.path.join(test_dir, "song.mxl")
+        write_mxl(path)
+        assert convert_musicxml_to_tab(path)["title"] == "Real Score"
+
+        legacy = os.path.join(test_dir, "legacy.mxl")
+        write_mxl(legacy, with_container=False)
+        assert convert_musicxml_to_tab(legacy)["title"] == "Decoy Part"
+        print("✓ Container rootfile test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_parse_cache():
+    """Test that unchanged files are served from the cache and changed ones are not."""
+    test_dir = tempfile.mkdtemp(prefix="test_mxl_")
+    clear_parse_cache()
+    try:
+        path = os.path.join(test_dir, "song.mxl")
+        write_mxl(path)
+
+        # Off by default: server jobs convert temp files that are deleted right after
+        assert parse_musicxml_file(path) is not parse_musicxml_file(path)
+        assert _parse_musicxml_cached.cache_info().currsize == 0
+
+        first = parse_musicxml_file(path, cache=True)
+        second = parse_musicxml_file(path, cache=True)
+        assert first is second
+        assert _parse_musicxml_cached.cache_info().hits == 1
+
+        # Rewriting the file changes mtime/size, so it is parsed again
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr("score.xml", SCORE_TEMPLATE.format(title="Rewritten Score"))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        third = parse_musicxml_file(path, cache=True)
+        assert third is not first
+        assert third.find('.//work-title').text == "Rewritten Score"
+        print("✓ Parse cache test passed")
+    finally:
+        clear_parse_cache()
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running MXL Container Tests...")
+    print("=" * 60)
+
+    try:
+        test_rootfile_from_container()
+        test_parse_cache()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
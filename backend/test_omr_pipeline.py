@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Test suite for the OMR pipeline flow (Audiveris and PDF rasterization stubbed).
+
+Run with: pytest test_omr_pipeline.py -v
+Or: python test_omr_pipeline.py
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+from PIL import Image
+
+import omr_pipeline
+from omr_pipeline import OMRJob, process_omr, start_omr_job
+from synthetic_musicxml import generate_musicxml
+
+
+class FakeAudiveris:
+    """
+    Stand-in for run_audiveris: writes synthetic MusicXML per page, failing chosen
+    pages. Pages are identified by the "page_N" part of the image name, so retry
+    variants of a failing page fail too, unless their name contains recover_with.
+    With title_from_name the score is titled after the image, as Audiveris does.
+    """
+
+    def __init__(self, failing_pages=(), measures=4, recover_with=None, title_from_name=False):
+        self.failing_pages = set(failing_pages)
+        self.title_from_name = title_from_name
+        self.measures = measures
+        self.recover_with = recover_with
+        self.calls = []
+        self.timeouts = []
+
+    def __call__(self, image_path, output_dir, timeout=None):
+        self.calls.append(image_path)
+        self.timeouts.append(timeout)
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        match = re.search(r"page_(\d+)", name)
+        page = int(match.group(1)) if match else 1
+        recovered = self.recover_with is not None and self.recover_with in name
+        if page in self.failing_pages and not recovered:
+            return None, "Could not detect music notation in this image"
+        path = os.path.join(output_dir, f"{name}.musicxml")
+        with open(path, "w") as f:
+            f.write(generate_musicxml(measures=self.measures, seed=page, rest_probability=0.0,
+                                      title=name if self.title_from_name else f"Scan_page_{page}"))
+        return path, None
+
+
+def fake_pdf_pages(count):
+    """Stand-in for convert_pdf_to_images producing `count` blank pages."""
+    def convert(pdf_path, output_dir, dpi=200, scratch=None):
+        paths = []
+        for i in range(count):
+            path = os.path.join(output_dir, f"page_{i + 1}.png")
+            paths.append(omr_pipeline.save_image(Image.new("L", (200, 100), 255), path, scratch))
+        return paths
+    return convert
+
+
+def run_job(input_name, fake_audiveris, pdf_pages=None, frames=1):
+    """Run process_omr on a dummy input with the pipeline's external steps stubbed."""
+    test_dir = tempfile.mkdtemp(prefix="test_omr_pipeline_")
+    input_path = os.path.join(test_dir, input_name)
+    if input_name.endswith(".pdf"):
+        with open(input_path, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+    elif input_name.endswith(".musicxml"):
+        with open(input_path, "w") as f:
+            f.write(generate_musicxml(measures=6, rest_probability=0.0, title="Exported Song"))
+    else:
+        pages = [Image.new("L", (200, 100), 255 - i) for i in range(frames)]
+        pages[0].save(input_path, save_all=frames > 1, append_images=pages[1:])
+
+    originals = (omr_pipeline.run_audiveris, omr_pipeline.convert_pdf_to_images)
+    omr_pipeline.run_audiveris = fake_audiveris
+    if pdf_pages is not None:
+        omr_pipeline.convert_pdf_to_images = fake_pdf_pages(pdf_pages)
+    try:
+        job = OMRJob("test_job", input_path, os.path.join(test_dir, "out"))
+        os.makedirs(job.output_dir)
+        process_omr(job)
+        return job, test_dir
+    finally:
+        omr_pipeline.run_audiveris, omr_pipeline.convert_pdf_to_images = originals
+
+
+def test_multi_page_streaming_result():
+    """Test that pages are merged on disk and the job only keeps a handle."""
+    job, test_dir = run_job("Songbook.pdf", FakeAudiveris(failing_pages={2}), pdf_pages=3)
+    try:
+        assert job.status == "completed", job.error
+        assert job.result.measures == 8
+        assert job.result.title == "Songbook"
+
+        with open(os.path.join(job.output_dir, "composition.json")) as f:
+            composition = json.load(f)
+        assert composition == job.result.load()
+        assert len(composition["measures"]) == 8
+        assert composition["_processing"].pop("scratch")["mode"] == "disk"
+        preprocess = composition["_processing"].pop("preprocess")
+        assert preprocess["skew_degrees"] == [0.0, 0.0, 0.0]  # Blank pages are left level
+        assert {"despeckle", "deskew", "crop"} <= set(preprocess["timings"])
+        assert composition["_processing"] == {
+            "pages_total": 3, "pages_processed": 2, "failed_pages": [2],
+            "recovered_pages": [], "deadline_exceeded": False
+        }
+        print("✓ Multi-page streaming result test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_all_pages_fail():
+    """Test that a job with no recognized pages fails and leaves no result file."""
+    job, test_dir = run_job("blank.png", FakeAudiveris(failing_pages={1}))
+    try:
+        assert job.status == "failed"
+        assert job.result is None
+        assert not os.path.exists(os.path.join(job.output_dir, "composition.json"))
+        assert not os.path.exists(os.path.join(job.output_dir, "composition.json.partial"))
+        print("✓ All pages fail test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_musicxml_upload_skips_omr():
+    """Test that MusicXML input is converted directly, without Audiveris."""
+    audiveris = FakeAudiveris()
+    job, test_dir = run_job("exported.musicxml", audiveris)
+    try:
+        assert job.status == "completed", job.error
+        assert audiveris.calls == []
+        composition = job.result.load()
+        assert composition["title"] == "Exported Song"
+        assert len(composition["measures"]) == 6
+        assert composition["_processing"]["source"] == "musicxml"
+
+        # Synchronous start returns the finished job
+        sync_job = start_omr_job(job.input_path, os.path.join(test_dir, "sync"), background=False)
+        assert sync_job.status == "completed"
+        assert sync_job.result.load()["measures"] == composition["measures"]
+        print("✓ MusicXML upload test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_multi_frame_images_split_into_pages():
+    """Test that multi-page TIFFs and animated GIFs give one page per frame."""
+    for name in ("scan.tiff", "scan.gif"):
+        audiveris = FakeAudiveris(failing_pages={2})
+        job, test_dir = run_job(name, audiveris, frames=3)
+        try:
+            assert job.status == "completed", job.error
+            assert job.pages_total == 3
+            first_pass = [os.path.basename(p) for p in audiveris.calls
+                          if re.fullmatch(r"scan_page_\d\.png", os.path.basename(p))]
+            assert first_pass == ["scan_page_1.png", "scan_page_2.png", "scan_page_3.png"]
+            assert job.result.measures == 8
+            assert job.result.load()["_processing"]["failed_pages"] == [2]
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+    print("✓ Multi-frame image test passed")
+
+
+def test_failed_page_retry_ladder():
+    """Test that only failed pages are retried, in ladder order, until one strategy works."""
+    audiveris = FakeAudiveris(failing_pages={2}, recover_with="_band_")
+    job, test_dir = run_job("Songbook.pdf", audiveris, pdf_pages=3)
+    try:
+        assert job.status == "completed", job.error
+        names = [os.path.basename(p) for p in audiveris.calls]
+        assert names == [
+            "page_1.png", "page_2.png",
+            "page_2_contrast.png", "page_2_upscale.png", "page_2_band_1.png", "page_2_band_2.png",
+            "page_3.png"
+        ]
+        # Retry attempts run with the per-attempt budget, not the full page timeout
+        assert all(t <= omr_pipeline.RETRY_ATTEMPT_TIMEOUT for t in audiveris.timeouts[2:6])
+        assert audiveris.timeouts[0] == omr_pipeline.AUDIVERIS_TIMEOUT
+
+        composition = job.result.load()
+        assert len(composition["measures"]) == 16  # Two bands add four measures each
+        assert composition["_processing"]["failed_pages"] == []
+        assert composition["_processing"]["recovered_pages"] == [{"page": 2, "strategy": "bands"}]
+
+        # A first page recovered from a variant is not titled after the variant's file
+        shutil.rmtree(test_dir, ignore_errors=True)
+        audiveris = FakeAudiveris(failing_pages={1}, recover_with="_contrast", title_from_name=True)
+        job, test_dir = run_job("Songbook.pdf", audiveris, pdf_pages=1)
+        assert os.path.basename(audiveris.calls[-1]) == "page_1_contrast.png"
+        assert job.result.title == "Songbook"
+        print("✓ Failed page retry ladder test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_job_deadline():
+    """Test that no page starts after the job deadline."""
+    original = omr_pipeline.JOB_DEADLINE_SECONDS
+    omr_pipeline.JOB_DEADLINE_SECONDS = 0
+    try:
+        audiveris = FakeAudiveris()
+        job, test_dir = run_job("Songbook.pdf", audiveris, pdf_pages=2)
+        assert job.status == "failed"
+        assert job.error == "Processing deadline exceeded"
+        assert audiveris.calls == []
+        shutil.rmtree(test_dir, ignore_errors=True)
+        print("✓ Job deadline test passed")
+    finally:
+        omr_pipeline.JOB_DEADLINE_SECONDS = original
+
+
+def test_tmpfs_scratch_budget():
+    """Test a job in tmpfs scratch mode whose pages overflow the budget."""
+    fake_tmpfs = tempfile.mkdtemp(prefix="test_omr_tmpfs_")
+    settings = {"OMR_SCRATCH_MODE": "tmpfs", "OMR_SCRATCH_DIR": fake_tmpfs,
+                "OMR_SCRATCH_BUDGET_MB": "0.0001"}
+    saved = {key: os.environ.get(key) for key in settings}
+    os.environ.update(settings)
+    try:
+        job, test_dir = run_job("Songbook.pdf", FakeAudiveris(), pdf_pages=2)
+        try:
+            assert job.status == "completed", job.error
+            scratch = job.result.load()["_processing"]["scratch"]
+            assert scratch["mode"] == "tmpfs"
+            assert scratch["spilled_files"] >= 1
+            assert scratch["used_mb"] == 0  # Every page image released once processed
+            assert os.listdir(fake_tmpfs) == []  # Scratch space removed after the job
+            print("✓ tmpfs scratch budget test passed")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(fake_tmpfs, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running OMR Pipeline Tests...")
+    print("=" * 60)
+
+    try:
+        test_multi_page_streaming_result()
+        test_all_pages_fail()
+        test_musicxml_upload_skips_omr()
+        test_multi_frame_images_split_into_pages()
+        test_failed_page_retry_ladder()
+        test_job_deadline()
+        test_tmpfs_scratch_budget()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
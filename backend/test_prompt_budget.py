@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test suite for token-budgeted conversation history.
+
+Run with: pytest test_prompt_budget.py -v
+Or: python test_prompt_budget.py
+"""
+
+import sys
+import threading
+import time
+
+from llm_executor import LLMExecutor
+from prompt_budget import (
+    RollingSummarizer, build_history, count_message_tokens, count_tokens, get_encoder,
+    TOKENS_PER_MESSAGE
+)
+
+
+def make_history(turns, tab_every=0):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} about chords in G"})
+        answer = f"Answer {i}: try G, C and D."
+        if tab_every and i % tab_every == 0:
+            answer += "\n" + "\n".join(f"{s}|--3--2--0--0--0--3--|" for s in "eBGDAE") * 20
+        history.append({"role": "assistant", "content": answer})
+    return history
+
+
+def test_token_counting():
+    """Test counts are positive, grow with text and include message overhead."""
+    assert get_encoder() is get_encoder()  # Loaded once
+    assert count_tokens("") == 0
+    short = count_tokens("Show me a 2-5-1 in C Major")
+    assert 0 < short < count_tokens("Show me a 2-5-1 in C Major " * 10)
+
+    messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+    assert count_message_tokens(messages) == \
+        3 + 2 * TOKENS_PER_MESSAGE + count_tokens("hello") + count_tokens("hi")
+    print("✓ Token counting test passed")
+
+
+def test_budget_keeps_recent_turns():
+    """Test trimming keeps the newest turns within budget, in order."""
+    history = make_history(20, tab_every=3)
+
+    messages, stats = build_history(history, budget=400)
+    assert messages == history[-len(messages):]
+    assert stats["history_tokens"] <= 400
+    assert stats["kept_messages"] == len(messages)
+    assert stats["dropped_messages"] == len(history) - len(messages)
+    assert stats["summary_tokens"] == 0
+
+    # Everything fits a large budget; a tiny one keeps nothing
+    assert build_history(history, budget=100000)[0] == history
+    assert build_history(history, budget=5)[0] == []
+
+    # Malformed or empty entries are skipped
+    messages, _ = build_history([{"role": "user", "content": ""}, "junk", history[0]], budget=1000)
+    assert messages == [history[0]]
+    print("✓ Budget trimming test passed")
+
+
+def test_rolling_summary():
+    """Test that dropped turns are summarized once and the summary is extended incrementally."""
+    calls = []
+
+    def fake_summarize(previous, new_messages):
+        calls.append((previous, len(new_messages)))
+        return f"{previous or ''}[{len(new_messages)} turns]"
+
+    summarizer = RollingSummarizer(fake_summarize)
+    history = make_history(10)
+
+    # First request: nothing cached yet, the summary is built for the next one
+    messages, stats = build_history(history, budget=120, summarizer=summarizer)
+    dropped = stats["dropped_messages"]
+    assert dropped > 0 and stats["summary_tokens"] == 0
+    assert calls == [(None, dropped)]
+
+    # Same history again: the cached summary is used; only the turns it
+    # displaces are summarized, once
+    messages, stats = build_history(history, budget=120, summarizer=summarizer)
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].endswith(f"[{dropped} turns]")
+    assert stats["summarized_messages"] == dropped
+    assert stats["history_tokens"] + stats["summary_tokens"] <= 120
+    displaced = stats["dropped_messages"] - dropped
+    assert displaced > 0 and calls[1:] == [(f"[{dropped} turns]", displaced)]
+    build_history(history, budget=120, summarizer=summarizer)
+    assert len(calls) == 2
+
+    # The conversation continues: only the newly dropped turns are summarized
+    summarized = dropped + displaced
+    longer = history + make_history(13)[20:]
+    messages, stats = build_history(longer, budget=120, summarizer=summarizer)
+    assert len(calls) == 3
+    previous, new_count = calls[2]
+    assert previous == f"[{dropped} turns][{displaced} turns]"
+    assert new_count == stats["dropped_messages"] - summarized
+    print("✓ Rolling summary test passed")
+
+
+def test_displaced_turns_are_summarized():
+    """Test that turns the summary pushes out are summarized, so every turn is sent or summarized."""
+    summarized = []
+
+    def fake_summarize(previous, new_messages):
+        summarized.extend(m["content"] for m in new_messages)
+        return "x" * 120
+
+    summarizer = RollingSummarizer(fake_summarize)
+    history = make_history(10)
+    for _ in range(3):
+        messages, stats = build_history(history, budget=120, summarizer=summarizer)
+    sent = [m["content"] for m in messages if m["role"] != "system"]
+    assert stats["summary_tokens"] > 0
+    assert summarized + sent == [m["content"] for m in history]
+    assert stats["summarized_messages"] == len(summarized)
+    print("✓ Displaced turns summarized test passed")
+
+
+def test_summary_skipped_when_busy():
+    """Test that a summary the executor cannot start now is skipped and retried later."""
+    executor = LLMExecutor(max_in_flight=1, max_queued=4, queue_timeout=5)
+    release = threading.Event()
+    executor.submit(release.wait, 5)
+
+    summarizer = RollingSummarizer(lambda previous, new_messages: "summary", submit=executor.try_submit)
+    history = make_history(10)
+    start = time.perf_counter()
+    _, stats = build_history(history, budget=120, summarizer=summarizer)
+    assert time.perf_counter() - start < 1  # Never waits for a slot
+    assert stats["dropped_messages"] > 0
+    assert executor.stats()["rejected"] == 1
+
+    # Once a slot is free the next request starts the summary
+    release.set()
+    time.sleep(0.05)
+    build_history(history, budget=120, summarizer=summarizer)
+    time.sleep(0.05)
+    messages, stats = build_history(history, budget=120, summarizer=summarizer)
+    assert messages[0]["content"].endswith("summary")
+    executor.shutdown()
+    print("✓ Summary skipped when busy test passed")
+
+
+if __name__ == "__main__":
+    print("Running Prompt Budget Tests...")
+    print("=" * 60)
+
+    try:
+        test_token_counting()
+        test_budget_keeps_recent_turns()
+        test_rolling_summary()
+        test_displaced_turns_are_summarized()
+        test_summary_skipped_when_busy()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
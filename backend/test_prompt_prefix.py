@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test suite for prompt layout, usage accounting and the stub LLM server.
+
+Run with: pytest test_prompt_prefix.py -v
+Or: python test_prompt_prefix.py
+"""
+
+import sys
+
+from openai import OpenAI
+
+from llm_prompts import (ASSISTANT_SYSTEM_PROMPT, COMPOSER_SYSTEM_PROMPT, build_assistant_messages,
+                         build_composer_messages, duration_marker, encode_measure_tab,
+                         format_composition_for_gpt, prompt_cache_params)
+from llm_stub_server import CACHE_MIN_TOKENS, StubLLMServer, prompt_text
+from llm_usage import UsageTracker, estimate_cost, usage_counts
+from prompt_budget import count_tokens
+
+
+def make_composition(chord: str, fret: int) -> dict:
+    return {
+        "tempo": 90, "timeSignature": "4/4",
+        "measures": [{"chords": [{"name": chord, "time": 0}],
+                      "events": [{"time": 0, "string": 5, "fret": fret}]}]
+    }
+
+
+def test_static_prefix_first():
+    """Test that per-request data never appears before the static instructions."""
+    request = "Add a walking bass under measure 1"
+    first = build_composer_messages(format_composition_for_gpt(make_composition("C", 3)), request)
+    second = build_composer_messages(format_composition_for_gpt(make_composition("Am", 0)), "What key?")
+
+    assert first[0] == second[0] == {"role": "system", "content": COMPOSER_SYSTEM_PROMPT}
+    assert "M1" in first[1]["content"] and first[1]["content"].endswith(request)
+    assert "walking bass" not in first[0]["content"]
+    # prompt_cache_key only for prompts long enough to be cached; none are padded to qualify
+    assert count_tokens(ASSISTANT_SYSTEM_PROMPT) >= CACHE_MIN_TOKENS
+    assert prompt_cache_params("assistant", ASSISTANT_SYSTEM_PROMPT)["prompt_cache_key"].startswith("assistant-")
+    assert prompt_cache_params("composer", "Short prompt") == {}
+
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    messages = build_assistant_messages(history, "Show me a G chord")
+    assert messages[0] == {"role": "system", "content": ASSISTANT_SYSTEM_PROMPT}
+    assert messages[1:3] == history and messages[-1]["content"] == "Show me a G chord"
+
+    print("✓ Static prefix test passed")
+
+
+def test_compact_tab_encoding():
+    """Test the tab grid, duration markers, chords and finer grids."""
+    measure = {
+        "chords": [{"name": "C", "time": 0}, {"name": "G", "time": 0.5}],
+        "events": [
+            {"time": 0, "string": 5, "fret": 3, "duration": 0.25},
+            {"time": 0, "string": 2, "fret": 1, "duration": 0.25},
+            {"time": 0.25, "string": 3, "fret": 0, "duration": 0.125},
+            {"time": 0.375, "string": 6, "fret": 3, "duration": 0.125},
+            {"time": 0.5, "string": 6, "fret": 3, "duration": 0.375},
+            {"time": 0.5, "string": 2, "fret": 0, "duration": 0.25},
+            {"time": 0.75, "string": 3, "fret": 0, "duration": 0.125},
+            {"time": 0.875, "string": 1, "fret": 10, "duration": 0.125},
+        ]
+    }
+    assert encode_measure_tab(measure, 3) == "\n".join([
+        "M3 C@1 G@3",
+        "e|--------------10-|",
+        "B|1-------0--------|",
+        "G|----0-------0----|",
+        "D|-----------------|",
+        "A|3----------------|",
+        "E|------3-3--------|",
+        "  q   e e q   e e",
+    ])
+
+    assert duration_marker(0.75) == "h."
+    assert duration_marker(1 / 12) == "e3"
+    assert duration_marker(0.0625) == "s"
+
+    # Triplets switch to a finer grid; rests show as a marker over an empty column
+    triplets = {"timeSignature": "3/4", "events": [
+        {"time": 0, "string": None, "fret": None, "duration": 0.25, "isRest": True},
+        {"time": 0.25, "string": 1, "fret": 0, "duration": 1 / 12},
+        {"time": 0.25 + 1 / 12, "string": 1, "fret": 1, "duration": 1 / 12},
+        {"time": 0.25 + 2 / 12, "string": 1, "fret": 3, "duration": 1 / 12},
+        {"time": 0.5, "string": 1, "fret": 5, "duration": 0.25},
+    ]}
+    lines = encode_measure_tab(triplets, 2).splitlines()
+    assert lines[0] == "M2 (3/4) grid 1/24"
+    assert lines[1] == "e|------------0----1----3----5-----------|"
+    assert lines[7] == "  q           e3   e3   e3   q"
+    assert encode_measure_tab({"events": []}, 4) == "M4: empty"
+
+    print("✓ Compact tab encoding test passed")
+
+
+def test_measure_budget():
+    """Test that measures are added newest first until the token budget is used."""
+    composition = {"tempo": 90, "timeSignature": "4/4", "measures": [
+        make_composition(chord, fret)["measures"][0] for chord, fret in [("C", 3), ("Am", 0)] * 10
+    ]}
+    full = format_composition_for_gpt(composition, token_budget=None)
+    assert "M1 C@1" in full and "M20 Am@1" in full and "Showing" not in full
+
+    block_tokens = count_tokens(encode_measure_tab(composition["measures"][0], 1)) + 1
+    context = format_composition_for_gpt(composition, token_budget=40 + 5 * block_tokens)
+    assert context.startswith("Showing last ")
+    assert "M20 Am@1" in context and "M1 C@1" not in context
+    assert count_tokens(context) <= 40 + 5 * block_tokens
+
+    # At least one measure is always included
+    assert "M20" in format_composition_for_gpt(composition, token_budget=1)
+
+    region = format_composition_for_gpt(composition, {"start_measure": 2, "end_measure": 4})
+    assert region.startswith("Selected region: Measures 3 to 5")
+    assert "M3 C@1" in region and "M5 C@1" in region and "M6" not in region
+
+    print("✓ Measure budget test passed")
+
+
+def test_usage_tracker():
+    """Test cached token extraction and per-endpoint totals."""
+    usage = {"prompt_tokens": 2000, "completion_tokens": 100,
+             "prompt_tokens_details": {"cached_tokens": 1536}}
+    assert usage_counts(usage) == {"prompt_tokens": 2000, "cached_tokens": 1536, "completion_tokens": 100}
+    assert usage_counts(None) == {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+    # Cached tokens are billed at the cached rate
+    assert estimate_cost("gpt-4o", 2000, 1536, 100) < estimate_cost("gpt-4o", 2000, 0, 100)
+    assert estimate_cost("unknown-model", 2000, 0, 100) == 0.0
+
+    tracker = UsageTracker()
+    tracker.record("composer", "gpt-4o", usage, latency_seconds=0.5)
+    tracker.record("composer", "gpt-4o", {"prompt_tokens": 2000, "completion_tokens": 100},
+                   latency_seconds=1.5)
+    stats = tracker.stats()["composer"]
+    assert stats["calls"] == 2
+    assert stats["cached_tokens"] == 1536
+    assert stats["cached_ratio"] == round(1536 / 4000, 3)
+    assert stats["mean_latency_ms"] == 1000.0
+
+    print("✓ Usage tracker test passed")
+
+
+def test_stub_prefix_cache():
+    """Test that the stub reports cached tokens only for a repeated 1024+ token prefix."""
+    stub = StubLLMServer(base_latency=0, prefill_seconds_per_token=0, cached_seconds_per_token=0,
+                         output_seconds_per_token=0, completion_tokens=20).start()
+    try:
+        client = OpenAI(base_url=stub.base_url, api_key="stub", max_retries=0)
+        counts = []
+        for chord in ("C", "Am"):
+            messages = build_assistant_messages([], f"Show me {chord}")
+            response = client.chat.completions.create(model="gpt-4o", messages=messages,
+                                                      **prompt_cache_params("assistant", ASSISTANT_SYSTEM_PROMPT))
+            counts.append(usage_counts(response.usage))
+            assert response.choices[0].message.content.startswith('{"chat_response"')
+
+        assert counts[0]["cached_tokens"] == 0
+        assert CACHE_MIN_TOKENS <= counts[1]["cached_tokens"] <= count_tokens(prompt_text(messages[:1]))
+
+        # A short prompt is never cached
+        short = [{"role": "user", "content": "hi"}]
+        for _ in range(2):
+            response = client.chat.completions.create(model="gpt-4o", messages=short)
+        assert usage_counts(response.usage)["cached_tokens"] == 0
+
+        # Streaming reports usage in a final chunk when asked
+        stream = client.chat.completions.create(model="gpt-4o", messages=messages, stream=True,
+                                                stream_options={"include_usage": True})
+        text, usage = "", None
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                text += chunk.choices[0].delta.content
+            if chunk.usage:
+                usage = chunk.usage
+        assert text.startswith('{"chat_response"')
+        assert usage_counts(usage)["cached_tokens"] >= CACHE_MIN_TOKENS
+        assert stub.requests == 5
+    finally:
+        stub.stop()
+
+    print("✓ Stub prefix cache test passed")
+
+
+if __name__ == "__main__":
+    print("Running Prompt Prefix Tests...")
+    print("=" * 60)
+
+    try:
+        test_static_prefix_first()
+        test_compact_tab_encoding()
+        test_measure_budget()
+        test_usage_tracker()
+        test_stub_prefix_cache()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test suite for OMR scratch storage.
+
+Run with: pytest test_scratch_storage.py -v
+Or: python test_scratch_storage.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from scratch_storage import ScratchSpace
+
+
+def write_bytes(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return path
+
+
+def test_budget_spills_to_disk():
+    """Test that tmpfs-mode files past the budget are moved to a disk directory."""
+    fake_tmpfs = tempfile.mkdtemp(prefix="test_scratch_tmpfs_")
+    scratch = ScratchSpace("job1", mode="tmpfs", base_dir=fake_tmpfs, budget_mb=1)
+    try:
+        assert scratch.mode == "tmpfs"
+        assert scratch.path.startswith(fake_tmpfs)
+
+        first = scratch.keep(write_bytes(os.path.join(scratch.path, "page_1.png"), 600 * 1024))
+        assert first == os.path.join(scratch.path, "page_1.png")
+
+        pages = scratch.subdir("preprocessed")
+        second = scratch.keep(write_bytes(os.path.join(pages, "page_2.png"), 600 * 1024))
+        assert not second.startswith(fake_tmpfs)
+        assert second.endswith(os.path.join("preprocessed", "page_2.png"))
+        assert os.path.getsize(second) == 600 * 1024
+        assert not os.path.exists(os.path.join(pages, "page_2.png"))
+
+        info = scratch.describe()
+        assert info["mode"] == "tmpfs"
+        assert info["budget_mb"] == 1.0
+        assert info["spilled_files"] == 1
+        assert info["used_mb"] == round(600 / 1024, 2)
+
+        scratch.cleanup()
+        assert not os.path.exists(scratch.path)
+        assert not os.path.exists(os.path.dirname(os.path.dirname(second)))
+        print("✓ Budget spill test passed")
+    finally:
+        scratch.cleanup()
+        shutil.rmtree(fake_tmpfs, ignore_errors=True)
+
+
+def test_place_and_release():
+    """Test that the destination is chosen before writing and deletes free budget."""
+    fake_tmpfs = tempfile.mkdtemp(prefix="test_scratch_tmpfs_")
+    scratch = ScratchSpace("job5", mode="tmpfs", base_dir=fake_tmpfs, budget_mb=1)
+    try:
+        # The estimate is reserved, then replaced by the real size
+        first = scratch.place(os.path.join(scratch.path, "page_1.png"), 800 * 1024)
+        assert first.startswith(scratch.path) and scratch.used_bytes == 800 * 1024
+        assert scratch.keep(write_bytes(first, 100 * 1024)) == first
+        assert scratch.used_bytes == 100 * 1024
+
+        # Past the budget the file is sent to disk before anything is written
+        big = scratch.place(os.path.join(scratch.path, "pages", "page_2.png"), 1000 * 1024)
+        assert not big.startswith(fake_tmpfs) and big.endswith(os.path.join("pages", "page_2.png"))
+        assert scratch.keep(write_bytes(big, 1000 * 1024)) == big
+        assert scratch.used_bytes == 100 * 1024 and scratch.spilled_files == 1
+
+        # Variants derived from a spilled file come back to tmpfs when they fit
+        variant = scratch.place(big.replace(".png", "_contrast.png"), 200 * 1024)
+        assert variant == os.path.join(scratch.path, "pages", "page_2_contrast.png")
+        scratch.keep(write_bytes(variant, 200 * 1024))
+
+        # Deleting files returns their bytes; spilled files were never counted
+        for path in (first, big, variant):
+            scratch.release(path)
+            assert not os.path.exists(path)
+        info = scratch.describe()
+        assert scratch.used_bytes == 0 and info["used_mb"] == 0
+        assert info["peak_mb"] == round(800 / 1024, 2)
+        print("✓ Place and release test passed")
+    finally:
+        scratch.cleanup()
+        shutil.rmtree(fake_tmpfs, ignore_errors=True)
+
+
+def test_modes_and_import():
+    """Test disk fallback, mode validation and hardlinked imports."""
+    scratch = ScratchSpace("job2", mode="tmpfs", base_dir="/nonexistent/shm")
+    try:
+        info = scratch.describe()
+        assert info["mode"] == "disk"
+        assert info["requested_mode"] == "tmpfs"
+    finally:
+        scratch.cleanup()
+
+    try:
+        ScratchSpace("job3", mode="ramdisk")
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    # Upload and scratch on the same filesystem: the input is hardlinked, not copied
+    root = tempfile.mkdtemp(prefix="test_scratch_")
+    try:
+        upload = write_bytes(os.path.join(root, "scan.png"), 1024)
+        scratch = ScratchSpace("job4", mode="disk", base_dir=root)
+        imported = scratch.import_file(upload)
+        assert scratch.import_method == "hardlink"
+        assert os.stat(imported).st_ino == os.stat(upload).st_ino
+        assert scratch.describe()["import"] == "hardlink"
+        scratch.cleanup()
+        assert os.path.exists(upload)
+        print("✓ Modes and import test passed")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running Scratch Storage Tests...")
+    print("=" * 60)
+
+    try:
+        test_budget_spills_to_disk()
+        test_place_and_release()
+        test_modes_and_import()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
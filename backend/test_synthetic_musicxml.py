@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test suite for the synthetic MusicXML generator and benchmark regression check.
+
+Run with: pytest test_synthetic_musicxml.py -v
+Or: python test_synthetic_musicxml.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from bench_converter import compare_with_baseline
+from musicxml_to_tab import convert_musicxml_to_columns
+from synthetic_musicxml import generate_musicxml, write_synthetic_score
+
+
+def test_generated_scores_convert_cleanly():
+    """Test that generated scores are well-formed and every measure is full."""
+    test_dir = tempfile.mkdtemp(prefix="test_synthetic_")
+    try:
+        cases = [
+            {"measures": 12, "voices": 1, "chord_size": 1, "divisions": 2},
+            {"measures": 12, "voices": 3, "chord_size": 3, "divisions": 12},
+            {"measures": 12, "voices": 2, "chord_size": 2, "divisions": 24, "time_signature": "6/8"},
+        ]
+        for i, params in enumerate(cases):
+            path = write_synthetic_score(os.path.join(test_dir, f"case_{i}.musicxml"),
+                                         rest_probability=0.0, **params)
+            composition = convert_musicxml_to_columns(path)
+
+            assert composition.num_measures == params["measures"]
+            assert composition.validation_issues() == [], f"Case {i} has validation issues"
+            assert len(composition) >= params["measures"] * params["voices"]
+        print("✓ Generated scores convert cleanly")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def test_generator_is_deterministic():
+    """Test that the same seed produces the same document."""
+    assert generate_musicxml(measures=8, seed=3) == generate_musicxml(measures=8, seed=3)
+    assert generate_musicxml(measures=8, seed=3) != generate_musicxml(measures=8, seed=4)
+    print("✓ Generator determinism test passed")
+
+
+def test_compare_with_baseline():
+    """Test regression detection against stored baselines."""
+    def result(notes, notes_per_second):
+        return {"notes": notes, "stages": {"convert": {"notes_per_second": notes_per_second}}}
+
+    baseline = {"case": result(100, 1000.0)}
+    assert compare_with_baseline({"case": result(100, 900.0)}, baseline) == []
+    assert len(compare_with_baseline({"case": result(100, 500.0)}, baseline)) == 1
+    assert len(compare_with_baseline({"case": result(99, 1000.0)}, baseline)) == 1
+    assert compare_with_baseline({"new_case": result(1, 1.0)}, baseline) == []
+    print("✓ Baseline comparison test passed")
+
+
+if __name__ == "__main__":
+    print("Running Synthetic MusicXML Tests...")
+    print("=" * 60)
+
+    try:
+        test_generated_scores_convert_cleanly()
+        test_generator_is_deterministic()
+        test_compare_with_baseline()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
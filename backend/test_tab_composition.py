@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test suite for the array-backed TabComposition.
+
+Run with: pytest test_tab_composition.py -v
+Or: python test_tab_composition.py
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from tab_composition import TabComposition, StreamingCompositionWriter
+from musicxml_to_tab import merge_compositions
+
+
+def build_page(title: str, ticks_per_whole: int, short_last_measure: bool = False) -> TabComposition:
+    """Build a two-measure 4/4 page of quarter notes."""
+    quarter = ticks_per_whole // 4
+    tab = TabComposition(title, 96, "4/4", ticks_per_whole)
+    for measure in range(2):
+        index = tab.add_measure("4/4", [(0, "C")])
+        beats = 2 if short_last_measure and measure == 1 else 4
+        for beat in range(beats):
+            tab.add_event(beat * quarter, 1 + beat, beat, quarter)
+        if beats != 4:
+            tab.add_warning(index, {"type": "incorrect_beat_count", "message": "short"})
+    return tab
+
+
+def test_to_dict_shape():
+    """Test that lazy conversion produces the TabComposition dict shape."""
+    tab = build_page("Page", 8)
+    composition = tab.to_dict()
+
+    assert list(composition.keys()) == ["title", "tempo", "timeSignature", "measures", "version"]
+    assert len(composition["measures"]) == 2
+    assert composition["measures"][0]["events"][1] == {
+        "time": 0.25, "string": 2, "fret": 1, "duration": 0.25, "leftFinger": None
+    }
+    assert composition["measures"][0]["chords"] == [{"time": 0.0, "name": "C"}]
+    print("✓ to_dict shape test passed")
+
+
+def test_write_json_matches_to_dict():
+    """Test that streaming serialization equals json.dumps of to_dict()."""
+    tab = build_page("Page", 8, short_last_measure=True)
+    tab.metadata["_processing"] = {"pages_total": 1}
+
+    buffer = io.StringIO()
+    tab.write_json(buffer)
+
+    assert buffer.getvalue() == json.dumps(tab.to_dict())
+    assert json.loads(buffer.getvalue())["_validation"]["issue_count"] == 1
+    print("✓ write_json test passed")
+
+
+def test_concatenate_rescales_and_renumbers():
+    """Test merging pages with different tick resolutions."""
+    first = build_page("Song_page_1", 4)
+    second = build_page("Song_page_2", 12, short_last_measure=True)
+
+    merged = merge_compositions([first, second])
+
+    assert isinstance(merged, TabComposition)
+    assert merged.ticks_per_whole == 12
+    assert merged.num_measures == 4
+    assert len(merged) == 4 + 4 + 4 + 2
+    assert list(merged.measure_index) == [0] * 4 + [1] * 4 + [2] * 4 + [3] * 2
+
+    issues = merged.validation_issues()
+    assert [issue["measure_number"] for issue in issues] == [4]
+
+    # Same musical content regardless of the original resolution
+    merged_dict = merged.to_dict()
+    assert merged_dict["measures"][0] == merged_dict["measures"][2]
+    assert merged_dict["title"] == "Song_page_1"
+    print("✓ Concatenate test passed")
+
+
+def test_columns_are_smaller_than_dicts():
+    """Test that columns hold events in far fewer bytes than dicts."""
+    tab = TabComposition("Big", 120, "4/4", 16)
+    for measure in range(500):
+        tab.add_measure("4/4")
+        for i in range(16):
+            tab.add_event(i, 1 + i % 6, i % 12, 1)
+
+    # 14 bytes/event (times, durations, measure index, string, fret) + measure starts
+    assert tab.nbytes() == len(tab) * 14 + tab.num_measures * 4
+    print(f"✓ Column memory test passed ({tab.nbytes() / len(tab):.1f} bytes/event)")
+
+
+def test_streaming_writer():
+    """Test that pages streamed to disk match an in-memory merge."""
+    test_dir = tempfile.mkdtemp(prefix="test_tab_stream_")
+    try:
+        pages = [build_page("Song_page_1", 4, short_last_measure=True),
+                 build_page("Song_page_2", 12),
+                 build_page("Song_page_3", 8, short_last_measure=True)]
+
+        path = os.path.join(test_dir, "composition.json")
+        writer = StreamingCompositionWriter(path)
+        for page in pages:
+            writer.add_page(page)
+        writer.metadata["_processing"] = {"pages_total": 3}
+        handle = writer.close()
+
+        assert not os.path.exists(path + ".partial")
+        assert (handle.measures, handle.notes, handle.title) == (6, 20, "Song_page_1")
+
+        expected = TabComposition.concatenate(pages)
+        expected.metadata["_processing"] = {"pages_total": 3}
+        streamed = handle.load()
+        assert streamed == expected.to_dict()
+        assert [issue["measure_number"] for issue in streamed["_validation"]["issues"]] == [2, 6]
+
+        # Aborting leaves nothing behind
+        aborted = StreamingCompositionWriter(os.path.join(test_dir, "aborted.json"))
+        aborted.add_page(pages[0])
+        aborted.abort()
+        assert os.listdir(test_dir) == ["composition.json"]
+        print("✓ Streaming writer test passed")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("Running TabComposition Tests...")
+    print("=" * 60)
+
+    try:
+        test_to_dict_shape()
+        test_write_json_matches_to_dict()
+        test_concatenate_rescales_and_renumbers()
+        test_columns_are_smaller_than_dicts()
+        test_streaming_writer()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
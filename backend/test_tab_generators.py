@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test suite for the composer tab_additions generators.
+
+Run with: pytest test_tab_generators.py -v
+Or: python test_tab_generators.py
+"""
+
+import sys
+from fractions import Fraction
+
+from tab_generators import (
+    GENERATORS, chord_segments, is_valid_addition, parse_chord_name, route_request, suggest_locally
+)
+
+
+def make_composition(chords, time_signature="4/4"):
+    """One measure per entry; an entry is a chord name or a list of (time, name)."""
+    measures = []
+    for entry in chords:
+        if isinstance(entry, str):
+            entry = [(0, entry)] if entry else []
+        measures.append({"chords": [{"name": name, "time": time} for time, name in entry], "events": []})
+    return {"timeSignature": time_signature, "measures": measures}
+
+
+def apply_like_composer(additions, measure_length):
+    """
+    Place notes the way composer.js applyTabAdditions does: group by time,
+    advance by the first note's duration, wrap into the next measure.
+
+    Returns:
+        [(measure, time in measure, note)]
+    """
+    times = sorted({note["time"] for note in additions})
+    placed = []
+    current_time, current_measure = 0.0, 0
+    for time in times:
+        group = [note for note in additions if note["time"] == time]
+        for note in group:
+            placed.append((current_measure, current_time, note))
+        current_time += group[0]["duration"]
+        if current_time >= measure_length - 1e-9:
+            current_time -= measure_length
+            current_measure += 1
+    return placed
+
+
+def test_routing():
+    """Test that requests map to generators and everything else goes to the LLM."""
+    assert route_request("Add a bass line") == ("root_fifth_bass", {})
+    assert route_request("root-fifth bass please")[0] == "root_fifth_bass"
+    assert route_request("Add a walking bass line")[0] == "walking_bass"
+    assert route_request("Travis picking over these chords")[0] == "travis"
+    assert route_request("Arpeggiate these chords") == ("arpeggio", {})
+    assert route_request("descending arpeggio in sixteenths") == \
+        ("arpeggio", {"direction": "down", "step": Fraction(1, 16)})
+    assert route_request("Can you give me a bass part?")[0] == "root_fifth_bass"
+
+    assert route_request("Why does this bass line work?") is None
+    assert route_request("Add a funky bass line") is None
+    assert route_request("Continue this melody") is None
+    # Edits, negations and modifiers the generators ignore
+    for message in ("Make the bass line more interesting",
+                    "Remove the bass line",
+                    "don't add a bass line, add strums",
+                    "Add a bass line an octave higher",
+                    "Add a bass line with eighth notes",
+                    "add some bass notes to measure 3",
+                    "arpeggio in triplets"):
+        assert route_request(message) is None, message
+    assert route_request("") is None
+
+    print("✓ Routing test passed")
+
+
+def test_chord_segments():
+    """Test chord parsing, changes inside measures and carried chords."""
+    assert parse_chord_name("C/G") == (0, "", 7)
+    assert parse_chord_name("F#m7") == (6, "m7", 6)
+    assert parse_chord_name("Cdim") is None
+    assert parse_chord_name("Fsus2") is None  # No grip for it
+
+    composition = make_composition(["C", [(0, "Am"), (0.5, "F")], "", "G7", ""])
+    segments = chord_segments(composition)
+    # Trailing measures without chords are left out; the empty measure keeps F
+    assert [(s["name"], s["measure_offset"], float(s["start"]), float(s["end"])) for s in segments] == [
+        ("C", 0, 0, 1), ("Am", 1, 0, 0.5), ("F", 1, 0.5, 1), ("F", 2, 0, 1), ("G7", 3, 0, 1)
+    ]
+
+    # A region starting after a chord change carries that chord
+    region = chord_segments(composition, {"start_measure": 2, "end_measure": 3})
+    assert [(s["name"], s["measure_offset"]) for s in region] == [("F", 0), ("G7", 1)]
+
+    assert chord_segments(make_composition(["", ""])) is None
+    assert chord_segments(make_composition(["C", "Cdim"])) is None
+
+    print("✓ Chord segments test passed")
+
+
+def test_generated_notes_fill_measures():
+    """Test that every generator fills each measure exactly with valid notes."""
+    for time_signature, length in (("4/4", 1.0), ("3/4", 0.75), ("6/8", 0.75)):
+        composition = make_composition(["C", [(0, "Am"), (0.375, "F")], "G7", "C/E"], time_signature)
+        segments = chord_segments(composition)
+        for name, generate in GENERATORS.items():
+            answer = suggest_locally({"arpeggio": "arpeggio", "root_fifth_bass": "add a bass line",
+                                      "travis": "travis", "walking_bass": "walking bass"}[name], composition)
+            assert answer is not None, name
+            additions = answer["tab_additions"]
+            assert all(is_valid_addition(note) for note in additions), name
+
+            for measure, time, note in apply_like_composer(additions, length):
+                assert measure == note["measure_offset"], (name, time_signature, note)
+                assert abs(time - (note["time"] - measure * length)) < 1e-9, (name, time_signature, note)
+            assert len(generate(segments)) == len(additions)
+
+    print("✓ Measure filling test passed")
+
+
+def test_bass_lines():
+    """Test root-fifth and walking bass note choices."""
+    composition = make_composition(["C", "G", "C/E"])
+    root_fifth = suggest_locally("Add a bass line", composition)["tab_additions"]
+    assert [(n["string"], n["fret"]) for n in root_fifth[:4]] == [(5, 3), (6, 3), (5, 3), (6, 3)]
+    # Slash chords put their bass note on the beat
+    assert (root_fifth[8]["string"], root_fifth[8]["fret"]) == (6, 0)
+    assert all(n["duration"] == 0.25 for n in root_fifth)
+
+    walking = suggest_locally("walking bass", make_composition(["C", "Am", "F", "G7"]))["tab_additions"]
+    assert len(walking) == 16
+    midi = {6: 40, 5: 45, 4: 50}
+    pitches = [midi[n["string"]] + n["fret"] for n in walking]
+    # Each chord starts on its root and is approached chromatically
+    for measure, root_pc in enumerate((0, 9, 5, 7)):
+        assert pitches[measure * 4] % 12 == root_pc
+        assert abs(pitches[measure * 4 - 1] - pitches[measure * 4]) == 1
+
+    print("✓ Bass lines test passed")
+
+
+def test_travis_and_arpeggio():
+    """Test the Travis thumb/pinch layout and arpeggio directions."""
+    additions = suggest_locally("travis picking", make_composition(["C"]))["tab_additions"]
+    by_time = {}
+    for note in additions:
+        by_time.setdefault(note["time"], []).append((note["string"], note["fret"]))
+    assert by_time[0.0] == [(5, 3), (1, 0)]   # Pinch on beat 1
+    assert by_time[0.25] == [(4, 2)]          # Alternating thumb
+    assert by_time[0.5] == [(5, 3)]
+    assert all(strings[0][0] <= 3 for time, strings in by_time.items() if (time / 0.125) % 2 == 1)
+
+    up = suggest_locally("ascending arpeggio", make_composition(["Am"]))["tab_additions"]
+    assert [n["string"] for n in up] == [5, 4, 3, 2, 1, 5, 4, 3]
+    down = suggest_locally("descending arpeggio in quarter notes", make_composition(["Am"]))["tab_additions"]
+    assert [n["string"] for n in down] == [1, 2, 3, 4]
+    assert all(n["duration"] == 0.25 for n in down)
+
+    assert suggest_locally("arpeggio", {"measures": []}) is None
+    assert suggest_locally("What key is this in?", make_composition(["C"])) is None
+
+    print("✓ Travis and arpeggio test passed")
+
+
+if __name__ == "__main__":
+    print("Running Tab Generator Tests...")
+    print("=" * 60)
+
+    try:
+        test_routing()
+        test_chord_segments()
+        test_generated_notes_fill_measures()
+        test_bass_lines()
+        test_travis_and_arpeggio()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compact TabComposition wire format.
+
+Run with: pytest test_tab_wire.py -v
+Or: python test_tab_wire.py
+"""
+
+import json
+import sys
+
+from tab_composition import TabComposition
+from tab_wire import encode_compact, decode_compact, wants_compact, COMPACT_MIME_TYPE
+
+
+def build_converter_output() -> dict:
+    """Build a composition shaped like convert_musicxml_to_tab() output."""
+    tab = TabComposition("Etude", 100, "3/4", 24)
+    for measure in range(12):
+        index = tab.add_measure("3/4", [(0, "Am")])
+        for i in range(6):
+            tab.add_event(i * 2, 1 + i % 6, (measure + i) % 5, 2)  # triplet eighths
+        tab.add_event(12, 6, 0, 6)
+        if measure == 11:
+            tab.add_warning(index, {"type": "incorrect_beat_count", "message": "short"})
+    tab.metadata["_processing"] = {"pages_total": 2, "pages_processed": 2, "failed_pages": []}
+    return tab.to_dict()
+
+
+def test_roundtrip_converter_output():
+    """Test that decode(encode(c)) == c for converter output."""
+    composition = build_converter_output()
+    encoded = encode_compact(composition)
+
+    assert "t" in encoded["measures"][0]
+    assert "lf" not in encoded["measures"][0]
+    assert len(encoded["durations"]) == 2
+    assert decode_compact(json.loads(json.dumps(encoded))) == composition
+    print("✓ Converter output round-trip test passed")
+
+
+def test_roundtrip_editor_composition():
+    """Test rests, left-hand fingers and non-tick times from the editor."""
+    composition = {
+        "title": "Shared",
+        "tempo": 90,
+        "timeSignature": "4/4",
+        "measures": [{
+            "timeSignature": "4/4",
+            "events": [
+                {"time": 0, "string": 5, "fret": 3, "duration": 0.25, "leftFinger": 3},
+                {"time": 0.25, "string": None, "fret": None, "duration": 0.25,
+                 "leftFinger": None, "isRest": True},
+                {"time": 0.123456789, "string": 2, "fret": 1, "duration": 0.5, "leftFinger": 1},
+            ],
+            "chords": []
+        }],
+        "version": "1.0"
+    }
+
+    encoded = encode_compact(composition)
+    assert "ta" in encoded["measures"][0]  # 0.123456789 is not an exact tick
+    assert encoded["measures"][0]["x"] == {"1": {"isRest": True}}
+    assert decode_compact(encoded) == composition
+    print("✓ Editor composition round-trip test passed")
+
+
+def test_compact_is_smaller():
+    """Test that the compact encoding is substantially smaller."""
+    composition = build_converter_output()
+    verbose = json.dumps(composition, separators=(',', ':'))
+    compact = json.dumps(encode_compact(composition), separators=(',', ':'))
+    assert len(compact) * 2 < len(verbose), f"{len(compact)} vs {len(verbose)}"
+    print(f"✓ Size test passed ({len(verbose)} -> {len(compact)} bytes)")
+
+
+def test_negotiation():
+    """Test Accept header and query flag negotiation."""
+    assert wants_compact(None, "compact")
+    assert wants_compact(f"{COMPACT_MIME_TYPE}, application/json;q=0.5", None)
+    assert not wants_compact("application/json", None)
+    assert not wants_compact(None, None)
+    print("✓ Negotiation test passed")
+
+
+if __name__ == "__main__":
+    print("Running Compact Wire Format Tests...")
+    print("=" * 60)
+
+    try:
+        test_roundtrip_converter_output()
+        test_roundtrip_editor_composition()
+        test_compact_is_smaller()
+        test_negotiation()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
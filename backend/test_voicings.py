@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test suite for the chord voicing index.
+
+Run with: pytest test_voicings.py -v
+Or: python test_voicings.py
+"""
+
+import sys
+
+from musicxml_to_tab import assign_chord_positions
+from voicings import MAX_STRETCH, VOICING_INDEX, chord_grips, lookup_voicing
+
+
+def test_open_chords_resolve_to_grips():
+    """Full open chords come back as their standard grips."""
+    # Open C: x32010 (MIDI numbers follow the converter's tuning table)
+    voicing = lookup_voicing([48, 52, 55, 60, 64])
+    assert voicing == ((1, 0, 64), (2, 1, 60), (3, 0, 55), (4, 2, 52), (5, 3, 48))
+
+    # Open E: 022100, notes given in any order
+    voicing = lookup_voicing([64, 40, 59, 47, 56, 52])
+    assert [(s, f) for s, f, _ in voicing] == [(1, 0), (2, 0), (3, 1), (4, 2), (5, 2), (6, 0)]
+    print("✓ Open chord lookup test passed")
+
+
+def test_partial_and_barre_voicings():
+    """Sub-voicings and movable shapes are indexed; unknown chords miss."""
+    # Bass C on string 5 plus E and C on top: subset of the open C grip
+    voicing = lookup_voicing([48, 60, 64])
+    assert [(s, f) for s, f, _ in voicing] == [(1, 0), (2, 1), (5, 3)]
+
+    # B minor barre (A shape at fret 2): x24432
+    voicing = lookup_voicing([47, 54, 59, 62, 66])
+    assert [(s, f) for s, f, _ in voicing] == [(1, 2), (2, 3), (3, 4), (4, 4), (5, 2)]
+
+    # Every indexed voicing sounds exactly its key notes and is playable
+    for (pitch_classes, bass), bucket in VOICING_INDEX.items():
+        for midi, voicing in bucket.items():
+            assert tuple(sorted(n for _, _, n in voicing)) == midi
+            assert len({s for s, _, _ in voicing}) == len(voicing)
+            fretted = [f for _, f, _ in voicing if f > 0]
+            assert not fretted or max(fretted) - min(fretted) <= MAX_STRETCH
+
+    # A cluster no shape contains is a miss
+    assert lookup_voicing([60, 61, 62]) is None
+    assert lookup_voicing([60]) is None
+    print("✓ Partial and barre voicing test passed")
+
+
+def test_assign_chord_positions_uses_index():
+    """Recognized chords use the indexed grip, misses fall back to greedy search."""
+    positions = assign_chord_positions([40, 47, 52, 55, 59, 64])  # Open E minor
+    assert sorted((s, f) for _, s, f in positions) == [(1, 0), (2, 0), (3, 0), (4, 2), (5, 2), (6, 0)]
+
+    positions = assign_chord_positions([60, 61, 62])
+    assert len(positions) == 3
+    assert len({s for _, s, _ in positions}) == 3
+
+    grips = chord_grips(7, "")  # G major, open grip first
+    assert grips[0] == [(6, 3), (5, 2), (4, 0), (3, 0), (2, 0), (1, 3)]
+    assert len(grips) == len({tuple(g) for g in grips})
+    print("✓ Chord position assignment test passed")
+
+
+if __name__ == "__main__":
+    print("Running Voicing Index Tests...")
+    print("=" * 60)
+
+    try:
+        test_open_chords_resolve_to_grips()
+        test_partial_and_barre_voicings()
+        test_assign_chord_positions_uses_index()
+
+        print("=" * 60)
+        print("All tests passed! ✓")
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
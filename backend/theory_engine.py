@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Local Theory Engine
+
+Answers the most common assistant lookups without calling the LLM:
+
+- scales:        "A minor pentatonic", "C major scale", "D dorian"
+- chords:        "Show me Cmaj7", "How do I play F#m?", "G7 chord"
+- arpeggios:     "Am arpeggio", "arpeggio for Dmaj7"
+- progressions:  "2-5-1 in C major", "I-V-vi-IV in G", "ii-V-i in A minor"
+
+Responses use the same JSON shape system_prompt.txt asks gpt-4o for
+(chat_response, fretboard_sequence, tab_display, additional_notes), built from
+the scale tables below and the chord grips in voicings.py. answer_locally()
+returns None for anything it does not recognize (or that asks for an
+explanation rather than a lookup), and the caller falls back to the LLM.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from voicings import GUITAR_TUNING, QUALITY_INTERVALS, chord_grips
+
+NOTE_NAMES_SHARP = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+NOTE_NAMES_FLAT = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+NATURAL_PCS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+LETTERS = "CDEFGAB"
+
+# Scale degree (1-7) of an interval in chords and non-heptatonic scales:
+# 3 and 4 are thirds, 10 and 11 sevenths, and 6 the blues b5 (not #4)
+INTERVAL_DEGREES = {0: 1, 1: 2, 2: 2, 3: 3, 4: 3, 5: 4, 6: 5, 7: 5, 8: 6, 9: 6, 10: 7, 11: 7}
+
+# Tab line labels, string 1 (high e) first
+STRING_LABELS = {1: "e", 2: "B", 3: "G", 4: "D", 5: "A", 6: "E"}
+
+# Scale name -> intervals above the root
+SCALES = {
+    "major": (0, 2, 4, 5, 7, 9, 11),
+    "natural minor": (0, 2, 3, 5, 7, 8, 10),
+    "harmonic minor": (0, 2, 3, 5, 7, 8, 11),
+    "melodic minor": (0, 2, 3, 5, 7, 9, 11),
+    "major pentatonic": (0, 2, 4, 7, 9),
+    "minor pentatonic": (0, 3, 5, 7, 10),
+    "blues": (0, 3, 5, 6, 7, 10),
+    "dorian": (0, 2, 3, 5, 7, 9, 10),
+    "phrygian": (0, 1, 3, 5, 7, 8, 10),
+    "lydian": (0, 2, 4, 6, 7, 9, 11),
+    "mixolydian": (0, 2, 4, 5, 7, 9, 10),
+    "locrian": (0, 1, 3, 5, 6, 8, 10),
+}
+
+# Scales spelled like their minor key (flats vs sharps)
+MINOR_SCALES = {"natural minor", "harmonic minor", "melodic minor", "minor pentatonic", "blues",
+                "dorian", "phrygian", "locrian"}
+
+# Alternate names -> SCALES key. Names marked False need the word "scale"
+# after them ("C major" alone is a chord, "C major scale" a scale).
+SCALE_ALIASES = {
+    "major": ("major", False), "ionian": ("major", True),
+    "minor": ("natural minor", False), "natural minor": ("natural minor", True),
+    "aeolian": ("natural minor", True),
+    "harmonic minor": ("harmonic minor", True), "melodic minor": ("melodic minor", True),
+    "major pentatonic": ("major pentatonic", True), "minor pentatonic": ("minor pentatonic", True),
+    "pentatonic": ("major pentatonic", False),
+    "blues": ("blues", False), "minor blues": ("blues", True),
+    "dorian": ("dorian", True), "phrygian": ("phrygian", True), "lydian": ("lydian", True),
+    "mixolydian": ("mixolydian", True), "locrian": ("locrian", True),
+}
+
+# Chord quality spellings -> voicings.QUALITY_INTERVALS key
+QUALITY_SYMBOLS = {
+    "": "", "maj": "", "major": "",
+    "m": "m", "min": "m", "minor": "m",
+    "7": "7", "dom7": "7", "dominant 7": "7", "dominant 7th": "7", "dominant seventh": "7",
+    "m7": "m7", "min7": "m7", "minor 7": "m7", "minor 7th": "m7", "minor seventh": "m7",
+    "maj7": "maj7", "M7": "maj7", "major 7": "maj7", "major 7th": "maj7", "major seventh": "maj7",
+    "sus2": "sus2", "sus4": "sus4", "5": "5", "power chord": "5",
+}
+
+QUALITY_DESCRIPTIONS = {
+    "": "major triad (root, major 3rd, 5th)",
+    "m": "minor triad (root, minor 3rd, 5th)",
+    "7": "dominant 7th chord (root, major 3rd, 5th, minor 7th)",
+    "m7": "minor 7th chord (root, minor 3rd, 5th, minor 7th)",
+    "maj7": "major 7th chord (root, major 3rd, 5th, major 7th)",
+    "sus2": "suspended 2nd chord (root, 2nd, 5th)",
+    "sus4": "suspended 4th chord (root, 4th, 5th)",
+    "5": "power chord (root and 5th)",
+}
+
+# Diatonic chord qualities per scale degree (None = diminished, not in voicings.py)
+DIATONIC_TRIADS = {
+    "major": ["", "m", "m", "", "", "m", None],
+    "minor": ["m", None, "", "m", "m", "", ""],
+}
+DIATONIC_SEVENTHS = {
+    "major": ["maj7", "m7", "m7", "maj7", "7", "m7", None],
+    "minor": ["m7", None, "maj7", "m7", "m7", "maj7", "7"],
+}
+KEY_SCALES = {"major": SCALES["major"], "minor": SCALES["natural minor"]}
+
+ROMAN_DEGREES = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7}
+ROMAN_NUMERALS = ["I", "II", "III", "IV", "V", "VI", "VII"]
+
+# Major keys spelled with flats (minor keys: relative major's pitch class)
+FLAT_KEY_PCS = {5, 10, 3, 8, 1, 6}
+
+# Frets spanned by a scale position box
+SCALE_BOX_FRETS = 5
+
+# Beats per scale note and per progression chord
+SCALE_NOTE_BEATS = 1
+CHORD_BEATS = 4
+
+# Requests that ask for explanation or technique rather than a lookup go to the LLM
+DEFER_RE = re.compile(
+    r"\b(why|explain|difference|differ|compare|versus|vs\.?|song|songs|solo|solos|improvis\w*|"
+    r"travis|strum\w*|fingerpick\w*|technique|practice|exercise\w*|history|which|"
+    r"over|substitut\w*|transpos\w*|write|compose|melody|riff|lick|"
+    r"position\w*|capo|tun(?:e|ed|ing)|drop|octaves?|strings?|frets?|voicings|inversions?)\b", re.I)
+
+# Words allowed around a recognized lookup; anything else (a second chord, a
+# number, a qualifier) means the request asks for more than the lookup answers
+FILLER_WORDS = {
+    "please", "can", "could", "would", "you", "show", "me", "how", "do", "does", "i", "to", "play",
+    "the", "a", "an", "what", "what's", "whats", "is", "are", "give", "for", "on", "guitar",
+    "chord", "scale", "arpeggio", "arpeggios", "progression", "in", "key", "of", "notes",
+    "look", "looks", "like", "shape", "voicing", "grip", "fingering", "finger", "draw", "tab",
+    "hey", "hi", "thanks", "thank", "quick", "quickly", "just", "need", "want", "see", "some", "my",
+}
+
+NOTE_PATTERN = r"[A-G](?:#|b|♯|♭)?"
+
+CHORD_PATTERN = (
+    r"(?P<root>" + NOTE_PATTERN + r")"
+    r"(?:(?P<sym>maj7|M7|m7|min7|dom7|maj|min|m|7|sus2|sus4|5)"
+    r"|\s+(?P<word>(?i:major 7th|major seventh|major 7|minor 7th|minor seventh|minor 7|"
+    r"dominant 7th|dominant seventh|dominant 7|major|minor|power chord)))?"
+    r"(?![\w#♯♭])"
+)
+
+CHORD_REQUEST_RE = re.compile(
+    r"^(?i:please\s+)?(?i:(?:can you\s+)?(?:show me|how do i play|how to play|how do you play|"
+    r"how do i finger|fingering for|what is|what's|give me|play|draw)\s+)?"
+    r"(?i:(?:an?|the)\s+)?" + CHORD_PATTERN +
+    r"(?i:\s+chord)?(?i:\s+(?:shape|voicing|grip|fingering))?(?i:\s+please)?\s*[?.!]*$"
+)
+
+CHORD_WORD_RE = re.compile(CHORD_PATTERN + r"(?i:\s+chord)\b")
+
+ANY_CHORD_RE = re.compile(r"(?<![\w#])" + CHORD_PATTERN)
+
+_SCALE_NAMES = "|".join(sorted((re.escape(name) for name in SCALE_ALIASES), key=len, reverse=True))
+SCALE_RE = re.compile(
+    r"(?<![\w#])(?P<root>[A-Ga-g](?:#|b|♯|♭)?)(?P<accidental>\s+(?:sharp|flat))?\s+"
+    r"(?P<name>" + _SCALE_NAMES + r")(?P<scale>\s+scale)?\b", re.I)
+
+_DEGREE = r"(?:b?(?:vii|iii|vi|iv|ii|v|i|VII|III|VI|IV|II|V|I)(?:maj7|m7|7)?|[1-7])"
+PROGRESSION_RE = re.compile(r"(?<![\w-])(?P<prog>" + _DEGREE + r"(?:\s*[-–]\s*" + _DEGREE + r")+)(?![\w-])")
+
+KEY_RE = re.compile(
+    r"\b(?:in|key of)\s+(?:the\s+key\s+of\s+)?"
+    r"(?:(?P<upper>[A-G](?:#|b|♯|♭)?)(?:\s*(?P<upper_mode>(?i:major|minor|maj|min)|m)\b)?"
+    r"|(?P<lower>[a-g](?:#|b|♯|♭)?)\s*(?P<lower_mode>(?i:major|minor)))(?![\w#♯♭])")
+
+
+def parse_note(name: str) -> int:
+    """Pitch class of a note name like "C", "F#", "Bb" or "E♭"."""
+    name = name.strip()
+    pc = NATURAL_PCS[name[0].upper()]
+    for accidental in name[1:]:
+        if accidental in "#♯":
+            pc += 1
+        elif accidental in "b♭":
+            pc -= 1
+    return pc % 12
+
+
+def spell_note(pc: int, flats: bool) -> str:
+    return (NOTE_NAMES_FLAT if flats else NOTE_NAMES_SHARP)[pc % 12]
+
+
+def spell_degree(root_name: str, interval: int, degree: int) -> str:
+    """Name of the note `interval` semitones above root_name, on the letter of `degree` (1-7)."""
+    letter = LETTERS[(LETTERS.index(root_name[0].upper()) + degree - 1) % 7]
+    offset = (parse_note(root_name) + interval - NATURAL_PCS[letter] + 6) % 12 - 6
+    return letter + ("#" * offset if offset > 0 else "b" * -offset)
+
+
+def spell_intervals(root_name: str, intervals: Tuple[int, ...]) -> List[str]:
+    """
+    Spell the notes of a scale or chord from its degrees.
+
+    Seven-note scales use each letter once (C# major has E#, not F); chords
+    and pentatonic/blues scales take the degree of each interval.
+    """
+    if len(intervals) == 7:
+        degrees = range(1, 8)
+    else:
+        degrees = [INTERVAL_DEGREES[interval % 12] for interval in intervals]
+    return [spell_degree(root_name, interval, degree) for interval, degree in zip(intervals, degrees)]
+
+
+def prefers_flats(root_name: str, minor: bool = False) -> bool:
+    """Whether notes in this key/chord are spelled with flats."""
+    if any(ch in root_name for ch in "b♭"):
+        return True
+    if any(ch in root_name for ch in "#♯"):
+        return False
+    pc = parse_note(root_name)
+    return ((pc + 3) % 12 if minor else pc) in FLAT_KEY_PCS
+
+
+def chord_name(root_pc: int, quality: str, flats: bool) -> str:
+    return spell_note(root_pc, flats) + quality
+
+
+def with_article(name: str) -> str:
+    """ "an Am", "an F7", "a G" """
+    return ("an " if name[0] in "AEF" else "a ") + name
+
+
+# Grips per (root pc, quality), easiest first; computed once
+GRIPS_BY_CHORD = {(pc, quality): chord_grips(pc, quality)
+                  for pc in range(12) for quality in QUALITY_INTERVALS}
+
+
+# ----------------------------------------------------------------------
+# Response building
+# ----------------------------------------------------------------------
+
+def render_tab(columns: List[Dict[int, int]], labels: Optional[List[str]] = None,
+               header: Optional[str] = None) -> str:
+    """
+    Render ASCII tab.
+
+    Args:
+        columns: One {string: fret} dict per beat/chord
+        labels: Optional text shown above each column (chord names, PIMA letters)
+        header: Optional title line
+    """
+    widths = []
+    for i, column in enumerate(columns):
+        width = max([len(str(fret)) for fret in column.values()] or [1])
+        if labels:
+            width = max(width, len(labels[i]))
+        widths.append(width + 2)
+
+    lines = [header] if header else []
+    if labels:
+        lines.append("  " + "".join("  " + label.ljust(width) for label, width in zip(labels, widths)))
+    for string in range(1, 7):
+        cells = "".join("--" + str(column.get(string, "")).ljust(width, "-")
+                        for column, width in zip(columns, widths))
+        lines.append(f"{STRING_LABELS[string]}|{cells}--|")
+    return "\n".join(lines)
+
+
+def chord_shape(name: str, grip: List[Tuple[int, int]], duration_beats: int, notes: str) -> Dict:
+    """A fretboard_sequence entry for a chord grip."""
+    sounded = {string for string, _ in grip}
+    return {
+        "chord_name": name,
+        "positions": [{"string": string, "fret": fret} for string, fret in sorted(grip)],
+        "muted": [string for string in range(1, 7) if string not in sounded],
+        "duration_beats": duration_beats,
+        "notes": notes
+    }
+
+
+def grip_position_text(grip: List[Tuple[int, int]]) -> str:
+    fretted = [fret for _, fret in grip if fret > 0]
+    if not fretted or max(fretted) <= 4 and any(fret == 0 for _, fret in grip):
+        return "open position"
+    return f"barre/movable shape at fret {min(fretted)}"
+
+
+def closest_grip(grips: List[List[Tuple[int, int]]], previous: Optional[List[Tuple[int, int]]]):
+    """Pick the grip nearest the previous one on the neck (easiest if there is none)."""
+    if not previous:
+        return grips[0]
+
+    def center(grip):
+        frets = [fret for _, fret in grip]
+        return sum(frets) / len(frets)
+
+    anchor = center(previous)
+    candidates = grips[:6]
+    return min(candidates, key=lambda grip: (abs(center(grip) - anchor), candidates.index(grip)))
+
+
+def scale_box(root_pc: int, intervals: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """
+    Scale notes in one position, as (string, fret) from the lowest root upward.
+
+    The box starts a fret below the root on the low E string (open position for
+    E, F and F#-rooted scales would need frets below zero).
+    """
+    pcs = {(root_pc + interval) % 12 for interval in intervals}
+    root_fret = (root_pc - GUITAR_TUNING[6]) % 12
+    start = max(0, root_fret - 1)
+    notes = []
+    for string in range(6, 0, -1):
+        for fret in range(start, start + SCALE_BOX_FRETS):
+            if (GUITAR_TUNING[string] + fret) % 12 in pcs:
+                notes.append((string, fret))
+    first_root = next(i for i, (string, fret) in enumerate(notes)
+                      if (GUITAR_TUNING[string] + fret) % 12 == root_pc)
+    return notes[first_root:]
+
+
+def build_scale_response(root_name: str, scale: str) -> Dict:
+    root_pc = parse_note(root_name)
+    intervals = SCALES[scale]
+    flats = prefers_flats(root_name, minor=scale in MINOR_SCALES)
+    root = spell_note(root_pc, flats)
+    title = f"{root} {scale.title()}"
+    names = spell_intervals(root, intervals)
+    name_by_pc = {(root_pc + interval) % 12: name for interval, name in zip(intervals, names)}
+    spelled = " ".join(names)
+    notes = scale_box(root_pc, intervals)
+    start_fret = min(fret for _, fret in notes)
+
+    sequence = []
+    for string, fret in notes:
+        pc = (GUITAR_TUNING[string] + fret) % 12
+        sequence.append({
+            "chord_name": f"{title} Scale",
+            "positions": [{"string": string, "fret": fret}],
+            "muted": [s for s in range(1, 7) if s != string],
+            "duration_beats": SCALE_NOTE_BEATS,
+            "notes": name_by_pc[pc] + (" (root)" if pc == root_pc else "")
+        })
+
+    return {
+        "chat_response": (f"Here's the {title} scale: {spelled}. This position starts around fret "
+                          f"{start_fret} and climbs from the root on the low strings to the high e string."),
+        "fretboard_sequence": sequence,
+        "tab_display": render_tab([{string: fret} for string, fret in notes], header=f"{title} Scale"),
+        "additional_notes": (f"Play it slowly with a metronome, ascending then descending, and "
+                             f"listen for the root ({root}) each time it comes around.")
+    }
+
+
+def build_chord_response(root_name: str, quality: str) -> Optional[Dict]:
+    root_pc = parse_note(root_name)
+    grips = GRIPS_BY_CHORD.get((root_pc, quality))
+    if not grips:
+        return None
+    flats = prefers_flats(root_name)
+    name = chord_name(root_pc, quality, flats)
+    grip = grips[0]
+    spelled = " ".join(spell_intervals(spell_note(root_pc, flats), QUALITY_INTERVALS[quality]))
+
+    alternative = ""
+    if len(grips) > 1:
+        other = grips[1]
+        alternative = f" Another option is the {grip_position_text(other)} voicing."
+
+    return {
+        "chat_response": f"Here's {name}, a {QUALITY_DESCRIPTIONS[quality]}: {spelled}. "
+                         f"This is the {grip_position_text(grip)} voicing.",
+        "fretboard_sequence": [chord_shape(name, grip, 8, f"{name} - {grip_position_text(grip)}")],
+        "tab_display": render_tab([dict(grip)], labels=[name]),
+        "additional_notes": f"Strum only the strings shown; muted strings are marked with X.{alternative}"
+    }
+
+
+def _bounce(strings: List[int], count: int) -> List[int]:
+    """Low-to-high then back down, repeated to count notes."""
+    cycle = strings + strings[-2:0:-1]
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+def build_arpeggio_response(root_name: str, quality: str) -> Optional[Dict]:
+    root_pc = parse_note(root_name)
+    grips = GRIPS_BY_CHORD.get((root_pc, quality))
+    if not grips:
+        return None
+    flats = prefers_flats(root_name)
+    name = chord_name(root_pc, quality, flats)
+    grip = grips[0]
+    frets = dict(grip)
+    order = _bounce(sorted(frets, reverse=True), 8)
+
+    def finger(string):
+        return "p" if string >= 4 else {3: "i", 2: "m", 1: "a"}[string]
+
+    shape = chord_shape(f"{name} Arpeggio", grip, 4, "8-note arpeggio ascending then descending")
+    shape["strumming_pattern"] = [
+        {"strings": [string], "duration_beats": 0.5, "right_finger": finger(string)}
+        for string in order
+    ]
+    spelled = " ".join(spell_intervals(spell_note(root_pc, flats), QUALITY_INTERVALS[quality]))
+
+    return {
+        "chat_response": f"Here's {with_article(name)} arpeggio ({spelled}) using the {grip_position_text(grip)} grip. "
+                         f"Each note rings on its own, low to high and back.",
+        "fretboard_sequence": [shape],
+        "tab_display": render_tab([{string: frets[string]} for string in order],
+                                  labels=[finger(string) for string in order],
+                                  header=f"{name} Arpeggio"),
+        "additional_notes": "Hold the whole chord shape down and let every note ring into the next. "
+                            "The thumb (p) takes the bass strings; i, m and a take strings 3, 2 and 1."
+    }
+
+
+def diatonic_case(mode: str, degree: int, minor_chord: bool) -> bool:
+    """
+    Whether a numeral's case (lower = minor) matches the diatonic triad on degree.
+
+    Diminished degrees never match. V in minor may be major (harmonic minor).
+    """
+    if degree < 1 or degree > 7:
+        return True  # Rejected with the digit degrees below
+    triad = DIATONIC_TRIADS[mode][degree - 1]
+    if triad is None:
+        return False
+    if mode == "minor" and degree == 5:
+        return True
+    return (triad == "m") == minor_chord
+
+
+def parse_progression(prog: str, minor: bool) -> Optional[List[Tuple[int, int, str, str]]]:
+    """
+    Parse "ii-V-I" / "2-5-1" / "I-V-vi-IV" into (degree, semitones, quality, numeral).
+
+    Returns None if a chord needs a quality voicings.py has no shapes for
+    (diminished, half-diminished), or if a numeral's case does not match the
+    diatonic chord on its degree ("vii" in major, "ii" in minor, "III" in major).
+    """
+    tokens = [token.strip() for token in re.split(r"[-–]", prog)]
+    mode = "minor" if minor else "major"
+    degrees = []
+    for token in tokens:
+        if token.isdigit():
+            degrees.append((int(token), 0, None))
+            continue
+        match = re.fullmatch(r"(b?)([ivIV]+)(maj7|m7|7)?", token)
+        numeral, suffix = match.group(2), match.group(3)
+        if numeral.lower() not in ROMAN_DEGREES or numeral not in (numeral.lower(), numeral.upper()):
+            return None
+        minor_chord = numeral.islower()
+        degree = ROMAN_DEGREES[numeral.lower()]
+        if not match.group(1) and not diatonic_case(mode, degree, minor_chord):
+            return None
+        if suffix == "7":
+            quality = "m7" if minor_chord else "7"
+        elif suffix:
+            quality = suffix
+        else:
+            quality = "m" if minor_chord else ""
+        degrees.append((degree, -1 if match.group(1) else 0, quality))
+
+    # The ii-V-I is voiced with diatonic seventh chords unless written out explicitly
+    sevenths = [degree for degree, _, _ in degrees] == [2, 5, 1] and \
+        all(quality in (None, "", "m") for _, _, quality in degrees)
+
+    chords = []
+    for degree, shift, quality in degrees:
+        if degree < 1 or degree > 7:
+            return None
+        if quality is None or sevenths:
+            quality = (DIATONIC_SEVENTHS if sevenths else DIATONIC_TRIADS)[mode][degree - 1]
+        if quality is None:
+            return None
+        numeral = ROMAN_NUMERALS[degree - 1]
+        numeral = numeral.lower() if quality in ("m", "m7") else numeral
+        if quality in ("7", "m7"):
+            numeral += "7"
+        elif quality == "maj7":
+            numeral += "maj7"
+        chords.append((degree, KEY_SCALES[mode][degree - 1] + shift, quality,
+                       ("b" if shift else "") + numeral))
+    return chords
+
+
+def build_progression_response(prog: str, key_name: str, minor: bool) -> Optional[Dict]:
+    chords = parse_progression(prog, minor)
+    if not chords:
+        return None
+    key_pc = parse_note(key_name)
+    flats = prefers_flats(key_name, minor)
+    key_root = spell_note(key_pc, flats)
+    key_title = f"{key_root} {'Minor' if minor else 'Major'}"
+
+    sequence, columns, names, numerals = [], [], [], []
+    previous = None
+    for i, (degree, semitones, quality, numeral) in enumerate(chords):
+        root_pc = (key_pc + semitones) % 12
+        grips = GRIPS_BY_CHORD.get((root_pc, quality))
+        if not grips:
+            return None
+        grip = closest_grip(grips, previous)
+        previous = grip
+        # Roots take the key's letter for their degree (bVII in C is Bb, not A#)
+        name = spell_degree(key_root, semitones, degree) + quality
+        duration = CHORD_BEATS * 2 if i == len(chords) - 1 else CHORD_BEATS
+        sequence.append(chord_shape(name, grip, duration, f"The {numeral} chord in {key_title}"))
+        columns.append(dict(grip))
+        names.append(name)
+        numerals.append(numeral)
+
+    return {
+        "chat_response": f"Here's the {'-'.join(numerals)} progression in {key_title}: "
+                         f"{' → '.join(names)}. Each voicing is chosen to stay close to the previous "
+                         f"one on the neck.",
+        "fretboard_sequence": sequence,
+        "tab_display": render_tab(columns, labels=names),
+        "additional_notes": "Practice the changes slowly with the metronome, moving all fingers "
+                            "together, then raise the tempo once the switches are clean."
+    }
+
+
+# ----------------------------------------------------------------------
+# Intent parsing
+# ----------------------------------------------------------------------
+
+def _chord_quality(match) -> str:
+    if match.group("word"):
+        return QUALITY_SYMBOLS[" ".join(match.group("word").lower().split())]
+    return QUALITY_SYMBOLS[match.group("sym") or ""]
+
+
+def only_filler_outside(text: str, *spans: Tuple[int, int]) -> bool:
+    """True if every word of text outside the matched spans is in FILLER_WORDS."""
+    rest, last = [], 0
+    for start, end in sorted(spans):
+        rest.append(text[last:start])
+        last = max(last, end)
+    rest.append(text[last:])
+    words = re.findall(r"[\w'#♯♭]+", " ".join(rest).lower())
+    return all(word in FILLER_WORDS for word in words)
+
+
+def parse_intent(message: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Recognize a lookup request.
+
+    Returns:
+        (intent, params) with intent one of "scale", "chord", "arpeggio",
+        "progression", or None if the message is not a recognized lookup
+    """
+    text = " ".join(message.split())
+    if not text or len(text) > 120 or DEFER_RE.search(text):
+        return None
+
+    progression = PROGRESSION_RE.search(text)
+    if progression:
+        key = KEY_RE.search(text)
+        if not key or not only_filler_outside(text, progression.span(), key.span()):
+            return None
+        # "3-4 chords" is a count; two numbers are only a progression if called one
+        degrees = re.split(r"\s*[-–]\s*", progression.group("prog"))
+        if len(degrees) < 3 and all(d.isdigit() for d in degrees) and \
+                not re.search(r"\bprogression\b", text, re.I):
+            return None
+        if key.group("upper"):
+            key_name, mode = key.group("upper"), (key.group("upper_mode") or "")
+        else:
+            key_name, mode = key.group("lower").upper(), key.group("lower_mode")
+        minor = mode.lower() in ("minor", "min", "m")
+        return "progression", {"progression": progression.group("prog"), "key": key_name, "minor": minor}
+
+    if re.search(r"\barpeggios?\b", text, re.I):
+        chord = ANY_CHORD_RE.search(text)
+        if chord and only_filler_outside(text, chord.span()):
+            return "arpeggio", {"root": chord.group("root"), "quality": _chord_quality(chord)}
+        return None
+
+    for scale in SCALE_RE.finditer(text):
+        name, standalone = SCALE_ALIASES[scale.group("name").lower()]
+        if not (standalone or scale.group("scale")):
+            continue
+        if not only_filler_outside(text, scale.span()):
+            return None
+        root = scale.group("root")
+        root = root[0].upper() + root[1:]
+        if scale.group("accidental"):
+            root += "#" if "sharp" in scale.group("accidental").lower() else "b"
+        return "scale", {"root": root, "scale": name}
+
+    chord = CHORD_REQUEST_RE.match(text)
+    if not chord:
+        chord = CHORD_WORD_RE.search(text)
+        if chord and not only_filler_outside(text, chord.span()):
+            return None
+    if chord:
+        return "chord", {"root": chord.group("root"), "quality": _chord_quality(chord)}
+    return None
+
+
+def answer_locally(message: str) -> Optional[Dict]:
+    """
+    Answer a lookup request without the LLM.
+
+    Args:
+        message: User message
+
+    Returns:
+        Response dict in the system_prompt.txt format, or None if the intent
+        is not recognized (the caller should ask the LLM)
+    """
+    intent = parse_intent(message)
+    if not intent:
+        return None
+    kind, params = intent
+
+    if kind == "scale":
+        return build_scale_response(params["root"], params["scale"])
+    if kind == "chord":
+        return build_chord_response(params["root"], params["quality"])
+    if kind == "arpeggio":
+        return build_arpeggio_response(params["root"], params["quality"])
+    return build_progression_response(params["progression"], params["key"], params["minor"])
+
+
+# CLI interface
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Answer a scale/chord/progression lookup locally")
+    parser.add_argument("message", help='e.g. "Show me a 2-5-1 in C major"')
+
+    args = parser.parse_args()
+
+    answer = answer_locally(args.message)
+    if answer is None:
+        print("Not recognized (would go to the LLM)")
+    else:
+        print(json.dumps(answer, indent=2, ensure_ascii=False))
+        print()
+        print(answer["tab_display"])
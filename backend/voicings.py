@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Chord Voicing Index
+
+Precomputed index from (pitch-class set, bass pitch class) to playable guitar
+voicings, derived from standard open chord shapes and movable barre/CAGED
+shapes at every fret position. Every subset of two or more strings of a shape
+is indexed too, so partial voicings written in notation (e.g. a bass note plus
+a triad on the top strings) resolve to the grip they come from.
+
+The index is built once at import. Lookups are two dict accesses:
+
+    index[(pitch_classes, bass_pc)][sorted_midi_notes] -> voicing
+
+A voicing is a tuple of (string, fret, midi_note) sorted from string 1 (high E)
+to string 6. When several grips produce the same exact notes, the cheapest one
+(lowest position, fewest fretted notes, smallest stretch) is kept.
+"""
+
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Same tuning as musicxml_to_tab.GUITAR_TUNING (string -> open string MIDI note)
+GUITAR_TUNING = {1: 64, 2: 59, 3: 55, 4: 50, 5: 45, 6: 40}
+
+# Highest fret a voicing may use
+MAX_VOICING_FRET = 15
+
+# Widest fretted stretch (max fret - min fretted fret) considered playable
+MAX_STRETCH = 4
+
+Voicing = Tuple[Tuple[int, int, int], ...]
+VoicingKey = Tuple[FrozenSet[int], int]
+
+# Open chord shapes: (root pitch class, quality, frets for strings 6..1, None = muted)
+OPEN_SHAPES = [
+    (0, "", (None, 3, 2, 0, 1, 0)),      # C
+    (9, "", (None, 0, 2, 2, 2, 0)),      # A
+    (7, "", (3, 2, 0, 0, 0, 3)),         # G
+    (4, "", (0, 2, 2, 1, 0, 0)),         # E
+    (2, "", (None, None, 0, 2, 3, 2)),   # D
+    (5, "", (None, None, 3, 2, 1, 1)),   # F (small)
+    (9, "m", (None, 0, 2, 2, 1, 0)),     # Am
+    (4, "m", (0, 2, 2, 0, 0, 0)),        # Em
+    (2, "m", (None, None, 0, 2, 3, 1)),  # Dm
+    (4, "7", (0, 2, 0, 1, 0, 0)),        # E7
+    (9, "7", (None, 0, 2, 0, 2, 0)),     # A7
+    (2, "7", (None, None, 0, 2, 1, 2)),  # D7
+    (7, "7", (3, 2, 0, 0, 0, 1)),        # G7
+    (0, "7", (None, 3, 2, 3, 1, 0)),     # C7
+    (11, "7", (None, 2, 1, 2, 0, 2)),    # B7
+    (9, "m7", (None, 0, 2, 0, 1, 0)),    # Am7
+    (4, "m7", (0, 2, 0, 0, 3, 0)),       # Em7
+    (2, "m7", (None, None, 0, 2, 1, 1)), # Dm7
+    (0, "maj7", (None, 3, 2, 0, 0, 0)),  # Cmaj7
+    (5, "maj7", (None, None, 3, 2, 1, 0)),  # Fmaj7
+    (9, "maj7", (None, 0, 2, 1, 2, 0)),  # Amaj7
+    (2, "maj7", (None, None, 0, 2, 2, 2)),  # Dmaj7
+    (9, "sus2", (None, 0, 2, 2, 0, 0)),  # Asus2
+    (9, "sus4", (None, 0, 2, 2, 3, 0)),  # Asus4
+    (2, "sus2", (None, None, 0, 2, 3, 0)),  # Dsus2
+    (2, "sus4", (None, None, 0, 2, 3, 3)),  # Dsus4
+    (4, "sus4", (0, 2, 2, 2, 0, 0)),     # Esus4
+]
+
+# Movable shapes: (name, root string, quality, fret offsets for strings 6..1 relative
+# to the root fret, None = muted). The root fret is where the root note sounds on
+# the root string.
+MOVABLE_SHAPES = [
+    ("E", 6, "", (0, 2, 2, 1, 0, 0)),
+    ("E", 6, "m", (0, 2, 2, 0, 0, 0)),
+    ("E", 6, "7", (0, 2, 0, 1, 0, 0)),
+    ("E", 6, "m7", (0, 2, 0, 0, 0, 0)),
+    ("E", 6, "maj7", (0, None, 1, 1, 0, None)),
+    ("E", 6, "5", (0, 2, 2, None, None, None)),
+    ("A", 5, "", (None, 0, 2, 2, 2, 0)),
+    ("A", 5, "m", (None, 0, 2, 2, 1, 0)),
+    ("A", 5, "7", (None, 0, 2, 0, 2, 0)),
+    ("A", 5, "m7", (None, 0, 2, 0, 1, 0)),
+    ("A", 5, "maj7", (None, 0, 2, 1, 2, 0)),
+    ("A", 5, "5", (None, 0, 2, 2, None, None)),
+    ("C", 5, "", (None, 0, -1, -3, -2, -3)),
+    ("D", 4, "", (None, None, 0, 2, 3, 2)),
+    ("D", 4, "m", (None, None, 0, 2, 3, 1)),
+    ("D", 4, "7", (None, None, 0, 2, 1, 2)),
+    ("G", 6, "", (0, -1, -3, -3, -3, 0)),
+]
+
+# Chord quality -> intervals above the root
+QUALITY_INTERVALS = {
+    "": (0, 4, 7),
+    "m": (0, 3, 7),
+    "7": (0, 4, 7, 10),
+    "m7": (0, 3, 7, 10),
+    "maj7": (0, 4, 7, 11),
+    "sus2": (0, 2, 7),
+    "sus4": (0, 5, 7),
+    "5": (0, 7),
+}
+
+
+def _voicing_cost(frets: List[int]) -> Tuple[int, int, int]:
+    """Lower is easier: (highest fret, fretted note count, stretch)."""
+    fretted = [f for f in frets if f > 0]
+    if not fretted:
+        return (0, 0, 0)
+    return (max(fretted), len(fretted), max(fretted) - min(fretted))
+
+
+def _is_playable(frets: List[int]) -> bool:
+    fretted = [f for f in frets if f > 0]
+    if any(f < 0 or f > MAX_VOICING_FRET for f in frets):
+        return False
+    return not fretted or max(fretted) - min(fretted) <= MAX_STRETCH
+
+
+def iter_shape_grips():
+    """
+    Yield (root_pc, quality, grip) for every open shape and every position of
+    every movable shape. A grip is a list of (string, fret) for sounding strings.
+    """
+    for root_pc, quality, frets in OPEN_SHAPES:
+        grip = [(6 - i, fret) for i, fret in enumerate(frets) if fret is not None]
+        yield root_pc, quality, grip
+
+    for _, root_string, quality, offsets in MOVABLE_SHAPES:
+        for root_fret in range(1, MAX_VOICING_FRET + 1):
+            grip = [(6 - i, root_fret + offset) for i, offset in enumerate(offsets)
+                    if offset is not None]
+            frets = [fret for _, fret in grip]
+            if not _is_playable(frets):
+                continue
+            root_pc = (GUITAR_TUNING[root_string] + root_fret) % 12
+            yield root_pc, quality, grip
+
+
+def build_voicing_index() -> Dict[VoicingKey, Dict[Tuple[int, ...], Voicing]]:
+    """Build the (pitch-class set, bass pc) -> {sorted midi notes: voicing} index."""
+    index: Dict[VoicingKey, Dict[Tuple[int, ...], Voicing]] = {}
+    costs: Dict[Tuple[int, ...], Tuple[int, int, int]] = {}
+
+    for _, _, grip in iter_shape_grips():
+        notes = [(string, fret, GUITAR_TUNING[string] + fret) for string, fret in grip]
+
+        for size in range(2, len(notes) + 1):
+            for subset in combinations(notes, size):
+                midi = tuple(sorted(n[2] for n in subset))
+                cost = _voicing_cost([n[1] for n in subset])
+                if midi in costs and costs[midi] <= cost:
+                    continue
+                costs[midi] = cost
+
+                key = (frozenset(m % 12 for m in midi), midi[0] % 12)
+                index.setdefault(key, {})[midi] = tuple(sorted(subset))
+
+    return index
+
+
+VOICING_INDEX = build_voicing_index()
+
+
+def lookup_voicing(midi_notes: List[int]) -> Optional[Voicing]:
+    """
+    Find a known playable voicing that sounds exactly these notes.
+
+    Args:
+        midi_notes: MIDI note numbers of a chord (two or more)
+
+    Returns:
+        Tuple of (string, fret, midi_note) or None if no indexed shape matches
+    """
+    if len(midi_notes) < 2:
+        return None
+    midi = tuple(sorted(midi_notes))
+    bucket = VOICING_INDEX.get((frozenset(m % 12 for m in midi), midi[0] % 12))
+    if bucket is None:
+        return None
+    return bucket.get(midi)
+
+
+def chord_grips(root_pc: int, quality: str = "") -> List[List[Tuple[int, int]]]:
+    """
+    List full grips (string, fret) for a chord, easiest first.
+
+    Args:
+        root_pc: Root pitch class (C = 0)
+        quality: One of QUALITY_INTERVALS keys ("", "m", "7", "m7", "maj7", ...)
+    """
+    grips = []
+    for pc, q, grip in iter_shape_grips():
+        if pc == root_pc and q == quality and grip not in grips:
+            grips.append(grip)
+    return sorted(grips, key=lambda grip: _voicing_cost([fret for _, fret in grip]))
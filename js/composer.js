@@ -3032,7 +3032,9 @@ class Composer {
             const formData = new FormData();
             formData.append('file', file);
 
-            const uploadResponse = await fetch(this.apiEndpoint.replace('/api/assistant', '/api/omr/upload'), {
+            // MIDI files have their own synchronous import endpoint
+            const uploadPath = /\.midi?$/i.test(file.name) ? '/api/midi/import' : '/api/omr/upload';
+            const uploadResponse = await fetch(this.apiEndpoint.replace('/api/assistant', uploadPath), {
                 method: 'POST',
                 body: formData
             });
@@ -3045,10 +3047,12 @@ class Composer {
             const uploadResult = await uploadResponse.json();
             const jobId = uploadResult.job_id;
 
-            this.updateOmrStatus('Processing sheet music...', 'This may take a minute');
-
-            // Poll for status
-            const result = await this.pollOmrStatus(jobId);
+            // MusicXML and MIDI uploads come back already converted; everything else is polled
+            let result = uploadResult;
+            if (uploadResult.status !== 'completed') {
+                this.updateOmrStatus('Processing sheet music...', 'This may take a minute');
+                result = await this.pollOmrStatus(jobId);
+            }
 
             if (result.status === 'completed' && result.composition) {
                 // Load the composition